@@ -0,0 +1,233 @@
+"""Замеры задержки эндпоинтов API.
+
+Эндпоинты вызываются тестовым клиентом DRF в текущем процессе, поэтому
+в задержку входят middleware, аутентификация, представление,
+сериализация и запросы к базе, но не сеть и не WSGI-сервер. Для каждого
+эндпоинта считаются перцентили задержки, число SQL-запросов и время
+в базе на запрос. Результаты можно сравнить с сохранённым эталоном.
+"""
+import math
+import statistics
+import time
+
+from django.db import connection
+from django.db.models import Count
+from rest_framework.test import APIClient
+
+from api_yamdb.queries import QueryCounter
+from reviews.models import Review, Title
+from users.authorization import get_token
+from users.codes import confirmation_codes
+from users.models import ADMIN, USER, User
+
+# Размеры наборов данных для generate_dataset.
+DATASETS = {
+    "small": {
+        "users": 200,
+        "categories": 6,
+        "genres": 15,
+        "titles": 200,
+        "reviews": 2000,
+        "comments": 4000,
+    },
+    "medium": {
+        "users": 2000,
+        "categories": 10,
+        "genres": 30,
+        "titles": 2000,
+        "reviews": 20000,
+        "comments": 40000,
+    },
+    "large": {
+        "users": 20000,
+        "categories": 20,
+        "genres": 60,
+        "titles": 20000,
+        "reviews": 200000,
+        "comments": 400000,
+    },
+}
+
+CONFIRMATION_CODE = "benchmark"
+
+
+def signup_data(context, number):
+    username = f"{context['prefix']}s{number}"
+    return {"username": username, "email": f"{username}@yamdb.fake"}
+
+
+def token_data(context, number):
+    username = f"{context['prefix']}t{number}"
+    user, _ = User.objects.get_or_create(
+        username=username, defaults={"email": f"{username}@yamdb.fake"}
+    )
+    confirmation_codes.set(user.id, CONFIRMATION_CODE)
+    return {"username": username, "confirmation_code": CONFIRMATION_CODE}
+
+
+REVIEWS_PATH = "/api/v1/titles/{title_id}/reviews/"
+COMMENTS_PATH = REVIEWS_PATH + "{review_id}/comments/"
+
+# Эндпоинты: путь (шаблон с полями контекста), метод, от чьего имени
+# идёт запрос, функция тела запроса и ожидаемый статус ответа.
+ENDPOINTS = {
+    "titles-list": {"path": "/api/v1/titles/"},
+    "titles-detail": {"path": "/api/v1/titles/{title_id}/"},
+    "titles-filtered": {
+        "path": "/api/v1/titles/?genre={genre}&category={category}&year={year}"
+    },
+    "categories-list": {"path": "/api/v1/categories/"},
+    "genres-list": {"path": "/api/v1/genres/"},
+    "reviews-list": {"path": REVIEWS_PATH},
+    "reviews-helpful": {"path": REVIEWS_PATH + "?ordering=-helpful"},
+    "reviews-detail": {"path": REVIEWS_PATH + "{review_id}/"},
+    "comments-list": {"path": COMMENTS_PATH},
+    "comments-detail": {"path": COMMENTS_PATH + "{comment_id}/"},
+    "users-list": {"path": "/api/v1/users/", "as": ADMIN},
+    "users-search": {"path": "/api/v1/users/?search={search}", "as": ADMIN},
+    "users-detail": {"path": "/api/v1/users/{username}/", "as": ADMIN},
+    "users-me": {"path": "/api/v1/users/me/", "as": USER},
+    "signup": {
+        "path": "/api/v1/auth/signup/",
+        "method": "post",
+        "data": signup_data,
+    },
+    "token": {
+        "path": "/api/v1/auth/token/",
+        "method": "post",
+        "data": token_data,
+        "status": 201,
+    },
+}
+
+
+def benchmark_context(prefix):
+    """Объекты, к которым обращаются эндпоинты, и клиенты с токенами.
+
+    Берутся самое популярное произведение, самый обсуждаемый его отзыв
+    и первый комментарий к нему. Создаются администратор и пользователь
+    с именами, начинающимися с prefix.
+    """
+    title = Title.objects.order_by("-review_count", "pk").first()
+    review = (
+        Review.objects.filter(title=title)
+        .annotate(comments_count=Count("comments"))
+        .order_by("-comments_count", "pk")
+        .first()
+    )
+    comment = review and review.comments.order_by("pk").first()
+    if comment is None:
+        raise ValueError("The dataset needs titles with reviews and comments")
+    genre = title.genre.order_by("pk").first()
+    clients = {None: APIClient()}
+    for role in (ADMIN, USER):
+        username = f"{prefix}{role}"
+        user = User.objects.create_user(
+            username=username, email=f"{username}@yamdb.fake", role=role
+        )
+        clients[role] = APIClient()
+        clients[role].credentials(
+            HTTP_AUTHORIZATION=f"Bearer {get_token(user)['access']}"
+        )
+    return {
+        "prefix": prefix,
+        "clients": clients,
+        "title_id": title.id,
+        "review_id": review.id,
+        "comment_id": comment.id,
+        "genre": genre.slug if genre else "",
+        "category": title.category.slug if title.category else "",
+        "year": title.year,
+        "username": review.author.username,
+        "search": review.author.username[:4],
+    }
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def client_address(number):
+    """Свой адрес на каждый запрос, чтобы не упираться в ограничения частоты."""
+    return f"10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}"
+
+
+def measure(endpoint, context, requests, warmup):
+    """Вызывает эндпоинт warmup + requests раз и сводит замеры.
+
+    Первые warmup вызовов не учитываются. Подготовка тела запроса
+    в замер не входит.
+    """
+    client = context["clients"][endpoint.get("as")]
+    send = getattr(client, endpoint.get("method", "get"))
+    path = endpoint["path"].format(**context)
+    expected_status = endpoint.get("status", 200)
+    latencies = []
+    queries = []
+    sql_seconds = []
+    for number in range(warmup + requests):
+        data = endpoint["data"](context, number) if "data" in endpoint else None
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = send(path, data, REMOTE_ADDR=client_address(number))
+        elapsed = time.perf_counter() - started
+        if response.status_code != expected_status:
+            raise ValueError(
+                f"{path} returned {response.status_code}, "
+                f"expected {expected_status}"
+            )
+        if number >= warmup:
+            latencies.append(elapsed)
+            queries.append(counter.count)
+            sql_seconds.append(counter.seconds)
+    latencies.sort()
+    return {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "queries": max(queries),
+        "sql_ms": round(statistics.median(sql_seconds) * 1000, 3),
+    }
+
+
+def run_benchmark(names, requests, warmup, prefix="bench"):
+    """Замеряет эндпоинты names на данных текущей базы."""
+    context = benchmark_context(prefix)
+    return {
+        name: measure(ENDPOINTS[name], context, requests, warmup) for name in names
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Ищет регрессии results относительно baseline.
+
+    Регрессия - рост p95 больше чем на долю threshold и не меньше чем
+    на min_delta_ms миллисекунд или рост числа SQL-запросов. Сравниваются
+    только наборы данных и эндпоинты, которые есть в обоих результатах.
+    Возвращает список описаний регрессий.
+    """
+    regressions = []
+    for dataset, result in results["datasets"].items():
+        reference = baseline.get("datasets", {}).get(dataset)
+        if reference is None:
+            continue
+        for name, current in result["endpoints"].items():
+            previous = reference["endpoints"].get(name)
+            if previous is None:
+                continue
+            delta = current["p95_ms"] - previous["p95_ms"]
+            if delta >= min_delta_ms and delta > previous["p95_ms"] * threshold:
+                regressions.append(
+                    f"{dataset} {name}: p95 {current['p95_ms']:.2f}ms, "
+                    f"baseline {previous['p95_ms']:.2f}ms"
+                )
+            if current["queries"] > previous["queries"]:
+                regressions.append(
+                    f"{dataset} {name}: {current['queries']} queries, "
+                    f"baseline {previous['queries']}"
+                )
+    return regressions
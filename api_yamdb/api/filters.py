@@ -1,6 +1,8 @@
 import django_filters
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
 
 from reviews.models import Title
+from users.search import search_users
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -24,3 +26,48 @@ class TitleFilter(django_filters.FilterSet):
     class Meta:
         model = Title
         fields = ["category", "genre", "name", "year"]
+
+
+class ReviewOrderingFilter(OrderingFilter):
+    """Сортировка отзывов по параметру `ordering`.
+
+    `helpful` соответствует полю helpful_score и обслуживается
+    индексом (title, helpful_score).
+    """
+
+    ordering_fields_map = {
+        "helpful": "helpful_score",
+        "pub_date": "pub_date",
+        "score": "score",
+    }
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params:
+            return self.get_default_ordering(view)
+        ordering = []
+        for term in params.split(","):
+            term = term.strip()
+            field = self.ordering_fields_map.get(term.lstrip("-"))
+            if field is not None:
+                ordering.append(f"-{field}" if term.startswith("-") else field)
+        if not ordering:
+            return self.get_default_ordering(view)
+        # Добавочная сортировка по id делает пагинацию устойчивой.
+        return ordering + ["-id" if ordering[0].startswith("-") else "id"]
+
+
+class UserSearchFilter(BaseFilterBackend):
+    """Поиск пользователей по имени: `?search=<строка>`.
+
+    Параметр `search_mode=prefix` ограничивает поиск префиксом,
+    по умолчанию ищется и подстрока (см. users.search.search_users).
+    """
+
+    search_param = "search"
+    mode_param = "search_mode"
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "")
+        mode = request.query_params.get(self.mode_param)
+        return search_users(queryset, term, mode)
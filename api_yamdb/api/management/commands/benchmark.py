@@ -0,0 +1,187 @@
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from api.benchmark import DATASETS, ENDPOINTS, compare, run_benchmark
+from reviews.timeline import fanout_worker
+from users.mailing import confirmation_mailer
+from users.search import search_index_worker
+
+RESULTS_VERSION = 1
+# p95 эндпоинта должен вырасти больше чем на эту долю, чтобы считаться
+# регрессией, и не меньше чем на DEFAULT_MIN_DELTA_MS миллисекунд.
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 1.0
+
+
+@contextmanager
+def benchmark_database(verbosity):
+    """Отдельная временная база на время замеров одного набора данных.
+
+    Для SQLite база создаётся файлом во временном каталоге, а не в
+    памяти, чтобы замеры были ближе к настоящей работе.
+    """
+    test_settings = connection.settings_dict["TEST"]
+    old_name = connection.settings_dict["NAME"]
+    old_test_name = test_settings.get("NAME")
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            test_settings["NAME"] = os.path.join(directory, "benchmark.sqlite3")
+        connection.creation.create_test_db(
+            verbosity=verbosity, autoclobber=True, serialize=False
+        )
+        try:
+            yield
+        finally:
+            drain_background_workers()
+            connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+            test_settings["NAME"] = old_test_name
+
+
+def drain_background_workers():
+    """Ждёт фоновых задач и закрывает соединения их потоков с базой.
+
+    Иначе задачи, оставшиеся после замеров, писали бы в уже удалённую
+    базу набора данных, а потоки продолжили бы работать с ней.
+    """
+    for worker in (search_index_worker, fanout_worker):
+        worker.submit(connections.close_all)
+        worker.join()
+    confirmation_mailer.join()
+
+
+class Command(BaseCommand):
+    help = "Measure API endpoint latency on generated datasets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--datasets",
+            nargs="+",
+            choices=list(DATASETS),
+            default=["small", "medium"],
+            help="Dataset sizes to generate and measure",
+        )
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=list(ENDPOINTS),
+            default=list(ENDPOINTS),
+            help="Endpoints to measure (default: all)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Number of measured requests per endpoint",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=5,
+            help="Number of requests per endpoint made before measuring",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Dataset seed")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes generating the datasets",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write results as JSON to this path ('-' for stdout)",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Compare results with a JSON file written by --output",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help="Relative p95 growth reported as a regression",
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=DEFAULT_MIN_DELTA_MS,
+            help="Smallest p95 growth in milliseconds reported as a regression",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["requests"] < 1:
+            raise CommandError("At least one measured request is required")
+        baseline = None
+        if kwargs.get("baseline"):
+            with open(kwargs["baseline"], "r", encoding="utf-8") as baseline_file:
+                baseline = json.load(baseline_file)
+        results = {
+            "version": RESULTS_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "seed": kwargs["seed"],
+            "requests": kwargs["requests"],
+            "warmup": kwargs["warmup"],
+            "datasets": {},
+        }
+        setup_test_environment()
+        try:
+            for dataset in kwargs["datasets"]:
+                results["datasets"][dataset] = self.run_dataset(dataset, kwargs)
+        finally:
+            teardown_test_environment()
+
+        if kwargs.get("output") == "-":
+            self.stdout.write(json.dumps(results, indent=2))
+        elif kwargs.get("output"):
+            with open(kwargs["output"], "w", encoding="utf-8") as output:
+                json.dump(results, output, indent=2)
+        if baseline is not None:
+            regressions = compare(
+                results, baseline, kwargs["threshold"], kwargs["min_delta_ms"]
+            )
+            if regressions:
+                raise CommandError(
+                    f"Found {len(regressions)} regression(s):\n"
+                    + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
+
+    def run_dataset(self, dataset, kwargs):
+        sizes = DATASETS[dataset]
+        verbosity = kwargs.get("verbosity", 1)
+        with benchmark_database(max(verbosity - 1, 0)):
+            started = time.perf_counter()
+            call_command(
+                "generate_dataset",
+                seed=kwargs["seed"],
+                workers=kwargs["workers"],
+                stdout=self.stdout if verbosity > 1 else io.StringIO(),
+                **sizes,
+            )
+            self.stdout.write(
+                f"{dataset}: dataset generated"
+                f" in {time.perf_counter() - started:.2f}s"
+            )
+            endpoints = run_benchmark(
+                kwargs["endpoints"], kwargs["requests"], kwargs["warmup"]
+            )
+        for name, stats in endpoints.items():
+            self.stdout.write(
+                f"{dataset} {name:<16} p50 {stats['p50_ms']:8.2f}ms"
+                f"  p95 {stats['p95_ms']:8.2f}ms"
+                f"  {stats['queries']:3d} queries"
+                f"  sql {stats['sql_ms']:7.2f}ms"
+            )
+        return {"sizes": sizes, "endpoints": endpoints}
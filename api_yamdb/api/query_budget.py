@@ -0,0 +1,119 @@
+"""Бюджеты SQL-запросов представлений API.
+
+Представление объявляет бюджет своих действий атрибутом query_budgets:
+
+    class TitleViewSet(viewsets.ModelViewSet):
+        query_budgets = {"list": 3, "retrieve": 2}
+
+Для APIView действие - HTTP-метод в нижнем регистре ("post").
+QueryBudgetMiddleware считает запросы к базе за время обработки запроса
+и, если их больше бюджета, пишет в лог предупреждение с отпечатками
+запросов (SQL без значений) или, при QUERY_BUDGET_RAISE, выбрасывает
+QueryBudgetExceeded - так бюджеты проверяются во всех тестах API.
+Тексты запросов хранятся только до конца обработки запроса, DEBUG
+для подсчёта не нужен.
+
+Бюджет задаёт целевое число запросов действия, включая загрузку
+пользователя при промахе кэша аутентификации. Фоновые задачи (рассылка
+в ленты, триграммы имён), которые в тестах выполняются в потоке
+запроса, в бюджет не входят - см. BackgroundWorker.run_inline.
+"""
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from api_yamdb.queries import QueryCounter
+
+logger = logging.getLogger(__name__)
+
+# Сколько самых частых отпечатков попадает в отчёт о превышении.
+REPORTED_FINGERPRINTS = 5
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+VALUES_RE = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+PARAMETER_RE = re.compile(r"%s")
+
+
+def fingerprint(sql):
+    """SQL-запрос без значений: одинаков у запросов, различающихся ими.
+
+    Строки и числа заменяются на ?, списки значений IN (...) - на (...).
+    """
+    sql = PARAMETER_RE.sub("?", sql)
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    return VALUES_RE.sub("(...)", sql)
+
+
+class QueryRecorder(QueryCounter):
+    """Счётчик запросов, сохраняющий их тексты для отчёта."""
+
+    def __init__(self):
+        super().__init__()
+        self.statements = []
+
+    def record(self, sql, seconds):
+        super().record(sql, seconds)
+        self.statements.append(sql)
+
+    def fingerprints(self, limit=REPORTED_FINGERPRINTS):
+        return Counter(map(fingerprint, self.statements)).most_common(limit)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Представление выполнило больше запросов, чем позволяет бюджет."""
+
+
+def view_budget(view_func, method):
+    """Имя действия представления и его бюджет запросов (или None)."""
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return None, None
+    actions = getattr(view_func, "actions", None)
+    action = actions.get(method.lower()) if actions else method.lower()
+    if action is None:
+        return None, None
+    budget = getattr(view_class, "query_budgets", {}).get(action)
+    return f"{view_class.__name__}.{action}", budget
+
+
+class QueryBudgetMiddleware:
+    """Сверяет число SQL-запросов обработки запроса с бюджетом действия.
+
+    Включается настройкой QUERY_BUDGET_ENABLED; без неё Django убирает
+    middleware из цепочки и запросы не оборачиваются.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        name, budget = getattr(request, "query_budget", (None, None))
+        if budget is not None and recorder.count > budget:
+            self.report(request, name, budget, recorder)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = view_budget(view_func, request.method)
+
+    def report(self, request, name, budget, recorder):
+        fingerprints = "\n".join(
+            f"  {count} x {sql}" for sql, count in recorder.fingerprints()
+        )
+        message = (
+            f"{name} ({request.method} {request.path}) made {recorder.count} "
+            f"queries, budget {budget}:\n{fingerprints}"
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
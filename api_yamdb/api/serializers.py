@@ -1,36 +1,64 @@
 from django.http import Http404
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 from rest_framework import serializers, validators
 
-from users.models import ROLE_CHOICES, User
-from reviews.models import Category, Comment, Genre, Review, Title
+from users.bulk import OPERATION_CHOICES, OPERATION_SET_ROLE
+from users.codes import confirmation_codes
+from users.models import ROLE_CHOICES, Follow, User, normalize_identifier
+from reviews.models import (
+    VOTE_CHOICES,
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+)
 
 
-def check_username_exists(username):
-    """Проверка наличия пользователя с заданным именем пользователя.
+# Имена, занятые маршрутами /users/<name>/.
+RESERVED_USERNAMES = ("me", "bulk")
+
+
+def get_user_or_404(username):
+    """Возвращает пользователя с заданным именем пользователя.
 
     Если пользователя не существует, выбрасывает Http404.
     """
 
     try:
-        User.objects.get(username__iexact=username)
+        return User.objects.get(
+            username_normalized=normalize_identifier(username)
+        )
     except User.DoesNotExist:
         raise Http404(f"Пользователь `{username}` не найден.")
 
 
-def check_username_email_pair(username, email):
-    """Проверка соответствия имени пользователя и адреса электронной почты.
+def find_signup_user(username, email):
+    """Поиск пользователя для регистрации одним запросом.
 
-    Если email не соответствует заданному пользователю,
-    выбрасывает ValidationError.
+    Возвращает существующего пользователя с этой парой имени и email
+    или None, если оба свободны. Если имя или email заняты другим
+    пользователем, выбрасывает ValidationError.
     """
 
-    try:
-        user = User.objects.get(username__iexact=username)
-    except User.DoesNotExist:
-        raise ValidationError({"message": "Username не существует"})
-    if user.email != email:
+    username = normalize_identifier(username)
+    email = normalize_identifier(email)
+    users = list(
+        User.objects.filter(
+            Q(username_normalized=username) | Q(email_normalized=email)
+        )[:2]
+    )
+    if not users:
+        return None
+    user = users[0]
+    if len(users) > 1 or user.username_normalized != username:
+        raise ValidationError(
+            {"message": "Пользователь с таким именем или почтой уже существует"}
+        )
+    if user.email_normalized != email:
         raise ValidationError({"message": "Неверный email"})
+    return user
 
 
 class CurrentTitleDefault(serializers.CurrentUserDefault):
@@ -52,14 +80,17 @@ class SignUpSerializer(serializers.ModelSerializer):
 
     def validate_username(self, username):
         """Проверка допустимости имени пользователя."""
-        if username.lower() == "me":
+        if username.lower() in RESERVED_USERNAMES:
             raise ValidationError({"message": "Недопустимый username"})
         return username
 
     def validate(self, data):
-        """Общая проверка валидности данных."""
-        if User.objects.filter(username__iexact=data["username"]).exists():
-            check_username_email_pair(data["username"], data["email"])
+        """Общая проверка валидности данных.
+
+        Найденный пользователь передаётся в представление
+        через validated_data["user"].
+        """
+        data["user"] = find_signup_user(data["username"], data["email"])
         return data
 
 
@@ -73,19 +104,17 @@ class EmailActivationSerializer(serializers.ModelSerializer):
         model = User
         fields = ("username", "confirmation_code")
 
-    def validate_username(self, username):
-        """Проверка существования имени пользователя."""
-        check_username_exists(username)
-        return username
-
     def validate(self, data):
-        """Проверка кода активации."""
-        try:
-            user = User.objects.get(username__iexact=data["username"])
-        except User.DoesNotExist:
-            raise ValidationError({"Ошибка": "Пользователь не найден"})
-        if data["confirmation_code"] != user.confirmation_code:
+        """Проверка существования пользователя и кода активации.
+
+        Найденный пользователь передаётся в представление
+        через validated_data["user"].
+        """
+        user = get_user_or_404(data["username"])
+        if not confirmation_codes.check(user.id, data["confirmation_code"]):
             raise ValidationError({"Ошибка": "Неверный код подтверждения"})
+        data["user"] = user
+        return data
 
 
 class AdminSerializer(serializers.ModelSerializer):
@@ -128,6 +157,37 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
 
 
+class UserBulkSerializer(serializers.Serializer):
+    """Сериализатор массовой операции над пользователями."""
+
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        allow_empty=False,
+        max_length=1000,
+    )
+    operation = serializers.ChoiceField(choices=OPERATION_CHOICES)
+    role = serializers.ChoiceField(choices=ROLE_CHOICES, required=False)
+
+    def validate(self, data):
+        """Для смены роли роль обязательна."""
+        if data["operation"] == OPERATION_SET_ROLE and "role" not in data:
+            raise serializers.ValidationError(
+                {"role": "Укажите роль для операции set_role"}
+            )
+        return data
+
+
+class FollowSerializer(serializers.ModelSerializer):
+    """Сериализатор подписки на автора."""
+
+    user = serializers.SlugRelatedField(slug_field="username", read_only=True)
+    author = serializers.SlugRelatedField(slug_field="username", read_only=True)
+
+    class Meta:
+        model = Follow
+        fields = ("user", "author")
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -140,11 +200,34 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ("id",)
 
 
+class SlugListRelatedField(serializers.ManyRelatedField):
+    """Список slug-ов, объекты которых ищутся одним запросом.
+
+    SlugRelatedField(many=True) ищет каждый slug отдельным запросом.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        child = self.child_relation
+        if not all(isinstance(slug, (str, int)) for slug in data):
+            child.fail("invalid")
+        slugs = [str(slug) for slug in data]
+        found = child.get_queryset().in_bulk(slugs, field_name=child.slug_field)
+        for slug in slugs:
+            if slug not in found:
+                child.fail("does_not_exist", slug_name=child.slug_field, value=slug)
+        return [found[slug] for slug in slugs]
+
+
 class TitleSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
-        slug_field="slug",
-        many=True,
+    genre = SlugListRelatedField(
+        child_relation=serializers.SlugRelatedField(
+            queryset=Genre.objects.all(),
+            slug_field="slug",
+        ),
     )
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
@@ -191,7 +274,18 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ("id", "text", "author", "title", "score", "pub_date")
+        fields = (
+            "id",
+            "text",
+            "author",
+            "title",
+            "score",
+            "pub_date",
+            "helpful_up",
+            "helpful_down",
+            "helpful_score",
+        )
+        read_only_fields = ("helpful_up", "helpful_down", "helpful_score")
         model = Review
         validators = [
             validators.UniqueTogetherValidator(
@@ -201,6 +295,19 @@ class ReviewSerializer(serializers.ModelSerializer):
             ),
         ]
 
+    def get_validators(self):
+        # Автор и произведение отзыва не меняются: уникальность пары
+        # проверяется только при создании.
+        if self.instance is not None:
+            return []
+        return super().get_validators()
+
+
+class ReviewVoteSerializer(serializers.Serializer):
+    """Сериализатор голоса за полезность отзыва."""
+
+    value = serializers.ChoiceField(choices=VOTE_CHOICES)
+
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -0,0 +1,168 @@
+import hashlib
+import threading
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from users.cache import LRUCache
+from users.models import normalize_identifier
+
+# Число частей хранилища корзин процесса, каждая со своей блокировкой.
+LOCAL_BUCKET_SHARDS = 16
+
+
+class LocalBucketStore:
+    """Хранилище корзин токенов в памяти процесса.
+
+    Состояние корзины - пара (токены, время обновления). Корзина,
+    не тронутая дольше периода, снова полна, поэтому записи живут
+    в LRU-кэше не дольше периода самого медленного ограничения.
+
+    Корзины разложены по частям со своими LRU-кэшем и блокировкой,
+    так что запросы с разными ключами не ждут друг друга. Блокировки
+    частей одного запроса берутся по возрастанию номера части.
+    """
+
+    def __init__(self, maxsize, ttl, shards=LOCAL_BUCKET_SHARDS):
+        shard_size = -(-maxsize // shards)
+        self._shards = [
+            (LRUCache(maxsize=shard_size, ttl=ttl), threading.Lock())
+            for _ in range(shards)
+        ]
+
+    def consume(self, keys, capacity, period, now):
+        indexes = [hash(key) % len(self._shards) for key in keys]
+        buckets = [self._shards[index][0] for index in indexes]
+        with ExitStack() as stack:
+            for index in sorted(set(indexes)):
+                stack.enter_context(self._shards[index][1])
+            tokens, wait = _take(
+                [bucket.get(key) for bucket, key in zip(buckets, keys)],
+                capacity,
+                period,
+                now,
+            )
+            for bucket, key, left in zip(buckets, keys, tokens):
+                bucket.set(key, (left, now))
+        return wait
+
+    def clear(self):
+        for buckets, _ in self._shards:
+            buckets.clear()
+
+
+class CacheBucketStore:
+    """Хранилище корзин токенов в кэше Django, общем для процессов.
+
+    Чтение и запись корзин не атомарны, поэтому при одновременных
+    запросах ограничение соблюдается приблизительно.
+    """
+
+    def __init__(self, cache_alias):
+        self.cache_alias = cache_alias
+
+    def consume(self, keys, capacity, period, now):
+        cache = caches[self.cache_alias]
+        states = cache.get_many(keys)
+        tokens, wait = _take(
+            [states.get(key) for key in keys], capacity, period, now
+        )
+        cache.set_many(
+            {key: (left, now) for key, left in zip(keys, tokens)}, timeout=period
+        )
+        return wait
+
+
+def _refill(state, capacity, period, now):
+    """Число токенов корзины с учётом пополнения за прошедшее время."""
+    if state is None:
+        return capacity
+    tokens, updated_at = state
+    return min(capacity, tokens + (now - updated_at) * capacity / period)
+
+
+def _take(states, capacity, period, now):
+    """Забирает по токену из каждой корзины, если токен есть во всех.
+
+    Возвращает новые числа токенов корзин и время ожидания следующего
+    токена (0, если запрос разрешён). Отклонённый запрос токенов
+    не забирает, и корзины сохранять не нужно - список пуст.
+    """
+    tokens = [_refill(state, capacity, period, now) for state in states]
+    wait = max(
+        [(1 - left) * period / capacity for left in tokens if left < 1],
+        default=0,
+    )
+    if wait:
+        return [], wait
+    return [left - 1 for left in tokens], 0
+
+
+def get_bucket_store():
+    if settings.AUTH_THROTTLE_CACHE is None:
+        return local_buckets
+    return CacheBucketStore(settings.AUTH_THROTTLE_CACHE)
+
+
+local_buckets = LocalBucketStore(
+    maxsize=settings.AUTH_THROTTLE_LOCAL_SIZE, ttl=24 * 60 * 60
+)
+
+
+def username_ident(username):
+    """Идентификатор корзины имени пользователя из тела запроса.
+
+    Имя приводится к тому же виду, по которому ищутся пользователи,
+    а в ключ попадает его хэш: длина ключа не зависит от присланной
+    строки.
+    """
+    normalized = normalize_identifier(username.strip())
+    return "user:" + hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class AuthRateThrottle(SimpleRateThrottle):
+    """Ограничение запросов к эндпоинтам аутентификации корзинами токенов.
+
+    Скорость задаётся как в DRF (`5/min`): ёмкость корзины - число
+    запросов, и столько же токенов восстанавливается за период.
+    Отдельные корзины ведутся для IP-адреса клиента и для имени
+    пользователя из тела запроса; запрос проходит, только если токен
+    нашёлся в обеих, и лишь тогда токены забираются.
+    """
+
+    def get_cache_keys(self, request):
+        keys = [
+            self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+        ]
+        data = request.data if isinstance(request.data, dict) else {}
+        username = data.get("username")
+        if isinstance(username, str) and username.strip():
+            keys.append(
+                self.cache_format
+                % {"scope": self.scope, "ident": username_ident(username)}
+            )
+        return keys
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self._wait = get_bucket_store().consume(
+            self.get_cache_keys(request),
+            self.num_requests,
+            self.duration,
+            self.timer(),
+        )
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
+
+
+class SignUpRateThrottle(AuthRateThrottle):
+    scope = "signup"
+
+
+class TokenRateThrottle(AuthRateThrottle):
+    scope = "token"
@@ -1,7 +1,5 @@
 from django.db import IntegrityError
-from django.db.models import Avg
 from django.shortcuts import get_object_or_404
-from django.core.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import mixins, permissions, status, viewsets
@@ -10,7 +8,7 @@ from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api.filters import TitleFilter
+from api.filters import ReviewOrderingFilter, TitleFilter, UserSearchFilter
 from api.permissions import (
     AdminOrReadOnly,
     AdminWriteOnly,
@@ -21,16 +19,29 @@ from api.serializers import (
     CategorySerializer,
     CommentSerializer,
     EmailActivationSerializer,
+    FollowSerializer,
     GenreSerializer,
     ReviewSerializer,
+    ReviewVoteSerializer,
     SignUpSerializer,
     TitleReadSerializer,
     TitleSerializer,
+    UserBulkSerializer,
     UserProfileSerializer,
 )
+from api.throttling import SignUpRateThrottle, TokenRateThrottle
 from reviews.models import Category, Genre, Review, Title
+from reviews.timeline import (
+    follow_author,
+    get_timeline,
+    schedule_fanout,
+    unfollow_author,
+)
+from reviews.votes import cast_vote, retract_vote
 from users.authorization import get_token, send_mail_with_code
-from users.models import User
+from users.bulk import apply_bulk_operation
+from users.codes import confirmation_codes
+from users.models import Follow, User
 
 
 class SignUp(APIView):
@@ -41,6 +52,8 @@ class SignUp(APIView):
     --------
     permission_classes : tuple
         классы разрешений для доступа к представлению
+    throttle_classes : tuple
+        ограничения частоты запросов по IP и имени пользователя
 
     Методы
     ------
@@ -49,23 +62,28 @@ class SignUp(APIView):
     """
 
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (SignUpRateThrottle,)
+    # Поиск пользователя по имени и почте и INSERT нового; триграммы
+    # имени и письмо - фоновые задачи.
+    query_budgets = {"post": 2}
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        try:
-            # Пытаемся получить/создать пользователя с указанными именем/почтой
-            user = User.objects.get_or_create(
-                username=serializer.validated_data["username"],
-                email=serializer.validated_data["email"],
-            )[0]
-        except IntegrityError:
-            return Response(
-                "Пользователь с таким именем или почтой уже существует.",
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        user.confirmation_code = send_mail_with_code(request.data)
-        user.save()
+        user = serializer.validated_data["user"]
+        if user is None:
+            try:
+                # Имя и почта свободны: создаём пользователя одним INSERT
+                user = User.objects.create(
+                    username=serializer.validated_data["username"],
+                    email=serializer.validated_data["email"],
+                )
+            except IntegrityError:
+                return Response(
+                    "Пользователь с таким именем или почтой уже существует.",
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        confirmation_codes.set(user.id, send_mail_with_code(request.data))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -77,6 +95,8 @@ class EmailActivation(APIView):
     --------
     permission_classes : tuple
         классы разрешений для доступа к представлению
+    throttle_classes : tuple
+        ограничения частоты запросов по IP и имени пользователя
 
     Методы
     ------
@@ -85,16 +105,14 @@ class EmailActivation(APIView):
     """
 
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenRateThrottle,)
+    query_budgets = {"post": 1}
 
     def post(self, request):
         serializer = EmailActivationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        try:
-            user = User.objects.get(
-                username__iexact=serializer.validated_data["username"]
-            )
-        except User.DoesNotExist:
-            raise ValidationError({"Ошибка": "Пользователь не найден"})
+        user = serializer.validated_data["user"]
+        confirmation_codes.discard(user.id)
         token = get_token(user)
         return Response({"token": token}, status=status.HTTP_201_CREATED)
 
@@ -112,11 +130,10 @@ class UserViewSet(viewsets.ModelViewSet):
     permission_classes : tuple
         классы разрешений для доступа к представлению
     filter_backends : tuple
-        классы фильтрации для запросов
+        классы фильтрации для запросов: поиск по имени пользователя
+        с ранжированием (точное совпадение, префикс, подстрока)
     lookup_field : str
         поле для поиска пользователя
-    search_fields : tuple
-        поля для поиска
     http_method_names : list
         поддерживаемые HTTP-методы
 
@@ -125,16 +142,37 @@ class UserViewSet(viewsets.ModelViewSet):
     my_profile(request):
         Позволяет просматривать и редактировать свой профиль.
         Доступно только аутентифицированным пользователям.
+    follow(request, username):
+        Подписывает текущего пользователя на автора или отменяет подписку.
+    timeline(request):
+        Возвращает ленту отзывов авторов, на которых подписан пользователь.
+    bulk(request):
+        Меняет роль, блокирует или удаляет список пользователей
+        одной транзакцией. Доступно только администратору.
 
     """
 
     queryset = User.objects.all()
     serializer_class = AdminSerializer
     permission_classes = (AdminWriteOnly,)
-    filter_backends = (SearchFilter,)
+    filter_backends = (UserSearchFilter,)
     lookup_field = "username"
-    search_fields = ("username",)
     http_method_names = ["get", "post", "head", "patch", "delete"]
+    query_budgets = {
+        "list": 3,
+        "retrieve": 2,
+        "create": 4,
+        "partial_update": 3,
+        # Каскадное удаление - по DELETE на каждую из девяти таблиц
+        # со ссылками на пользователя, плюс пересчёт подписчиков.
+        "destroy": 15,
+        "my_profile": 3,
+        "timeline": 5,
+        # Тот же каскад, что у destroy, одним DELETE на таблицу
+        # для всех пользователей пачки.
+        "bulk": 16,
+        "follow": 7,
+    }
 
     @action(
         detail=False,
@@ -144,6 +182,11 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated,),
     )
     def my_profile(self, request):
+        deferred = request.user.get_deferred_fields()
+        if deferred:
+            # Пользователь из кэша аутентификации: догружаем профиль
+            # одним запросом.
+            request.user.refresh_from_db(fields=deferred)
         serializer = UserProfileSerializer(request.user)
         if request.method == "PATCH":
             # При PATCH-запросе профиль можно частично обновить.
@@ -155,6 +198,65 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="me/timeline",
+        url_name="timeline",
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def timeline(self, request):
+        page = self.paginate_queryset(get_timeline(request.user))
+        reviews = Review.objects.select_related("author", "title").in_bulk(
+            [review_id for _, review_id in page]
+        )
+        serializer = ReviewSerializer(
+            [reviews[review_id] for _, review_id in page if review_id in reviews],
+            many=True,
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        serializer = UserBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = apply_bulk_operation(
+            request.user,
+            serializer.validated_data["usernames"],
+            serializer.validated_data["operation"],
+            serializer.validated_data.get("role"),
+        )
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(
+        detail=True,
+        methods=["post", "delete"],
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def follow(self, request, username=None):
+        author = self.get_object()
+        if request.method == "DELETE":
+            if not unfollow_author(request.user, author):
+                return Response(
+                    "Вы не подписаны на этого пользователя.",
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        if author == request.user:
+            return Response(
+                "Нельзя подписаться на самого себя.",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not follow_author(request.user, author):
+            return Response(
+                "Вы уже подписаны на этого пользователя.",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = FollowSerializer(
+            Follow(user=request.user, author=author)
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 class CategoryGenreBaseViewSet(
     viewsets.GenericViewSet,
@@ -170,6 +272,7 @@ class CategoryGenreBaseViewSet(
     filter_backends = (SearchFilter,)
     lookup_field = "slug"
     search_fields = ("name",)
+    query_budgets = {"list": 2, "create": 3, "destroy": 4}
 
 
 class CategoryViewSet(CategoryGenreBaseViewSet):
@@ -198,12 +301,31 @@ class TitleViewSet(viewsets.ModelViewSet):
     Позволяет просматривать, создавать, изменять и удалять произведения.
     """
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score")).order_by("name")
+    queryset = (
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
+        .order_by("name")
+    )
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     serializer_class = TitleSerializer
     http_method_names = ["get", "post", "delete", "patch"]
+    query_budgets = {
+        "list": 3,
+        "retrieve": 3,
+        # genre.set() - четыре запроса: транзакция, выборка текущих
+        # и уже связанных жанров, INSERT связей.
+        "create": 9,
+        "partial_update": 6,
+        "destroy": 8,
+    }
+
+    def get_queryset(self):
+        if self.action == "destroy":
+            # Жанры и категория удаляемому произведению не нужны.
+            return Title.objects.all()
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -214,20 +336,73 @@ class TitleViewSet(viewsets.ModelViewSet):
 class ReviewViewSet(viewsets.ModelViewSet):
     """
     Представление для управления отзывов.
+    Поддерживает сортировку `?ordering=-helpful` и голосование
+    за полезность отзыва.
     """
 
     serializer_class = ReviewSerializer
     permission_classes = (AuthorOrStaffWriteOrReadOnly,)
+    filter_backends = (ReviewOrderingFilter,)
+    # Без ?ordering - сначала новые; id делает пагинацию устойчивой.
+    ordering = ("-pub_date", "-id")
     http_method_names = ["get", "post", "delete", "patch"]
+    # Запись отзыва сдвигает сводку произведения (reviews.signals):
+    # до пяти запросов к TitleScore и Title в транзакции.
+    query_budgets = {
+        "list": 4,
+        "retrieve": 2,
+        "create": 10,
+        "partial_update": 10,
+        # Каскад по голосам, комментариям и записям лент.
+        "destroy": 10,
+        # get_or_create голоса - SELECT и INSERT в точке сохранения.
+        "vote": 9,
+    }
 
     def get_title(self):
         return get_object_or_404(Title, id=self.kwargs.get("title_id"))
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        if self.detail:
+            # Отзыв ищется сразу по произведению из адреса: несуществующее
+            # произведение даёт тот же 404 без отдельного запроса.
+            return Review.objects.filter(
+                title_id=self.kwargs.get("title_id")
+            ).select_related("author", "title")
+        return self.get_title().reviews.select_related("author", "title")
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        review = serializer.save(author=self.request.user, title=self.get_title())
+        schedule_fanout(review)
+
+    @action(
+        detail=True,
+        methods=["post", "delete"],
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def vote(self, request, title_id=None, pk=None):
+        review = self.get_object()
+        if request.method == "DELETE":
+            if not retract_vote(request.user, review):
+                return Response(
+                    "Вы не голосовали за этот отзыв.",
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        else:
+            if review.author_id == request.user.id:
+                return Response(
+                    "Нельзя голосовать за свой отзыв.",
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            serializer = ReviewVoteSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            cast_vote(request.user, review, serializer.validated_data["value"])
+        review.refresh_from_db(
+            fields=("helpful_up", "helpful_down", "helpful_score")
+        )
+        return Response(
+            ReviewSerializer(review).data, status=status.HTTP_200_OK
+        )
 
 
 class CommentViewSet(viewsets.ModelViewSet):
@@ -238,12 +413,19 @@ class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (AuthorOrStaffWriteOrReadOnly,)
     http_method_names = ["get", "post", "delete", "patch"]
+    query_budgets = {
+        "list": 4,
+        "retrieve": 3,
+        "create": 3,
+        "partial_update": 4,
+        "destroy": 4,
+    }
 
     def get_review(self):
         return get_object_or_404(Review, id=self.kwargs.get("review_id"))
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related("author")
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
@@ -0,0 +1,87 @@
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections
+
+from api_yamdb.queries import uncounted_queries
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWorker:
+    """Фоновые потоки, выполняющие задачи из ограниченной очереди.
+
+    Потоки запускаются при первой задаче. Если очередь переполнена,
+    задача выполняется в вызывающем потоке.
+    """
+
+    def __init__(self, name, maxsize, workers=1):
+        self.name = name
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args):
+        """Ставит задачу в очередь.
+
+        Возвращает False, если очередь переполнена и задача выполнена
+        в вызывающем потоке.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((func, args))
+        except queue.Full:
+            logger.warning(
+                "%s queue is full, running %s inline", self.name, func.__name__
+            )
+            func(*args)
+            return False
+        return True
+
+    def run_inline(self, func, *args):
+        """Выполняет задачу в вызывающем потоке, когда фоновый режим выключен.
+
+        Запросы задачи не входят в счётчики запросов обработки запроса:
+        в рабочем режиме их выполняет фоновый поток.
+        """
+        with uncounted_queries():
+            func(*args)
+
+    def join(self):
+        """Ждёт выполнения всех поставленных в очередь задач."""
+        self._queue.join()
+
+    def _ensure_started(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                name = self.name
+                if self.workers > 1:
+                    name = f"{self.name}-{len(self._threads)}"
+                thread = threading.Thread(target=self._run, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_tasks(self):
+        """Задачи одного прохода потока: ждёт первую из очереди."""
+        return [self._queue.get()]
+
+    def _execute(self, tasks):
+        for func, args in tasks:
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("%s task %s failed", self.name, func.__name__)
+
+    def _run(self):
+        while True:
+            tasks = self._next_tasks()
+            close_old_connections()
+            try:
+                self._execute(tasks)
+            finally:
+                close_old_connections()
+                for _ in tasks:
+                    self._queue.task_done()
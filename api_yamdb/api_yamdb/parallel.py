@@ -0,0 +1,26 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def ordered_map(function, tasks, workers):
+    """Выполняет function для задач в пуле процессов, сохраняя их порядок.
+
+    tasks - итератор пар (ключ, аргументы); отдаются пары (ключ,
+    результат). Задачи берутся из итератора по мере выполнения: в работе
+    одновременно не больше 2 * workers задач, поэтому память не растёт
+    с их числом. При workers <= 1 задачи выполняются в текущем процессе.
+    """
+    if workers <= 1:
+        for key, args in tasks:
+            yield key, function(*args)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for key, args in tasks:
+            pending.append((key, executor.submit(function, *args)))
+            if len(pending) >= 2 * workers:
+                key, future = pending.popleft()
+                yield key, future.result()
+        while pending:
+            key, future = pending.popleft()
+            yield key, future.result()
@@ -0,0 +1,159 @@
+"""Профилирование отдельных запросов по требованию.
+
+Запрос профилируется, если в заголовке X-Profile передан секретный
+PROFILING_TOKEN или если он попал в случайную выборку с долей
+PROFILING_SAMPLE_RATE. Профиль пишется в каталог PROFILING_DIR, где
+хранятся не больше PROFILING_MAX_FILES последних файлов. В имени
+файла - время, имя представления, длительность запроса, число
+SQL-запросов и время в базе.
+
+Режим PROFILING_MODE = "cprofile" сохраняет статистику cProfile
+(читается модулем pstats или snakeviz), режим "sampling" снимает стек
+потока запроса раз в PROFILING_SAMPLING_INTERVAL секунд и сохраняет
+свёрнутые стеки ("a;b;c число") для flamegraph.pl или speedscope.
+Сэмплирование почти не замедляет запрос, но видит только долгие
+участки.
+"""
+import cProfile
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from api_yamdb.queries import QueryCounter
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_FILE_HEADER = "X-Profile-File"
+UNSAFE_CHARACTERS_RE = re.compile(r"[^\w.-]+")
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик текущего потока.
+
+    Фоновый поток раз в interval секунд снимает стек профилируемого
+    потока через sys._current_frames() и считает одинаковые стеки.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread_id = None
+        self._sampler = None
+
+    def enable(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._sampler.start()
+
+    def disable(self):
+        self._stopped.set()
+        self._sampler.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{os.path.basename(code.co_filename)}:{code.co_name}"
+                    f":{code.co_firstlineno}"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump_stats(self, path):
+        with open(path, "w", encoding="utf-8") as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+
+
+PROFILERS = {
+    "cprofile": (cProfile.Profile, "prof"),
+    "sampling": (
+        lambda: SamplingProfiler(settings.PROFILING_SAMPLING_INTERVAL),
+        "collapsed",
+    ),
+}
+
+
+def rotate(directory, max_files):
+    """Удаляет самые старые профили, оставляя max_files последних."""
+    names = sorted(os.listdir(directory))
+    for name in names[: max(len(names) - max_files, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+class ProfilingMiddleware:
+    """Профилирует запросы с токеном в X-Profile или из случайной выборки.
+
+    Без PROFILING_TOKEN и PROFILING_SAMPLE_RATE Django убирает
+    middleware из цепочки. Непрофилируемый запрос стоит одной проверки
+    заголовка и одного случайного числа.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_TOKEN and not settings.PROFILING_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = self.has_token(request)
+        if not requested and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        make_profiler, extension = PROFILERS[settings.PROFILING_MODE]
+        profiler = make_profiler()
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        name = self.file_name(request, elapsed, queries, extension)
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(settings.PROFILING_DIR, name))
+        rotate(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+        if requested:
+            response[PROFILE_FILE_HEADER] = name
+        return response
+
+    def has_token(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        return bool(
+            token
+            and settings.PROFILING_TOKEN
+            and secrets.compare_digest(
+                token.encode(), settings.PROFILING_TOKEN.encode()
+            )
+        )
+
+    def file_name(self, request, elapsed, queries, extension):
+        """Имя файла профиля: время, представление и итоги запроса."""
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        tag = UNSAFE_CHARACTERS_RE.sub("_", f"{view}.{request.method}")
+        return (
+            f"{datetime.now():%Y%m%dT%H%M%S.%f}-{tag}-{elapsed * 1000:.0f}ms"
+            f"-{queries.count}q-{queries.seconds * 1000:.0f}ms-sql.{extension}"
+        )
@@ -0,0 +1,45 @@
+import threading
+import time
+from contextlib import contextmanager
+
+_uncounted = threading.local()
+
+
+@contextmanager
+def uncounted_queries():
+    """Запросы текущего потока внутри блока не учитываются QueryCounter.
+
+    Так фоновые задачи, выполненные в потоке запроса (в тестах), не входят
+    в число запросов его обработки - как и в рабочем режиме.
+    """
+    _uncounted.depth = getattr(_uncounted, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _uncounted.depth -= 1
+
+
+class QueryCounter:
+    """Счётчик SQL-запросов соединения и времени их выполнения.
+
+    Подключается через connection.execute_wrapper. В отличие от
+    CaptureQueriesContext, не включает сохранение всех запросов
+    в connection.queries.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_uncounted, "depth", 0):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - started)
+
+    def record(self, sql, seconds):
+        self.count += 1
+        self.seconds += seconds
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -26,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api_yamdb.profiling.ProfilingMiddleware",
+    "api.query_budget.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,6 +66,21 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Коды подтверждения (users.codes): кэш, общий для всех процессов
+    # и переживающий их перезапуск. В рабочем окружении - memcached или
+    # redis; MAX_ENTRIES - с запасом на все коды, выданные за
+    # CONFIRMATION_CODE_TTL, иначе кэш вытеснит ещё действующие коды.
+    "confirmation_codes": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(tempfile.gettempdir(), "yamdb-confirmation-codes"),
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -94,21 +112,95 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, "static/"),)
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
+    "DEFAULT_THROTTLE_RATES": {
+        "signup": "5/min",
+        "token": "10/min",
+    },
+    # Число прокси перед приложением: ограничения запросов берут IP-адрес
+    # клиента из X-Forwarded-For только за доверенными прокси, иначе -
+    # из REMOTE_ADDR. За балансировщиком укажите число его звеньев.
+    "NUM_PROXIES": 0,
 }
 
+# Хранилище корзин токенов для api.throttling: None - память процесса,
+# иначе алиас общего для всех процессов кэша из CACHES.
+AUTH_THROTTLE_CACHE = None
+AUTH_THROTTLE_LOCAL_SIZE = 100000
+
+# Бюджеты SQL-запросов представлений (api.query_budget): при включённой
+# проверке превышения пишутся в лог, а с QUERY_BUDGET_RAISE - вызывают
+# исключение (так бюджеты проверяются в тестах).
+QUERY_BUDGET_ENABLED = False
+QUERY_BUDGET_RAISE = False
+
+# Профилирование запросов (api_yamdb.profiling): запрос профилируется, если
+# в заголовке X-Profile передан PROFILING_TOKEN или он попал в случайную
+# выборку с долей PROFILING_SAMPLE_RATE. Без токена и выборки отключено.
+PROFILING_TOKEN = None
+PROFILING_SAMPLE_RATE = 0.0
+# "cprofile" - статистика pstats, "sampling" - свёрнутые стеки.
+PROFILING_MODE = "cprofile"
+PROFILING_SAMPLING_INTERVAL = 0.001
+# Каталог профилей вне дерева исходников.
+PROFILING_DIR = os.path.join(tempfile.gettempdir(), "yamdb-profiles")
+PROFILING_MAX_FILES = 100
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
 AUTH_USER_MODEL = "users.User"
+
+# Триграммный индекс имён пользователей для поиска по подстроке (users.search).
+# Триграммы обновляются фоновым потоком, чтобы не нагружать регистрацию.
+USER_SEARCH_NGRAM = True
+USER_SEARCH_INDEX_ASYNC = True
+USER_SEARCH_INDEX_QUEUE_SIZE = 10000
+
+# Кэш пользователей для JWT-аутентификации (users.authentication).
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60
+# Сколько секунд после выпуска токена права берутся из его утверждений
+# без обращения к базе. Понижение роли в другом процессе вступает в силу
+# не позже чем через это время.
+ROLE_CLAIMS_MAX_AGE = 300
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 DEFAULT_FROM_EMAIL = "do_not_reply@yamdb.ru"
+
+# Фоновая отправка писем с кодом подтверждения (users.mailing).
+CONFIRMATION_EMAIL_ASYNC = True
+CONFIRMATION_EMAIL_WORKERS = 2
+CONFIRMATION_EMAIL_QUEUE_SIZE = 10000
+CONFIRMATION_EMAIL_BATCH_SIZE = 50
+CONFIRMATION_EMAIL_RETRIES = 3
+CONFIRMATION_EMAIL_RETRY_BACKOFF = 0.5
+
+# Коды подтверждения хранятся в кэше (users.codes) и истекают через TTL секунд.
+# Кэш в памяти процесса не допускается (проверка users.E001).
+CONFIRMATION_CODE_CACHE = "confirmation_codes"
+CONFIRMATION_CODE_TTL = 60 * 60
+
+# Лента подписок: рассылка новых отзывов подписчикам (fan-out-on-write).
+# Отзывы авторов, у которых подписчиков не меньше TIMELINE_FANOUT_MAX_FOLLOWERS,
+# не раскладываются по лентам, а подмешиваются при чтении.
+TIMELINE_FANOUT_ASYNC = True
+TIMELINE_FANOUT_BATCH_SIZE = 500
+TIMELINE_FANOUT_QUEUE_SIZE = 1000
+TIMELINE_FANOUT_MAX_FOLLOWERS = 10000
+TIMELINE_BACKFILL_SIZE = 20
+
+# Манифест csv_import: хэш, число строк и последний id каждого файла.
+# Файлы, не изменившиеся с прошлого импорта, пропускаются. Манифест
+# описывает содержимое базы, поэтому лежит рядом с ней (в .gitignore).
+CSV_IMPORT_MANIFEST = os.path.join(BASE_DIR, "csv_import_manifest.json")
+# Размер кэша страниц SQLite (КиБ) в режиме csv_import --bulk-load.
+CSV_IMPORT_SQLITE_CACHE_KIB = 256 * 1024
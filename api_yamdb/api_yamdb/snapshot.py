@@ -0,0 +1,288 @@
+"""Колоночные двоичные снимки таблиц приложений users и reviews.
+
+Формат файла:
+
+    MAGIC | блоки столбцов | оглавление (JSON) | длина оглавления | MAGIC
+
+Каждый столбец таблицы хранится отдельным типизированным массивом
+(little-endian, выравнивание по 8 байт): целые и даты - int64 (даты -
+микросекунды от начала эпохи в UTC), логические - int8, дробные -
+float64. Строки столбца лежат подряд в одной таблице строк UTF-8,
+а массив int64 хранит их смещения. Для столбцов с NULL есть маска int8.
+Оглавление в конце файла хранит модели, число строк и положение блоков,
+поэтому снимок пишется потоком, таблица за таблицей, а читается через
+mmap без копирования массивов.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from django.apps import apps
+
+MAGIC = b"YAMDBSN1"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+SNAPSHOT_APPS = ("users", "reviews")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+FIELD_KINDS = {
+    "AutoField": "int",
+    "BigAutoField": "int",
+    "SmallAutoField": "int",
+    "IntegerField": "int",
+    "BigIntegerField": "int",
+    "SmallIntegerField": "int",
+    "PositiveIntegerField": "int",
+    "PositiveBigIntegerField": "int",
+    "PositiveSmallIntegerField": "int",
+    "ForeignKey": "int",
+    "OneToOneField": "int",
+    "BooleanField": "bool",
+    "FloatField": "float",
+    "DateTimeField": "datetime",
+    "CharField": "string",
+    "SlugField": "string",
+    "TextField": "string",
+}
+TYPECODES = {"int": "q", "bool": "b", "float": "d", "datetime": "q"}
+EMPTY_VALUES = {"int": 0, "bool": False, "float": 0.0, "datetime": EPOCH, "string": ""}
+
+
+def _app_models():
+    return [
+        model
+        for label in SNAPSHOT_APPS
+        for model in apps.get_app_config(label).get_models(include_auto_created=True)
+    ]
+
+
+def _inside_snapshot(model):
+    """Все внешние ключи модели ведут в таблицы приложений снимка."""
+    return all(
+        field.related_model._meta.app_label in SNAPSHOT_APPS
+        for field in model._meta.concrete_fields
+        if field.is_relation
+    )
+
+
+def snapshot_models():
+    """Модели снимка, включая промежуточные таблицы связей многие-ко-многим.
+
+    Связи с моделями вне снимка (группы и права пользователей из auth)
+    не сохраняются: их строки ссылаются на таблицы, которых в снимке нет.
+    """
+    return [model for model in _app_models() if _inside_snapshot(model)]
+
+
+def detached_models():
+    """Модели приложений снимка со ссылками на таблицы вне его.
+
+    При восстановлении снимка их таблицы очищаются: строки ссылаются
+    на пользователей, которых заменил снимок.
+    """
+    return [model for model in _app_models() if not _inside_snapshot(model)]
+
+
+def field_kind(field):
+    kind = FIELD_KINDS.get(field.get_internal_type())
+    if kind is None:
+        raise ValueError(
+            f"{field.model._meta.label}.{field.name}: "
+            f"{field.get_internal_type()} is not supported by snapshots"
+        )
+    return kind
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class ColumnBuffer:
+    """Накопитель значений одного столбца при записи снимка."""
+
+    def __init__(self, kind, nullable):
+        self.kind = kind
+        self.nulls = array("b") if nullable else None
+        if kind == "string":
+            self.offsets = array("q", [0])
+            self.data = bytearray()
+        else:
+            self.values = array(TYPECODES[kind])
+
+    def append(self, value):
+        if self.nulls is not None:
+            self.nulls.append(value is None)
+        if value is None:
+            value = EMPTY_VALUES[self.kind]
+        if self.kind == "string":
+            self.data += value.encode("utf-8")
+            self.offsets.append(len(self.data))
+        elif self.kind == "datetime":
+            self.values.append((value - EPOCH) // MICROSECOND)
+        else:
+            self.values.append(value)
+
+    def blocks(self):
+        if self.kind == "string":
+            yield "offsets", _little_endian(self.offsets)
+            yield "data", self.data
+        else:
+            yield "values", _little_endian(self.values)
+        if self.nulls is not None:
+            yield "nulls", self.nulls
+
+
+def _write_block(snapshot_file, block):
+    position = snapshot_file.tell()
+    padding = -position % ALIGNMENT
+    snapshot_file.write(b"\0" * padding)
+    snapshot_file.write(block)
+    return [position + padding, snapshot_file.tell() - position - padding]
+
+
+def write_snapshot(path, models, chunk_size=2000):
+    """Записывает таблицы моделей в файл снимка.
+
+    Строки читаются курсором порциями по chunk_size; в памяти
+    находятся столбцы только одной таблицы. Возвращает оглавление.
+    """
+    tables = []
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(MAGIC)
+        for model in models:
+            fields = model._meta.concrete_fields
+            buffers = [ColumnBuffer(field_kind(field), field.null) for field in fields]
+            rows = 0
+            queryset = (
+                model._base_manager.order_by("pk")
+                .values_list(*[field.attname for field in fields])
+                .iterator(chunk_size=chunk_size)
+            )
+            for row in queryset:
+                for buffer, value in zip(buffers, row):
+                    buffer.append(value)
+                rows += 1
+            tables.append(
+                {
+                    "model": model._meta.label,
+                    "table": model._meta.db_table,
+                    "rows": rows,
+                    "columns": [
+                        {
+                            "name": field.column,
+                            "kind": buffer.kind,
+                            "blocks": {
+                                role: _write_block(snapshot_file, block)
+                                for role, block in buffer.blocks()
+                            },
+                        }
+                        for field, buffer in zip(fields, buffers)
+                    ],
+                }
+            )
+        contents = json.dumps({"version": FORMAT_VERSION, "tables": tables}).encode()
+        snapshot_file.write(contents)
+        snapshot_file.write(struct.pack("<Q", len(contents)))
+        snapshot_file.write(MAGIC)
+    return tables
+
+
+class Snapshot:
+    """Снимок, открытый только для чтения через mmap.
+
+    Столбцы читаются прямо из отображённого файла: числовые массивы -
+    как memoryview без копирования, строки - срезами таблицы строк.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        tail = len(MAGIC) + 8
+        if (
+            len(self._map) < len(MAGIC) + tail
+            or self._map[: len(MAGIC)] != MAGIC
+            or self._map[-len(MAGIC):] != MAGIC
+        ):
+            self.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        (length,) = struct.unpack("<Q", self._map[-tail:-len(MAGIC)])
+        contents = json.loads(self._map[-tail - length:-tail])
+        if contents["version"] != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {contents['version']}")
+        self.tables = contents["tables"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+    def _block(self, location, typecode=None):
+        offset, size = location
+        view = memoryview(self._map)[offset:offset + size]
+        self._views.append(view)
+        if typecode is None:
+            return view
+        if sys.byteorder == "big":
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return values
+        view = view.cast(typecode)
+        self._views.append(view)
+        return view
+
+    def column(self, column, adapt_datetime=None):
+        """Итератор значений столбца из оглавления снимка.
+
+        Даты отдаются как datetime в UTC или, если задан adapt_datetime,
+        в виде, который вернула эта функция.
+        """
+        kind = column["kind"]
+        blocks = column["blocks"]
+        if kind == "string":
+            values = self._strings(
+                self._block(blocks["offsets"], "q"), self._block(blocks["data"])
+            )
+        else:
+            values = iter(self._block(blocks["values"], TYPECODES[kind]))
+            if kind == "bool":
+                values = map(bool, values)
+            elif kind == "datetime":
+                values = (EPOCH + microseconds * MICROSECOND for microseconds in values)
+                if adapt_datetime is not None:
+                    values = map(adapt_datetime, values)
+        if "nulls" in blocks:
+            nulls = self._block(blocks["nulls"], "b")
+            values = (None if null else value for value, null in zip(values, nulls))
+        return values
+
+    @staticmethod
+    def _strings(offsets, data):
+        for index in range(len(offsets) - 1):
+            yield str(data[offsets[index]:offsets[index + 1]], "utf-8")
+
+    def rows(self, table, adapt_datetime=None):
+        """Итератор кортежей значений строк таблицы в порядке столбцов."""
+        return zip(
+            *[
+                self.column(column, adapt_datetime)
+                for column in table["columns"]
+            ]
+        )
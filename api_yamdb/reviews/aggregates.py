@@ -0,0 +1,237 @@
+"""Пересчёт сводок по отзывам.
+
+Сводка произведения - рейтинг, число отзывов, дата последнего отзыва
+и распределение оценок (TitleScore); сводка отзыва - счётчики голосов
+за его полезность. Сводки пересчитываются пачками по диапазонам id:
+на пачку приходится один запрос GROUP BY к отзывам или голосам, один
+запрос текущих значений и запись только изменившихся строк.
+
+Отдельный отзыв не пересчитывает сводку целиком: shift_title_score
+сдвигает её F()-выражениями на добавленную или убранную оценку.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+from reviews.models import (
+    VOTE_DOWN,
+    VOTE_UP,
+    Review,
+    ReviewVote,
+    Title,
+    TitleScore,
+)
+
+DEFAULT_BATCH_SIZE = 1000
+TITLE_FIELDS = ["rating", "review_count", "last_review_date"]
+REVIEW_FIELDS = ["helpful_up", "helpful_down", "helpful_score"]
+
+
+def id_batches(model, batch_size):
+    """Отдаёт id строк модели по возрастанию списками по batch_size."""
+    last_id = 0
+    while True:
+        ids = list(
+            model.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def recompute_titles(title_ids):
+    """Пересчитывает сводки произведений title_ids.
+
+    Возвращает Counter с числом изменённых произведений (titles)
+    и созданных, изменённых или удалённых строк TitleScore
+    (title_scores).
+    """
+    groups = (
+        Review.objects.filter(title_id__in=title_ids)
+        .values("title_id", "score")
+        .annotate(count=Count("id"), last_review_date=Max("pub_date"))
+        .order_by()
+    )
+    scores = {}
+    totals = {}
+    for group in groups:
+        title_id = group["title_id"]
+        scores[title_id, group["score"]] = group["count"]
+        count, score_sum, last_review_date = totals.get(title_id, (0, 0, None))
+        if last_review_date is None or group["last_review_date"] > last_review_date:
+            last_review_date = group["last_review_date"]
+        totals[title_id] = (
+            count + group["count"],
+            score_sum + group["score"] * group["count"],
+            last_review_date,
+        )
+
+    changes = Counter()
+    changed_titles = []
+    for current in Title.objects.filter(pk__in=title_ids).values(
+        "pk", *TITLE_FIELDS
+    ):
+        count, score_sum, last_review_date = totals.get(current["pk"], (0, 0, None))
+        expected = {
+            "rating": score_sum / count if count else None,
+            "review_count": count,
+            "last_review_date": last_review_date,
+        }
+        if any(current[field] != expected[field] for field in TITLE_FIELDS):
+            changed_titles.append(Title(pk=current["pk"], **expected))
+    Title.objects.bulk_update(changed_titles, TITLE_FIELDS)
+    changes["titles"] = len(changed_titles)
+
+    to_update = []
+    to_delete = []
+    for pk, title_id, score, count in TitleScore.objects.filter(
+        title_id__in=title_ids
+    ).values_list("pk", "title_id", "score", "count"):
+        expected = scores.pop((title_id, score), None)
+        if expected is None:
+            to_delete.append(pk)
+        elif expected != count:
+            to_update.append(TitleScore(pk=pk, count=expected))
+    to_create = [
+        TitleScore(title_id=title_id, score=score, count=count)
+        for (title_id, score), count in scores.items()
+    ]
+    TitleScore.objects.bulk_create(to_create)
+    TitleScore.objects.bulk_update(to_update, ["count"])
+    TitleScore.objects.filter(pk__in=to_delete).delete()
+    changes["title_scores"] = len(to_create) + len(to_update) + len(to_delete)
+    return changes
+
+
+def _add_score(title_id, score):
+    scores = TitleScore.objects.filter(title_id=title_id, score=score)
+    if not scores.update(count=F("count") + 1):
+        # Первая такая оценка: строку создаём с нулём, чтобы одновременное
+        # создание не потеряло ни одного отзыва.
+        TitleScore.objects.bulk_create(
+            [TitleScore(title_id=title_id, score=score, count=0)],
+            ignore_conflicts=True,
+        )
+        scores.update(count=F("count") + 1)
+
+
+def _remove_score(title_id, score):
+    scores = TitleScore.objects.filter(title_id=title_id, score=score)
+    scores.update(count=F("count") - 1)
+    scores.filter(count=0).delete()
+
+
+def shift_title_score(title_id, added=None, removed=None, pub_date=None):
+    """Сдвигает сводку произведения на одну добавленную и/или убранную оценку.
+
+    Строки TitleScore и число отзывов меняются F()-выражениями, рейтинг
+    вычисляется в том же UPDATE по строкам TitleScore. pub_date - дата
+    добавленного или убранного отзыва (при замене оценки не нужна).
+    """
+    changes = {
+        "rating": Subquery(
+            TitleScore.objects.filter(title_id=OuterRef("pk"))
+            .order_by()
+            .values("title_id")
+            .annotate(
+                rating=Cast(Sum(F("score") * F("count")), FloatField())
+                / Cast(Sum("count"), FloatField())
+            )
+            .values("rating")
+        ),
+    }
+    if added is not None and removed is None:
+        changes["review_count"] = F("review_count") + 1
+        changes["last_review_date"] = Greatest(
+            Coalesce("last_review_date", Value(pub_date)), Value(pub_date)
+        )
+    elif removed is not None and added is None:
+        changes["review_count"] = F("review_count") - 1
+        # Дата последнего отзыва ищется заново, только если убран он сам.
+        changes["last_review_date"] = Case(
+            When(
+                last_review_date=pub_date,
+                then=Subquery(
+                    Review.objects.filter(title_id=OuterRef("pk"))
+                    .order_by("-pub_date")
+                    .values("pub_date")[:1]
+                ),
+            ),
+            default=F("last_review_date"),
+        )
+    # Внутри транзакции удаления отзыва - без точки сохранения.
+    with transaction.atomic(savepoint=False):
+        if added is not None:
+            _add_score(title_id, added)
+        if removed is not None:
+            _remove_score(title_id, removed)
+        Title.objects.filter(pk=title_id).update(**changes)
+
+
+def recompute_reviews(review_ids):
+    """Пересчитывает счётчики полезности отзывов review_ids по голосам.
+
+    Возвращает Counter с числом изменённых отзывов (reviews).
+    """
+    votes = {
+        group["review_id"]: group
+        for group in ReviewVote.objects.filter(review_id__in=review_ids)
+        .values("review_id")
+        .annotate(
+            helpful_up=Count("id", filter=Q(value=VOTE_UP)),
+            helpful_down=Count("id", filter=Q(value=VOTE_DOWN)),
+        )
+        .order_by()
+    }
+    changed = []
+    for current in Review.objects.filter(pk__in=review_ids).values(
+        "pk", *REVIEW_FIELDS
+    ):
+        group = votes.get(current["pk"], {})
+        up = group.get("helpful_up", 0)
+        down = group.get("helpful_down", 0)
+        expected = {"helpful_up": up, "helpful_down": down, "helpful_score": up - down}
+        if any(current[field] != expected[field] for field in REVIEW_FIELDS):
+            changed.append(Review(pk=current["pk"], **expected))
+    Review.objects.bulk_update(changed, REVIEW_FIELDS)
+    return Counter(reviews=len(changed))
+
+
+def recompute_aggregates(batch_size=DEFAULT_BATCH_SIZE):
+    """Пересчитывает сводки всех произведений и отзывов.
+
+    Каждая пачка пересчитывается в своей транзакции. Возвращает
+    Counter с числом изменённых строк: titles, title_scores и reviews.
+    """
+    changes = Counter(titles=0, title_scores=0, reviews=0)
+    for ids in id_batches(Title, batch_size):
+        with transaction.atomic():
+            changes.update(recompute_titles(ids))
+    for ids in id_batches(Review, batch_size):
+        with transaction.atomic():
+            changes.update(recompute_reviews(ids))
+    return changes
+
+
+def describe_changes(changes):
+    return (
+        f"{changes['titles']} titles, {changes['title_scores']} title scores"
+        f" and {changes['reviews']} reviews changed"
+    )
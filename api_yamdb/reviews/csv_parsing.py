@@ -0,0 +1,102 @@
+"""Разбор и проверка строк CSV для команды csv_import.
+
+Модуль не обращается к базе данных и настройкам Django, поэтому
+parse_batch можно выполнять в дочерних процессах пула.
+"""
+import time
+
+from reviews.csv_validation import validate_batch
+
+
+def optional_int(value):
+    return int(value) if value else None
+
+
+def parse_user(row):
+    return {
+        "id": int(row["id"]),
+        "username": row["username"],
+        "email": row["email"],
+        "role": row["role"],
+        "bio": row["bio"],
+        "first_name": row["first_name"],
+        "last_name": row["last_name"],
+    }
+
+
+def parse_category(row):
+    return {"id": int(row["id"]), "name": row["name"], "slug": row["slug"]}
+
+
+def parse_title(row):
+    return {
+        "id": int(row["id"]),
+        "name": row["name"],
+        "year": int(row["year"]),
+        "category_id": optional_int(row["category"]),
+    }
+
+
+def parse_genre_title(row):
+    return {
+        "id": int(row["id"]),
+        "title_id": int(row["title_id"]),
+        "genre_id": int(row["genre_id"]),
+    }
+
+
+def parse_review(row):
+    return {
+        "id": int(row["id"]),
+        "title_id": int(row["title_id"]),
+        "text": row["text"],
+        "author_id": int(row["author"]),
+        "score": int(row["score"]),
+        "pub_date": row["pub_date"],
+    }
+
+
+def parse_comment(row):
+    return {
+        "id": int(row["id"]),
+        "review_id": int(row["review_id"]),
+        "text": row["text"],
+        "author_id": int(row["author"]),
+        "pub_date": row["pub_date"],
+    }
+
+
+PARSERS = {
+    "users": parse_user,
+    "category": parse_category,
+    "genre": parse_category,
+    "titles": parse_title,
+    "genre_title": parse_genre_title,
+    "reviews": parse_review,
+    "comments": parse_comment,
+}
+
+
+def parse_batch(name, first_row, rows):
+    """Преобразует пачку строк файла name в словари полей модели.
+
+    Разобранные строки проверяются по столбцам validate_batch.
+    Возвращает список словарей, номера их записей в файле, список
+    ошибок с номерами записей и время разбора в секундах. Строки
+    с ошибками в список словарей не попадают.
+    """
+    started = time.perf_counter()
+    parser = PARSERS[name]
+    parsed = []
+    numbers = []
+    errors = []
+    for number, row in enumerate(rows, start=first_row):
+        try:
+            parsed.append(parser(row))
+        except (KeyError, TypeError, ValueError) as error:
+            errors.append(f"{name}, row {number}: {error!r}")
+        else:
+            numbers.append(number)
+    parsed, numbers, invalid = validate_batch(name, parsed, numbers)
+    errors.extend(invalid)
+    return parsed, numbers, errors, time.perf_counter() - started
@@ -0,0 +1,284 @@
+"""Генерация синтетических данных в формате CSV-файлов csv_import.
+
+Данные делятся на куски по диапазонам id. Каждый кусок генерируется
+своим генератором случайных чисел, зерно которого зависит только от
+общего зерна, таблицы и номера куска, поэтому результат воспроизводим
+при любом числе процессов. Модуль не обращается к базе данных, так что
+куски можно генерировать в пуле процессов.
+
+Популярность неравномерна (закон Ципфа): немногие произведения,
+категории и жанры собирают большую часть отзывов, а немногие
+пользователи пишут большую часть отзывов и комментариев.
+"""
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from reviews.csv_parsing import parse_batch
+
+# Данные охватывают десять лет до фиксированной даты, чтобы при одном
+# и том же зерне получались одни и те же файлы.
+PERIOD_END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PERIOD_SECONDS = 10 * 365 * 24 * 60 * 60
+PERIOD_START = PERIOD_END - timedelta(seconds=PERIOD_SECONDS)
+
+MAX_GENRES_PER_TITLE = 3
+# Доля пользователей (в процентах) с ролями user, moderator и admin.
+ROLE_WEIGHTS = {"user": 90, "moderator": 8, "admin": 2}
+# Оценки смещены к высоким, как на настоящих сайтах с отзывами.
+SCORE_WEIGHTS = [2, 1, 2, 3, 5, 8, 13, 18, 20, 16]
+# Среднее время от отзыва до комментария к нему, в секундах.
+COMMENT_DELAY = 3 * 24 * 60 * 60
+
+CATEGORY_NAMES = ["Фильм", "Книга", "Музыка", "Сериал", "Игра", "Спектакль"]
+GENRE_NAMES = [
+    "Драма",
+    "Комедия",
+    "Вестерн",
+    "Фэнтези",
+    "Фантастика",
+    "Детектив",
+    "Триллер",
+    "Сказка",
+    "Гонзо",
+    "Роман",
+    "Баллада",
+    "Рок-н-ролл",
+    "Классика",
+    "Рок",
+    "Шансон",
+]
+TITLE_WORDS = [
+    "Побег",
+    "Тёмный",
+    "Рыцарь",
+    "Последний",
+    "Город",
+    "Зелёная",
+    "Миля",
+    "Властелин",
+    "Колец",
+    "Отец",
+    "Бойцовский",
+    "Клуб",
+    "Звёздные",
+    "Войны",
+    "Мастер",
+    "Маргарита",
+    "Тишина",
+    "Море",
+    "Дорога",
+    "Время",
+]
+NICKNAME_PARTS = [
+    "bingo",
+    "bongo",
+    "capt",
+    "obvious",
+    "faust",
+    "reviewer",
+    "kotik",
+    "cinema",
+    "reader",
+    "night",
+    "owl",
+    "rock",
+    "star",
+    "lazy",
+    "critic",
+]
+SENTENCES = [
+    "Ставлю десять звёзд!",
+    "Не понравилось, слишком затянуто.",
+    "Эти голоса были чище и светлее тех, о которых мечтали.",
+    "Пересматриваю каждый год.",
+    "Финал оказался неожиданным.",
+    "Актёры играют великолепно.",
+    "Ожидал большего после всех отзывов.",
+    "Музыка держит в напряжении до конца.",
+    "Ничего подобного, всё было не так!",
+    "Классика, которую стоит знать.",
+]
+
+
+def zipf_rank(rng, count, skew):
+    """Случайный ранг от 1 до count с вероятностью примерно 1 / ранг**skew.
+
+    Используется обратная функция распределения непрерывного закона
+    Ципфа, поэтому выбор стоит O(1) при любом count.
+    """
+    u = rng.random()
+    if abs(skew - 1) < 1e-9:
+        rank = math.exp(u * math.log(count + 1))
+    else:
+        exponent = 1 - skew
+        rank = ((math.pow(count + 1, exponent) - 1) * u + 1) ** (1 / exponent)
+    return min(count, int(rank))
+
+
+def zipf_counts(total, count, skew, limit):
+    """Делит total между count элементами по закону Ципфа.
+
+    Элемент с рангом k получает долю 1 / k**skew, но не больше limit.
+    """
+    weights = [1 / (rank**skew) for rank in range(1, count + 1)]
+    weight_sum = sum(weights)
+    counts = [min(limit, int(total * weight / weight_sum)) for weight in weights]
+    remainder = total - sum(counts)
+    for index in range(count):
+        if remainder <= 0:
+            break
+        extra = min(limit - counts[index], remainder)
+        counts[index] += extra
+        remainder -= extra
+    return counts
+
+
+def timestamp(seconds):
+    moment = PERIOD_START + timedelta(seconds=seconds)
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def review_offset(seed, review_id):
+    """Секунда публикации отзыва от начала периода.
+
+    Зависит только от зерна и id отзыва (перемешивание splitmix64),
+    поэтому кусок комментариев вычисляет дату отзыва, не видя его.
+    """
+    value = (seed * 0x9E3779B97F4A7C15 + review_id) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return (value ^ (value >> 31)) % PERIOD_SECONDS
+
+
+def text(rng, sentences):
+    return " ".join(rng.choice(SENTENCES) for _ in range(sentences))
+
+
+def generate_users(rng, sizes, start, stop):
+    roles = list(ROLE_WEIGHTS)
+    weights = list(ROLE_WEIGHTS.values())
+    for user_id in range(start, stop):
+        first, second = rng.choice(NICKNAME_PARTS), rng.choice(NICKNAME_PARTS)
+        username = f"{first}_{second}{user_id}"
+        yield {
+            "id": user_id,
+            "username": username,
+            "email": f"{username}@yamdb.fake",
+            "role": rng.choices(roles, weights)[0],
+            "bio": text(rng, rng.randint(1, 2)) if rng.random() < 0.3 else "",
+            "first_name": "",
+            "last_name": "",
+        }
+
+
+def generate_named(names, prefix):
+    def generate(rng, sizes, start, stop):
+        for item_id in range(start, stop):
+            base = names[(item_id - 1) % len(names)]
+            number = (item_id - 1) // len(names)
+            yield {
+                "id": item_id,
+                "name": f"{base} {number}" if number else base,
+                "slug": f"{prefix}-{item_id}",
+            }
+
+    return generate
+
+
+def generate_titles(rng, sizes, start, stop):
+    last_year = PERIOD_END.year - 1
+    for title_id in range(start, stop):
+        words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+        yield {
+            "id": title_id,
+            "name": " ".join(words).capitalize(),
+            "year": max(1900, last_year - int(rng.expovariate(1 / 15))),
+            "category": zipf_rank(rng, sizes["category"], sizes["skew"]),
+        }
+
+
+def generate_genre_titles(rng, sizes, start, stop):
+    genres = sizes["genre"]
+    for title_id in range(start, stop):
+        chosen = set()
+        for _ in range(min(genres, rng.randint(1, MAX_GENRES_PER_TITLE))):
+            genre_id = zipf_rank(rng, genres, sizes["skew"])
+            while genre_id in chosen:
+                genre_id = rng.randint(1, genres)
+            chosen.add(genre_id)
+        for index, genre_id in enumerate(sorted(chosen)):
+            yield {
+                "id": (title_id - 1) * MAX_GENRES_PER_TITLE + index + 1,
+                "title_id": title_id,
+                "genre_id": genre_id,
+            }
+
+
+def generate_reviews(rng, sizes, start, stop, first_review_id, review_counts):
+    """Отзывы произведений с id от start до stop.
+
+    Число отзывов каждого произведения задано в review_counts. Авторы
+    одного произведения различны, как того требует уникальность пары
+    (произведение, автор).
+    """
+    users = sizes["users"]
+    review_id = first_review_id
+    for title_id, count in zip(range(start, stop), review_counts):
+        authors = {}
+        while len(authors) < count:
+            author = zipf_rank(rng, users, sizes["skew"])
+            while author in authors:
+                author = rng.randint(1, users)
+            authors[author] = None
+        for author in authors:
+            yield {
+                "id": review_id,
+                "title_id": title_id,
+                "text": text(rng, rng.randint(1, 4)),
+                "author": author,
+                "score": rng.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                "pub_date": timestamp(review_offset(sizes["seed"], review_id)),
+            }
+            review_id += 1
+
+
+def generate_comments(rng, sizes, start, stop):
+    for comment_id in range(start, stop):
+        review_id = zipf_rank(rng, sizes["reviews"], sizes["skew"])
+        offset = review_offset(sizes["seed"], review_id)
+        offset += int(rng.expovariate(1 / COMMENT_DELAY))
+        yield {
+            "id": comment_id,
+            "review_id": review_id,
+            "text": text(rng, rng.randint(1, 2)),
+            "author": zipf_rank(rng, sizes["users"], sizes["skew"]),
+            "pub_date": timestamp(min(offset, PERIOD_SECONDS)),
+        }
+
+
+GENERATORS = {
+    "users": generate_users,
+    "category": generate_named(CATEGORY_NAMES, "category"),
+    "genre": generate_named(GENRE_NAMES, "genre"),
+    "titles": generate_titles,
+    "genre_title": generate_genre_titles,
+    "reviews": generate_reviews,
+    "comments": generate_comments,
+}
+
+
+def generate_chunk(name, chunk, sizes, start, stop, *extra):
+    """Строки файла name с id (или id произведений) от start до stop."""
+    rng = random.Random(f"{sizes['seed']}:{name}:{chunk}")
+    return list(GENERATORS[name](rng, sizes, start, stop, *extra))
+
+
+def generate_parsed_chunk(name, chunk, sizes, start, stop, *extra):
+    """То же, что generate_chunk, но строки уже разобраны в поля моделей."""
+    parsed, _, errors, _ = parse_batch(
+        name, 1, generate_chunk(name, chunk, sizes, start, stop, *extra)
+    )
+    if errors:
+        raise ValueError(errors[0])
+    return parsed
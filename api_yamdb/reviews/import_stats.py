@@ -0,0 +1,98 @@
+import time
+
+MEGABYTE = 1024 * 1024
+
+
+class StageStats:
+    """Счётчики импорта одного CSV-файла: строки, байты, время и скорость.
+
+    Время этапа отсчитывается от начала записи первой пачки до конца
+    записи последней, поэтому скорость учитывает и разбор, и запись.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.rows = 0
+        self.bytes = 0
+        self.batches = 0
+        self.created = 0
+        self.updated = 0
+        self.deleted = 0
+        self.last_id = None
+        self.parse_seconds = 0.0
+        self.write_seconds = 0.0
+        self.max_batch_seconds = 0.0
+        self.started = None
+        self.finished = None
+
+    def add_batch(
+        self, rows, size, parse_seconds, write_seconds, created=0, updated=0
+    ):
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now - write_seconds
+        self.finished = now
+        self.rows += len(rows)
+        self.bytes += size
+        self.batches += 1
+        self.created += created
+        self.updated += updated
+        if rows:
+            self.last_id = max(self.last_id or 0, max(row["id"] for row in rows))
+        self.parse_seconds += parse_seconds
+        self.write_seconds += write_seconds
+        self.max_batch_seconds = max(self.max_batch_seconds, write_seconds)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mean_batch_seconds(self):
+        return self.write_seconds / self.batches if self.batches else 0.0
+
+    @property
+    def eta(self):
+        """Оценка оставшегося времени по средней скорости в байтах."""
+        if not self.bytes_per_second:
+            return None
+        return max(self.size - self.bytes, 0) / self.bytes_per_second
+
+    def describe(self):
+        done = 100 * self.bytes / self.size if self.size else 100
+        eta = "-" if self.eta is None else f"{self.eta:.0f}s"
+        return (
+            f"{self.rows} rows ({done:.0f}%), {self.rows_per_second:.0f} rows/s,"
+            f" {self.bytes_per_second / MEGABYTE:.2f} MB/s,"
+            f" batch {self.mean_batch_seconds * 1000:.1f}ms"
+            f" (max {self.max_batch_seconds * 1000:.1f}ms), ETA {eta}"
+        )
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "deleted": self.deleted,
+            "last_id": self.last_id,
+            "bytes": self.bytes,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed, 6),
+            "parse_seconds": round(self.parse_seconds, 6),
+            "write_seconds": round(self.write_seconds, 6),
+            "rows_per_second": round(self.rows_per_second, 3),
+            "bytes_per_second": round(self.bytes_per_second, 3),
+            "mean_batch_seconds": round(self.mean_batch_seconds, 6),
+            "max_batch_seconds": round(self.max_batch_seconds, 6),
+        }
@@ -0,0 +1,148 @@
+import csv
+import gzip
+import os
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from reviews.management.commands.csv_import import Command as ImportCommand
+from reviews.models import Category, Title, Comment, Genre, GenreTitle, Review
+from users.models import User
+
+DEFAULT_CHUNK_SIZE = 2000
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def format_value(value):
+    """Значение поля в том виде, в котором его читает csv_import."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        timespec = "milliseconds" if value.microsecond % 1000 == 0 else "microseconds"
+        return (
+            value.astimezone(timezone.utc)
+            .isoformat(timespec=timespec)
+            .replace("+00:00", "Z")
+        )
+    return value
+
+
+class Command(BaseCommand):
+    help = "Export data to CSV files in the csv_import format"
+
+    # Колонки файла и соответствующие им поля модели.
+    COLUMNS = {
+        "users": (
+            User,
+            {
+                "id": "id",
+                "username": "username",
+                "email": "email",
+                "role": "role",
+                "bio": "bio",
+                "first_name": "first_name",
+                "last_name": "last_name",
+            },
+        ),
+        "category": (Category, {"id": "id", "name": "name", "slug": "slug"}),
+        "genre": (Genre, {"id": "id", "name": "name", "slug": "slug"}),
+        "titles": (
+            Title,
+            {"id": "id", "name": "name", "year": "year", "category": "category_id"},
+        ),
+        "genre_title": (
+            GenreTitle,
+            {"id": "id", "title_id": "title_id", "genre_id": "genre_id"},
+        ),
+        "reviews": (
+            Review,
+            {
+                "id": "id",
+                "title_id": "title_id",
+                "text": "text",
+                "author": "author_id",
+                "score": "score",
+                "pub_date": "pub_date",
+            },
+        ),
+        "comments": (
+            Comment,
+            {
+                "id": "id",
+                "review_id": "review_id",
+                "text": "text",
+                "author": "author_id",
+                "pub_date": "pub_date",
+            },
+        ),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory to write the CSV files to")
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the files with gzip (adds the .gz suffix)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows fetched from the database at a time",
+        )
+
+    def handle(self, *args, **kwargs):
+        directory = kwargs["directory"]
+        self.compress = kwargs.get("gzip", False)
+        self.chunk_size = kwargs.get("chunk_size") or DEFAULT_CHUNK_SIZE
+        os.makedirs(directory, exist_ok=True)
+        started = time.perf_counter()
+        for name, filename in ImportCommand.CSV_FILES.items():
+            path = os.path.join(directory, filename)
+            if self.compress:
+                path += ".gz"
+            table_started = time.perf_counter()
+            rows = self.export_table(name, path)
+            elapsed = time.perf_counter() - table_started
+            rate = rows / elapsed if elapsed else 0
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{ImportCommand.LABELS[name]} data exported successfully"
+                )
+                + f" ({rows} rows, {os.path.getsize(path)} bytes,"
+                f" {rate:.0f} rows/s)"
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Data exported successfully")
+            + f" in {time.perf_counter() - started:.2f}s"
+        )
+
+    def open_output(self, path):
+        if self.compress:
+            return gzip.open(path, "wt", newline="", encoding="utf-8")
+        return open(
+            path, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+        )
+
+    def export_table(self, name, path):
+        """Пишет таблицу в файл, читая её из базы порциями по chunk_size.
+
+        Строки выбираются курсором в порядке первичного ключа и сразу
+        уходят в буферизованный файл, поэтому таблица целиком в памяти
+        не оказывается. Возвращает число записанных строк.
+        """
+        model, columns = self.COLUMNS[name]
+        rows = (
+            model.objects.order_by("pk")
+            .values_list(*columns.values())
+            .iterator(chunk_size=self.chunk_size)
+        )
+        count = 0
+        with self.open_output(path) as output:
+            writer = csv.writer(output, lineterminator="\n")
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([format_value(value) for value in row])
+                count += 1
+        return count
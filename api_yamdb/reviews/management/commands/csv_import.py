@@ -1,11 +1,54 @@
 import csv
+import gzip
+import hashlib
+import json
 import os
+import time
+from contextlib import ExitStack, contextmanager
+from itertools import groupby, islice
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.db import connection, transaction
 
+from api_yamdb.parallel import ordered_map
+from reviews.aggregates import describe_changes, id_batches, recompute_aggregates
+from reviews.bulk_load import dropped_indexes, sqlite_bulk_load
+from reviews.csv_parsing import parse_batch
+from reviews.csv_validation import IdSet, ReferenceChecker
+from reviews.import_stats import StageStats
 from reviews.models import Category, Title, Comment, Genre, GenreTitle, Review
-from users.models import User
+from users.authentication import invalidate_cached_users, set_role_version
+from users.models import Follow, User, recount_followers
+from users.search import index_usernames
+
+DEFAULT_BATCH_SIZE = 1000
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+# Не чаще чем раз в столько секунд печатается прогресс импорта файла.
+PROGRESS_INTERVAL = 5
+# После стольких найденных ошибок проверка --dry-run останавливается.
+MAX_REPORTED_ERRORS = 100
+
+
+@contextmanager
+def keep_auto_now(model):
+    """Отключает auto_now_add у полей модели на время импорта.
+
+    Иначе bulk_create заменил бы даты публикации из файла текущим
+    временем.
+    """
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
 
 
 class Command(BaseCommand):
@@ -21,131 +64,512 @@ class Command(BaseCommand):
         "reviews": "review.csv",
         "comments": "comments.csv",
     }
+    MODELS = {
+        "users": User,
+        "category": Category,
+        "genre": Genre,
+        "titles": Title,
+        "genre_title": GenreTitle,
+        "reviews": Review,
+        "comments": Comment,
+    }
+    LABELS = {
+        "users": "Users",
+        "category": "Categories",
+        "genre": "Genres",
+        "titles": "Titles",
+        "genre_title": "Genre Titles",
+        "reviews": "Reviews",
+        "comments": "Comments",
+    }
+    # Внешние ключи строк каждого файла и файлы, на которые они ссылаются.
+    FOREIGN_KEYS = {
+        "titles": {"category_id": "category"},
+        "genre_title": {"title_id": "titles", "genre_id": "genre"},
+        "reviews": {"title_id": "titles", "author_id": "users"},
+        "comments": {"review_id": "reviews", "author_id": "users"},
+    }
+
+    # Файлы, после импорта которых пересчитываются сводки по отзывам.
+    AGGREGATED = {"titles", "reviews"}
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--directory",
+            default=self.CSV_DIRECTORY,
+            help=(
+                "Directory with the CSV files; a file may also be "
+                "gzip-compressed with a .gz suffix (default: static/data)"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows written to the database per query",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes parsing CSV files",
+        )
+        parser.add_argument(
+            "--manifest",
+            help="Path to the import manifest (default: CSV_IMPORT_MANIFEST)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Import files even if they have not changed since the last import",
+        )
+        parser.add_argument(
+            "--delete-missing",
+            action="store_true",
+            help="Delete rows whose ids are no longer present in changed files",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Parse and validate every file without writing to the database",
+        )
+        parser.add_argument(
+            "--summary",
+            help="Write a JSON summary of the import to this path ('-' for stdout)",
+        )
+        parser.add_argument(
+            "--bulk-load",
+            action="store_true",
+            help=(
+                "Load each table in one transaction with SQLite journaling "
+                "and syncing relaxed for the duration of the import"
+            ),
+        )
+        parser.add_argument(
+            "--drop-indexes",
+            action="store_true",
+            help=(
+                "With --bulk-load, drop non-unique indexes of each table "
+                "before loading it and rebuild them afterwards"
+            ),
+        )
+        parser.add_argument(
+            "--skip-aggregates",
+            action="store_true",
+            help="Do not recompute title ratings and review helpfulness afterwards",
+        )
 
     def handle(self, *args, **kwargs):
-        self.import_users()
-        self.import_categories()
-        self.import_genres()
-        self.import_titles()
-        self.import_genre_titles()
-        self.import_reviews()
-        self.import_comments()
-        self.stdout.write(self.style.SUCCESS("Data imported successfully"))
-
-    def import_users(self):
-        users_csv_path = os.path.join(self.CSV_DIRECTORY, self.CSV_FILES["users"])
-        with open(users_csv_path, "r") as users_file:
-            csv_reader = csv.DictReader(users_file)
-            users_to_create = []
-            for row in csv_reader:
-                user_id = row["id"]
-                if not User.objects.filter(id=user_id).exists():
-                    users_to_create.append(
-                        User(
-                            id=user_id,
-                            username=row["username"],
-                            email=row["email"],
-                            role=row["role"],
-                            bio=row["bio"],
-                            first_name=row["first_name"],
-                            last_name=row["last_name"],
-                        )
-                    )
-            User.objects.bulk_create(users_to_create)
-        self.stdout.write(self.style.SUCCESS("Users data imported successfully"))
-
-    def import_categories(self):
-        category_csv_path = os.path.join(self.CSV_DIRECTORY, self.CSV_FILES["category"])
-        with open(category_csv_path, "r") as category_file:
-            csv_reader = csv.DictReader(category_file)
-            categories_to_create = []
-            for row in csv_reader:
-                categories_to_create.append(
-                    Category(id=row["id"], name=row["name"], slug=row["slug"])
-                )
-            Category.objects.bulk_create(categories_to_create)
-        self.stdout.write(self.style.SUCCESS("Categories data imported successfully"))
-
-    def import_genres(self):
-        genre_csv_path = os.path.join(self.CSV_DIRECTORY, self.CSV_FILES["genre"])
-        with open(genre_csv_path, "r") as genre_file:
-            csv_reader = csv.DictReader(genre_file)
-            genres_to_create = []
-            for row in csv_reader:
-                genres_to_create.append(
-                    Genre(id=row["id"], name=row["name"], slug=row["slug"])
+        self.directory = kwargs.get("directory") or self.CSV_DIRECTORY
+        self.batch_size = kwargs.get("batch_size") or DEFAULT_BATCH_SIZE
+        self.workers = kwargs.get("workers") or 1
+        self.verbosity = kwargs.get("verbosity", 1)
+        manifest_path = kwargs.get("manifest") or settings.CSV_IMPORT_MANIFEST
+        dry_run = kwargs.get("dry_run", False)
+        self.bulk_load = kwargs.get("bulk_load", False)
+        self.drop_indexes = self.bulk_load and kwargs.get("drop_indexes", False)
+        started = time.perf_counter()
+        manifest = self.load_manifest(manifest_path)
+        order = self.import_order()
+        checksums = {name: self.file_checksum(name) for name in order}
+        stages = [
+            name
+            for name in order
+            if dry_run
+            or kwargs.get("force")
+            or manifest.get(name, {}).get("sha256") != checksums[name]
+        ]
+        stats = {
+            name: StageStats(name, os.path.getsize(self.csv_path(name)))
+            for name in stages
+        }
+        errors = []
+        aggregates = None
+        if dry_run:
+            errors = self.validate(stages, stats)
+        else:
+            self.import_stages(stages, stats, kwargs.get("delete_missing", False))
+            if not kwargs.get("skip_aggregates") and set(stages) & self.AGGREGATED:
+                # bulk_create и bulk_update не вызывают сигналы отзывов,
+                # поэтому сводки пересчитываются после загрузки целиком.
+                aggregates = recompute_aggregates(self.batch_size)
+            self.update_manifest(manifest, stages, stats, checksums)
+
+        action = "validated" if dry_run else "imported"
+        self.report(order, stages, stats, action, aggregates)
+        elapsed = time.perf_counter() - started
+        if kwargs.get("summary"):
+            self.write_summary(
+                kwargs["summary"],
+                {
+                    "dry_run": dry_run,
+                    "elapsed_seconds": round(elapsed, 6),
+                    "skipped": [name for name in order if name not in stages],
+                    "tables": {name: stats[name].as_dict() for name in stages},
+                    "aggregates": aggregates and dict(aggregates),
+                    "errors": errors,
+                },
+            )
+        if errors:
+            raise CommandError(
+                f"Found {len(errors)} invalid row(s):\n" + "\n".join(errors)
+            )
+        if not dry_run:
+            self.save_manifest(manifest_path, manifest)
+        self.stdout.write(
+            self.style.SUCCESS(f"Data {action} successfully") + f" in {elapsed:.2f}s"
+        )
+
+    def import_stages(self, stages, stats, delete_missing):
+        """Загружает файлы stages, в режиме --bulk-load - с ускорением SQLite."""
+        with ExitStack() as stack:
+            if self.bulk_load:
+                stack.enter_context(sqlite_bulk_load(connection))
+            self.load(stages, stats, delete_missing)
+
+    def update_manifest(self, manifest, stages, stats, checksums):
+        """Записывает в манифест контрольные суммы импортированных файлов."""
+        for name in stages:
+            manifest[name] = {
+                "file": self.CSV_FILES[name],
+                "sha256": checksums[name],
+                "rows": stats[name].rows,
+                "last_id": stats[name].last_id,
+            }
+
+    def report(self, order, stages, stats, action, aggregates):
+        """Печатает итоги по каждому файлу и по пересчёту сводок."""
+        for name in order:
+            if name not in stages:
+                self.stdout.write(f"{self.LABELS[name]} data unchanged, skipped")
+                continue
+            stage = stats[name]
+            details = stage.describe()
+            if action == "imported":
+                details = (
+                    f"{stage.created} created, {stage.updated} updated,"
+                    f" {stage.deleted} deleted; {details}"
                 )
-            Genre.objects.bulk_create(genres_to_create)
-        self.stdout.write(self.style.SUCCESS("Genres data imported successfully"))
-
-    def import_titles(self):
-        titles_csv_path = os.path.join(self.CSV_DIRECTORY, self.CSV_FILES["titles"])
-        with open(titles_csv_path, "r") as title_file:
-            csv_reader = csv.DictReader(title_file)
-            titles_to_create = []
-            for row in csv_reader:
-                titles_to_create.append(
-                    Title(
-                        id=row["id"],
-                        name=row["name"],
-                        year=row["year"],
-                        category_id=row["category"],
+            self.stdout.write(
+                self.style.SUCCESS(f"{self.LABELS[name]} data {action} successfully")
+                + f" ({details})"
+            )
+        if aggregates is not None:
+            self.stdout.write(
+                self.style.SUCCESS("Aggregates recomputed successfully")
+                + f" ({describe_changes(aggregates)})"
+            )
+
+    def load(self, stages, stats, delete_missing):
+        """Пишет пачки в базу в порядке stages и обновляет счётчики.
+
+        Перед записью пачки проверяются её внешние ключи; пачка
+        с ошибками не записывается. В режиме --bulk-load каждая таблица
+        пишется одной транзакцией.
+        """
+        seen_ids = {name: IdSet() for name in stages}
+        references = self.reference_checker(stages)
+        for name, batches in groupby(self.parsed_batches(stages), key=lambda b: b[0]):
+            with ExitStack() as stack:
+                if self.bulk_load:
+                    stack.enter_context(transaction.atomic())
+                if self.drop_indexes:
+                    stack.enter_context(
+                        dropped_indexes(connection, self.MODELS[name]._meta.db_table)
                     )
-                )
-            Title.objects.bulk_create(titles_to_create)
-        self.stdout.write(self.style.SUCCESS("Titles data imported successfully"))
-
-    def import_genre_titles(self):
-        genre_title_csv_path = os.path.join(
-            self.CSV_DIRECTORY, self.CSV_FILES["genre_title"]
-        )
-        with open(genre_title_csv_path, "r") as genre_title_file:
-            csv_reader = csv.DictReader(genre_title_file)
-            genre_titles_to_create = []
-            for row in csv_reader:
-                genre_titles_to_create.append(
-                    GenreTitle(
-                        id=row["id"],
-                        title_id=row["title_id"],
-                        genre_id=row["genre_id"],
+                for _, size, rows, numbers, errors, parse_seconds in batches:
+                    write_started = time.perf_counter()
+                    rows, numbers, reference_errors = references.check(
+                        name, rows, numbers
                     )
-                )
-            GenreTitle.objects.bulk_create(genre_titles_to_create)
-        self.stdout.write(self.style.SUCCESS("Genre Titles data imported successfully"))
-
-    def import_reviews(self):
-        reviews_csv_path = os.path.join(self.CSV_DIRECTORY, self.CSV_FILES["reviews"])
-        with open(reviews_csv_path, "r") as reviews_file:
-            csv_reader = csv.DictReader(reviews_file)
-            reviews_to_create = []
-            for row in csv_reader:
-                reviews_to_create.append(
-                    Review(
-                        id=row["id"],
-                        title_id=row["title_id"],
-                        text=row["text"],
-                        author_id=row["author"],
-                        score=row["score"],
-                        pub_date=row["pub_date"],
+                    errors += reference_errors
+                    if errors:
+                        raise CommandError(
+                            "Invalid CSV data:\n"
+                            + "\n".join(errors[:MAX_REPORTED_ERRORS])
+                        )
+                    created, updated = self.write_batch(name, rows)
+                    references.add(name, (row["id"] for row in rows))
+                    stats[name].add_batch(
+                        rows,
+                        size,
+                        parse_seconds,
+                        time.perf_counter() - write_started,
+                        created,
+                        updated,
                     )
-                )
-            Review.objects.bulk_create(reviews_to_create)
-        self.stdout.write(self.style.SUCCESS("Reviews data imported successfully"))
-
-    def import_comments(self):
-        comments_csv_path = os.path.join(self.CSV_DIRECTORY, self.CSV_FILES["comments"])
-        with open(comments_csv_path, "r") as comments_file:
-            csv_reader = csv.DictReader(comments_file)
-            comments_to_create = []
-            for row in csv_reader:
-                comments_to_create.append(
-                    Comment(
-                        id=row["id"],
-                        review_id=row["review_id"],
-                        text=row["text"],
-                        author_id=row["author"],
-                        pub_date=row["pub_date"],
+                    self.report_progress(stats[name])
+                    if delete_missing:
+                        seen_ids[name].update(row["id"] for row in rows)
+        if delete_missing:
+            for name in reversed(stages):
+                stats[name].deleted = self.delete_missing(name, seen_ids[name])
+
+    def validate(self, stages, stats):
+        """Проверяет все файлы, ничего не записывая в базу.
+
+        Кроме разбора и проверки значений строк, проверяет, что внешние
+        ключи ссылаются на строки из уже проверенных файлов или из базы.
+        Возвращает список ошибок; останавливается, найдя
+        MAX_REPORTED_ERRORS ошибок.
+        """
+        references = self.reference_checker(stages)
+        errors = []
+        for batch in self.parsed_batches(stages):
+            name, size, rows, numbers, batch_errors, parse_seconds = batch
+            check_started = time.perf_counter()
+            errors.extend(batch_errors)
+            rows, numbers, reference_errors = references.check(name, rows, numbers)
+            errors.extend(reference_errors)
+            references.add(name, (row["id"] for row in rows))
+            stats[name].add_batch(
+                rows, size, parse_seconds, time.perf_counter() - check_started
+            )
+            self.report_progress(stats[name])
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                return errors[:MAX_REPORTED_ERRORS]
+        return errors
+
+    def reference_checker(self, stages):
+        """Проверка внешних ключей строк файлов stages.
+
+        id таблиц, на которые ссылаются файлы stages, но которые сами
+        не импортируются, заранее читаются из базы одним запросом.
+        """
+        checker = ReferenceChecker(
+            {
+                name: self.FOREIGN_KEYS[name]
+                for name in stages
+                if name in self.FOREIGN_KEYS
+            },
+            self.existing_ids,
+        )
+        for target in checker.referenced - set(stages):
+            checker.add(
+                target,
+                self.MODELS[target]
+                .objects.values_list("pk", flat=True)
+                .iterator(chunk_size=self.batch_size),
+            )
+        return checker
+
+    def existing_ids(self, name, ids):
+        return (
+            self.MODELS[name]
+            .objects.filter(pk__in=list(ids))
+            .values_list("pk", flat=True)
+        )
+
+    def report_progress(self, stage):
+        """Печатает прогресс файла раз в PROGRESS_INTERVAL секунд.
+
+        При verbosity 2 и выше прогресс печатается после каждой пачки.
+        """
+        now = time.perf_counter()
+        if self.verbosity < 2 and now - self.last_report < PROGRESS_INTERVAL:
+            return
+        self.last_report = now
+        self.stdout.write(f"{self.LABELS[stage.name]}: {stage.describe()}")
+
+    def write_summary(self, path, summary):
+        if path == "-":
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        with open(path, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+    def load_manifest(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def save_manifest(self, path, manifest):
+        """Записывает манифест атомарно: через временный файл и замену."""
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(temporary_path, path)
+
+    def csv_path(self, name):
+        """Путь к файлу name, сжатому gzip, если несжатого файла нет."""
+        path = os.path.join(self.directory, self.CSV_FILES[name])
+        if not os.path.exists(path) and os.path.exists(path + ".gz"):
+            return path + ".gz"
+        return path
+
+    def file_checksum(self, name):
+        checksum = hashlib.sha256()
+        with open(self.csv_path(name), "rb") as csv_file:
+            for chunk in iter(lambda: csv_file.read(CHECKSUM_CHUNK_SIZE), b""):
+                checksum.update(chunk)
+        return checksum.hexdigest()
+
+    def import_order(self):
+        """Топологическая сортировка файлов по внешним ключам.
+
+        Файл идёт в порядке импорта только после всех файлов, на чьи
+        таблицы он ссылается.
+        """
+        order = []
+        remaining = {
+            name: set(self.FOREIGN_KEYS.get(name, {}).values())
+            for name in self.CSV_FILES
+        }
+        while remaining:
+            ready = [
+                name
+                for name, dependencies in remaining.items()
+                if all(dependency in order for dependency in dependencies)
+            ]
+            if not ready:
+                raise CommandError(f"Cyclic CSV dependencies: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+
+    def read_batches(self, name):
+        """Читает CSV-файл построчно и отдаёт строки пачками по batch_size.
+
+        Вместе с пачкой отдаются номер её первой записи в файле и число
+        прочитанных для неё байт файла на диске. В памяти одновременно находится
+        не больше одной пачки строк.
+        """
+        path = self.csv_path(name)
+        compressed = path.endswith(".gz")
+        with open(path, "rb") as raw_file:
+            csv_file = gzip.GzipFile(fileobj=raw_file) if compressed else raw_file
+            consumed = 0
+
+            def lines():
+                # Прогресс сжатого файла считается по прочитанным сжатым
+                # байтам, чтобы сходиться с его размером на диске.
+                nonlocal consumed
+                for line in csv_file:
+                    consumed = raw_file.tell() if compressed else consumed + len(line)
+                    yield line.decode("utf-8")
+
+            csv_reader = csv.DictReader(lines())
+            first_row = 1
+            reported = 0
+            while True:
+                batch = list(islice(csv_reader, self.batch_size))
+                if not batch:
+                    return
+                yield first_row, batch, consumed - reported
+                reported = consumed
+                first_row += len(batch)
+
+    def parsed_batches(self, stages):
+        """Отдаёт разобранные пачки всех файлов в порядке stages.
+
+        Каждая пачка - это имя файла, размер пачки в байтах, словари
+        полей, номера их записей в файле, ошибки разбора и время разбора.
+        При workers > 1 пачки разбираются в пуле процессов. Пока основной
+        процесс пишет пачку в базу, пул уже разбирает следующие, в том
+        числе из следующих файлов. В работе одновременно не больше 2 * workers пачек.
+        """
+        self.last_report = time.perf_counter()
+        tasks = (
+            ((name, size), (name, first_row, batch))
+            for name in stages
+            for first_row, batch, size in self.read_batches(name)
+        )
+        for (name, size), parsed in ordered_map(parse_batch, tasks, self.workers):
+            yield (name, size, *parsed)
+
+    def write_batch(self, name, rows):
+        """Записывает пачку: новые строки создаёт, изменившиеся обновляет.
+
+        Возвращает число созданных и обновлённых строк.
+        """
+        model = self.MODELS[name]
+        fields = [field for field in rows[0] if field != "id"]
+        objects = [model(**row) for row in rows]
+        if model is User:
+            for user in objects:
+                user.normalize_identifiers()
+            fields += ["username_normalized", "email_normalized"]
+        with keep_auto_now(model):
+            created, updated = self.upsert(model, objects, fields)
+        if model is User:
+            index_usernames(
+                (user.id, user.username_normalized) for user in created + updated
+            )
+            invalidate_cached_users(*[user.id for user in updated])
+            for user in updated:
+                set_role_version(user.id, user.role_version)
+        return len(created), len(updated)
+
+    def upsert(self, model, objects, fields):
+        """Создаёт объекты пачки, которых нет в базе, и обновляет изменённые.
+
+        Текущие значения полей пачки загружаются одним запросом, поэтому
+        повторный импорт того же файла ничего не пишет. Пользователю,
+        у которого сменилась роль, увеличивается role_version.
+        """
+        extra_fields = ["role_version"] if model is User else []
+        current = {
+            values["pk"]: values
+            for values in model.objects.filter(
+                pk__in=[obj.pk for obj in objects]
+            ).values("pk", *fields, *extra_fields)
+        }
+        to_create = []
+        to_update = []
+        for obj in objects:
+            values = current.get(obj.pk)
+            if values is None:
+                to_create.append(obj)
+            elif self.has_changes(model, obj, values, fields):
+                if model is User:
+                    obj.role_version = values["role_version"] + (
+                        obj.role != values["role"]
                     )
+                to_update.append(obj)
+        model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, fields + extra_fields)
+        return to_create, to_update
+
+    def has_changes(self, model, obj, values, fields):
+        return any(
+            model._meta.get_field(field).to_python(getattr(obj, field))
+            != values[field]
+            for field in fields
+        )
+
+    def delete_missing(self, name, seen_ids):
+        """Удаляет строки таблицы, id которых нет в импортированном файле.
+
+        id таблицы читаются страницами по batch_size, и отсутствующие
+        в файле строки страницы удаляются сразу: в памяти не бывает
+        больше одной страницы id.
+        """
+        model = self.MODELS[name]
+        deleted = 0
+        for ids in id_batches(model, self.batch_size):
+            missing_ids = [pk for pk in ids if pk not in seen_ids]
+            if missing_ids:
+                deleted += self.delete_rows(model, missing_ids)
+        return deleted
+
+    def delete_rows(self, model, ids):
+        """Удаляет строки по id и возвращает их число.
+
+        QuerySet.delete() минует User.delete(), поэтому подписчики
+        авторов, на которых были подписаны удалённые пользователи,
+        пересчитываются здесь же.
+        """
+        with transaction.atomic():
+            author_ids = []
+            if model is User:
+                author_ids = list(
+                    Follow.objects.filter(user_id__in=ids)
+                    .values_list("author_id", flat=True)
+                    .distinct()
                 )
-            Comment.objects.bulk_create(comments_to_create)
-        self.stdout.write(self.style.SUCCESS("Comments data imported successfully"))
+            _, per_model = model.objects.filter(pk__in=ids).delete()
+            recount_followers(author_ids)
+        return per_model.get(model._meta.label, 0)
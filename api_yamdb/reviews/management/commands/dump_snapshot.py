@@ -0,0 +1,39 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_yamdb.snapshot import snapshot_models, write_snapshot
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Dump the users and reviews tables into a binary columnar snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file to write")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows fetched from the database at a time",
+        )
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            tables = write_snapshot(
+                kwargs["path"],
+                snapshot_models(),
+                kwargs.get("chunk_size") or DEFAULT_CHUNK_SIZE,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        for table in tables:
+            self.stdout.write(f"{table['table']}: {table['rows']} rows")
+        self.stdout.write(
+            self.style.SUCCESS("Snapshot written successfully")
+            + f" ({os.path.getsize(kwargs['path'])} bytes"
+            f" in {time.perf_counter() - started:.2f}s)"
+        )
@@ -0,0 +1,199 @@
+import csv
+import os
+import time
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api_yamdb.parallel import ordered_map
+from reviews.aggregates import describe_changes, recompute_aggregates
+from reviews.dataset import generate_chunk, generate_parsed_chunk, zipf_counts
+from reviews.management.commands.csv_export import Command as ExportCommand
+from reviews.management.commands.csv_import import (
+    DEFAULT_BATCH_SIZE,
+    Command as ImportCommand,
+)
+
+DEFAULT_CHUNK_SIZE = 10000
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset in the csv_import format"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=6)
+        parser.add_argument("--genres", type=int, default=15)
+        parser.add_argument("--titles", type=int, default=1000)
+        parser.add_argument("--reviews", type=int, default=10000)
+        parser.add_argument("--comments", type=int, default=20000)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of title, author and review popularity",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes generating chunks",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows generated per chunk",
+        )
+        parser.add_argument(
+            "--output-dir",
+            help="Write CSV files to this directory instead of the database",
+        )
+
+    def handle(self, *args, **kwargs):
+        self.chunk_size = kwargs.get("chunk_size") or DEFAULT_CHUNK_SIZE
+        output_dir = kwargs.get("output_dir")
+        sizes = {
+            "users": kwargs["users"],
+            "category": kwargs["categories"],
+            "genre": kwargs["genres"],
+            "titles": kwargs["titles"],
+            "comments": kwargs["comments"],
+            "skew": kwargs["skew"],
+            "seed": kwargs["seed"],
+        }
+        for name in ("users", "category", "genre", "titles"):
+            if sizes[name] < 1:
+                raise CommandError(f"At least one row of {name} is required")
+        review_counts = zipf_counts(
+            kwargs["reviews"], sizes["titles"], sizes["skew"], sizes["users"]
+        )
+        sizes["reviews"] = sum(review_counts)
+        if not sizes["reviews"]:
+            sizes["comments"] = 0
+        if output_dir is None:
+            self.check_database_is_empty()
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+
+        started = time.perf_counter()
+        stages = ImportCommand().import_order()
+        tasks = self.tasks(stages, sizes, review_counts)
+        generate = generate_chunk if output_dir else generate_parsed_chunk
+        chunks = ordered_map(generate, tasks, kwargs.get("workers") or 1)
+        generated = set()
+        for name, group in groupby(chunks, key=lambda chunk: chunk[0]):
+            generated.add(name)
+            self.write_table(name, group, output_dir)
+        if output_dir:
+            # Для пустых таблиц тоже нужны файлы с заголовком.
+            for name in stages:
+                if name not in generated:
+                    self.write_table(name, [], output_dir)
+        else:
+            changes = recompute_aggregates(DEFAULT_BATCH_SIZE)
+            self.stdout.write(
+                self.style.SUCCESS("Aggregates recomputed successfully")
+                + f" ({describe_changes(changes)})"
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Dataset generated successfully")
+            + f" in {time.perf_counter() - started:.2f}s"
+        )
+
+    def write_table(self, name, chunks, output_dir):
+        table_started = time.perf_counter()
+        rows = (row for _, chunk in chunks for row in chunk)
+        if output_dir:
+            count = self.write_csv(name, rows, output_dir)
+        else:
+            count = self.write_database(name, rows)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{ImportCommand.LABELS[name]} data generated successfully"
+            )
+            + f" ({count} rows in {time.perf_counter() - table_started:.2f}s)"
+        )
+
+    def check_database_is_empty(self):
+        for name in ImportCommand.CSV_FILES:
+            if ImportCommand.MODELS[name].objects.exists():
+                raise CommandError(
+                    "The database already has data; generate into an empty "
+                    "database or use --output-dir"
+                )
+
+    def tasks(self, stages, sizes, review_counts):
+        """Задачи генерации кусков в порядке импорта таблиц.
+
+        Куски пользователей, произведений и комментариев - диапазоны id.
+        Отзывы делятся по произведениям так, чтобы в куске было около
+        chunk_size отзывов; куску передаются число отзывов каждого
+        произведения и id его первого отзыва.
+        """
+        for name in stages:
+            if name == "reviews":
+                yield from self.review_tasks(sizes, review_counts)
+                continue
+            total = sizes["titles"] if name == "genre_title" else sizes[name]
+            for chunk, start in enumerate(range(1, total + 1, self.chunk_size)):
+                stop = min(start + self.chunk_size, total + 1)
+                yield name, (name, chunk, sizes, start, stop)
+
+    def review_tasks(self, sizes, review_counts):
+        chunk = 0
+        first_title = 1
+        first_review_id = 1
+        reviews = 0
+        for title_id, count in enumerate(review_counts, start=1):
+            reviews += count
+            if reviews >= self.chunk_size or title_id == len(review_counts):
+                yield "reviews", (
+                    "reviews",
+                    chunk,
+                    sizes,
+                    first_title,
+                    title_id + 1,
+                    first_review_id,
+                    review_counts[first_title - 1:title_id],
+                )
+                chunk += 1
+                first_title = title_id + 1
+                first_review_id += reviews
+                reviews = 0
+
+    def write_csv(self, name, rows, output_dir):
+        path = os.path.join(output_dir, ImportCommand.CSV_FILES[name])
+        _, columns = ExportCommand.COLUMNS[name]
+        count = 0
+        with open(
+            path, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+        ) as output:
+            writer = csv.DictWriter(
+                output, fieldnames=list(columns), lineterminator="\n"
+            )
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def write_database(self, name, rows):
+        """Пишет строки в базу пачками тем же путём, что и csv_import."""
+        importer = ImportCommand(stdout=self.stdout, stderr=self.stderr)
+        count = 0
+        batch = []
+        with transaction.atomic():
+            for row in rows:
+                batch.append(row)
+                if len(batch) == DEFAULT_BATCH_SIZE:
+                    importer.write_batch(name, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                importer.write_batch(name, batch)
+                count += len(batch)
+        return count
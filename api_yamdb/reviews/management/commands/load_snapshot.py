@@ -0,0 +1,94 @@
+import time
+from contextlib import ExitStack
+from itertools import islice
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from api_yamdb.snapshot import Snapshot, detached_models
+from reviews.bulk_load import sqlite_bulk_load
+from users.authentication import reset_auth_caches
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = "Replace the users and reviews tables with the contents of a snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file written by dump_snapshot")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows inserted per executemany call",
+        )
+        parser.add_argument(
+            "--bulk-load",
+            action="store_true",
+            help="Relax SQLite journaling and syncing while loading",
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs.get("batch_size") or DEFAULT_BATCH_SIZE
+        started = time.perf_counter()
+        try:
+            snapshot = Snapshot(kwargs["path"])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        with snapshot, ExitStack() as stack:
+            if kwargs.get("bulk_load"):
+                stack.enter_context(sqlite_bulk_load(connection))
+            models = [self.check_table(table) for table in snapshot.tables]
+            tables = [table["table"] for table in snapshot.tables]
+            # Связи с таблицами вне снимка не восстанавливаются.
+            tables += [
+                model._meta.db_table
+                for model in detached_models()
+                if model._meta.db_table not in tables
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                for table in reversed(tables):
+                    cursor.execute(f"DELETE FROM {connection.ops.quote_name(table)}")
+                for table in snapshot.tables:
+                    self.load_table(cursor, snapshot, table, batch_size)
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+        reset_auth_caches()
+        self.stdout.write(
+            self.style.SUCCESS("Snapshot loaded successfully")
+            + f" in {time.perf_counter() - started:.2f}s"
+        )
+
+    def check_table(self, table):
+        """Проверяет, что столбцы снимка совпадают со столбцами модели."""
+        model = apps.get_model(table["model"])
+        columns = [field.column for field in model._meta.concrete_fields]
+        if columns != [column["name"] for column in table["columns"]]:
+            raise CommandError(
+                f"Snapshot columns of {table['table']} do not match the model"
+            )
+        return model
+
+    def load_table(self, cursor, snapshot, table, batch_size):
+        """Вставляет строки таблицы пачками через executemany."""
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(column["name"]) for column in table["columns"])
+        placeholders = ", ".join(["%s"] * len(table["columns"]))
+        sql = (
+            f"INSERT INTO {quote_name(table['table'])} ({columns})"
+            f" VALUES ({placeholders})"
+        )
+        table_started = time.perf_counter()
+        rows = snapshot.rows(table, connection.ops.adapt_datetimefield_value)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            cursor.executemany(sql, batch)
+        self.stdout.write(
+            f"{table['table']}: {table['rows']} rows"
+            f" in {time.perf_counter() - table_started:.2f}s"
+        )
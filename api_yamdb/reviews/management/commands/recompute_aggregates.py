@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.aggregates import (
+    DEFAULT_BATCH_SIZE,
+    describe_changes,
+    recompute_aggregates,
+)
+
+
+class Command(BaseCommand):
+    help = "Recompute title ratings, score counts and review helpfulness"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of titles or reviews recomputed per query",
+        )
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        changes = recompute_aggregates(kwargs.get("batch_size") or DEFAULT_BATCH_SIZE)
+        self.stdout.write(
+            self.style.SUCCESS("Aggregates recomputed successfully")
+            + f" ({describe_changes(changes)}"
+            f" in {time.perf_counter() - started:.2f}s)"
+        )
@@ -0,0 +1,60 @@
+# Generated by Django 3.2 on 2026-10-19 08:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0003_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewVote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.SmallIntegerField(choices=[(1, 'Полезно'), (-1, 'Бесполезно')], verbose_name='Голос')),
+            ],
+            options={
+                'verbose_name': 'Голос за отзыв',
+                'verbose_name_plural': 'Голоса за отзывы',
+            },
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='helpful_down',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Голосов «бесполезно»'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='helpful_score',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Полезность'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='helpful_up',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Голосов «полезно»'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'helpful_score'], name='review_title_helpful_idx'),
+        ),
+        migrations.AddField(
+            model_name='reviewvote',
+            name='review',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='reviews.review', verbose_name='Отзыв'),
+        ),
+        migrations.AddField(
+            model_name='reviewvote',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_votes', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewvote',
+            constraint=models.UniqueConstraint(fields=('review', 'user'), name='unique_user_review_vote'),
+        ),
+    ]
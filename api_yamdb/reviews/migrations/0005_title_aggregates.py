@@ -0,0 +1,85 @@
+# Generated by Django 3.2 on 2026-10-19 09:23
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max
+import django.db.models.deletion
+
+BATCH_SIZE = 2000
+
+
+def fill_title_aggregates(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    TitleScore = apps.get_model('reviews', 'TitleScore')
+    titles = (
+        Review.objects.values('title_id')
+        .annotate(
+            rating=Avg('score'),
+            review_count=Count('id'),
+            last_review_date=Max('pub_date'),
+        )
+        .order_by('title_id')
+    )
+    batch = []
+    for values in titles.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Title(pk=values.pop('title_id'), **values))
+        if len(batch) == BATCH_SIZE:
+            Title.objects.bulk_update(
+                batch, ['rating', 'review_count', 'last_review_date']
+            )
+            batch = []
+    Title.objects.bulk_update(
+        batch, ['rating', 'review_count', 'last_review_date']
+    )
+    scores = (
+        Review.objects.values('title_id', 'score')
+        .annotate(count=Count('id'))
+        .order_by('title_id', 'score')
+    )
+    TitleScore.objects.bulk_create(
+        (TitleScore(**values) for values in scores.iterator(chunk_size=BATCH_SIZE)),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_reviewvote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='last_review_date',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Дата последнего отзыва'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число отзывов'),
+        ),
+        migrations.CreateModel(
+            name='TitleScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(verbose_name='Число отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Оценки произведения',
+                'verbose_name_plural': 'Оценки произведений',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescore',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score'),
+        ),
+        migrations.RunPython(fill_title_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,20 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
-from reviews.validators import valildate_year
+from reviews.validators import MAX_SCORE, MIN_SCORE, valildate_year
 from users.models import User
 
 SLUG_MAX_LENGTH = 50
 NAME_MAX_LENGTH = 256
 
+VOTE_UP = 1
+VOTE_DOWN = -1
+
+VOTE_CHOICES = [
+    (VOTE_UP, "Полезно"),
+    (VOTE_DOWN, "Бесполезно"),
+]
+
 
 class Category(models.Model):
     name = models.CharField(
@@ -85,6 +93,23 @@ class Title(models.Model):
         help_text="Выберите жанр произведения",
         through="GenreTitle",
     )
+    # Сводка по отзывам. Поддерживается сигналами отзывов и
+    # пересчитывается целиком командой recompute_aggregates.
+    rating = models.FloatField(
+        verbose_name="Рейтинг",
+        null=True,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name="Число отзывов",
+        default=0,
+        editable=False,
+    )
+    last_review_date = models.DateTimeField(
+        verbose_name="Дата последнего отзыва",
+        null=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Произведение"
@@ -125,12 +150,27 @@ class Review(models.Model):
     )
     score = models.PositiveSmallIntegerField(
         verbose_name="Оценка",
-        validators=(MinValueValidator(1), MaxValueValidator(10)),
+        validators=(MinValueValidator(MIN_SCORE), MaxValueValidator(MAX_SCORE)),
     )
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации",
         auto_now_add=True,
     )
+    helpful_up = models.PositiveIntegerField(
+        verbose_name="Голосов «полезно»",
+        default=0,
+        editable=False,
+    )
+    helpful_down = models.PositiveIntegerField(
+        verbose_name="Голосов «бесполезно»",
+        default=0,
+        editable=False,
+    )
+    helpful_score = models.IntegerField(
+        verbose_name="Полезность",
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Отзыв"
@@ -141,11 +181,85 @@ class Review(models.Model):
                 name="unique_author_title_review",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "helpful_score"], name="review_title_helpful_idx"
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Оценка при загрузке: по ней сигналы сдвигают сводку произведения.
+        instance._loaded_score = (
+            None if "score" in instance.get_deferred_fields() else instance.score
+        )
+        return instance
 
     def __str__(self) -> str:
         return self.text[:10]
 
 
+class TitleScore(models.Model):
+    """Число отзывов произведения с данной оценкой."""
+
+    title = models.ForeignKey(
+        Title,
+        verbose_name="Произведение",
+        on_delete=models.CASCADE,
+        related_name="score_counts",
+    )
+    score = models.PositiveSmallIntegerField(verbose_name="Оценка")
+    count = models.PositiveIntegerField(verbose_name="Число отзывов")
+
+    class Meta:
+        verbose_name = "Оценки произведения"
+        verbose_name_plural = "Оценки произведений"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["title", "score"],
+                name="unique_title_score",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.title}: {self.score} x {self.count}"
+
+
+class ReviewVote(models.Model):
+    """Голос пользователя за полезность отзыва."""
+
+    review = models.ForeignKey(
+        Review,
+        verbose_name="Отзыв",
+        on_delete=models.CASCADE,
+        related_name="votes",
+    )
+    user = models.ForeignKey(
+        User,
+        verbose_name="Пользователь",
+        on_delete=models.CASCADE,
+        related_name="review_votes",
+    )
+    value = models.SmallIntegerField(
+        verbose_name="Голос",
+        choices=VOTE_CHOICES,
+    )
+
+    class Meta:
+        verbose_name = "Голос за отзыв"
+        verbose_name_plural = "Голоса за отзывы"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["review", "user"],
+                name="unique_user_review_vote",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user}: {self.value}"
+
+
 class Comment(models.Model):
     text = models.TextField("Комментарий")
     review = models.ForeignKey(
@@ -172,3 +286,46 @@ class Comment(models.Model):
 
     def __str__(self) -> str:
         return self.text[:10]
+
+
+class TimelineEntry(models.Model):
+    """Отзыв в ленте подписчика его автора."""
+
+    user = models.ForeignKey(
+        User,
+        verbose_name="Владелец ленты",
+        on_delete=models.CASCADE,
+        related_name="timeline",
+    )
+    review = models.ForeignKey(
+        Review,
+        verbose_name="Отзыв",
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name="Автор отзыва",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    pub_date = models.DateTimeField(verbose_name="Дата публикации")
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "review"],
+                name="unique_user_review_timeline",
+            )
+        ]
+        # Чтение ленты - один проход по диапазону этого индекса.
+        indexes = [
+            models.Index(
+                fields=["user", "-pub_date"], name="timeline_user_date_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user}: {self.review}"
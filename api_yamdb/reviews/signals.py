@@ -0,0 +1,110 @@
+import threading
+
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from reviews.aggregates import (
+    recompute_reviews,
+    recompute_titles,
+    shift_title_score,
+)
+from reviews.models import Review, ReviewVote, Title
+from users.models import User
+
+# Пользователи и произведения, удаляемые в этом потоке, а также
+# произведения и отзывы, сводки которых нужно пересчитать после
+# каскадного удаления отзывов и голосов.
+_cascade = threading.local()
+
+
+def _pending(name):
+    if not hasattr(_cascade, name):
+        setattr(_cascade, name, set())
+    return getattr(_cascade, name)
+
+
+@receiver(post_save, sender=Review)
+def update_title_aggregates(sender, instance, created, **kwargs):
+    """Сдвигает сводку произведения на оценку созданного или изменённого отзыва.
+
+    Если оценка не изменилась, сводка не трогается. Отзыв с неизвестной
+    прежней оценкой (загружен без поля score) пересчитывает сводку целиком.
+    """
+    loaded_score = getattr(instance, "_loaded_score", None)
+    if created:
+        shift_title_score(
+            instance.title_id, added=instance.score, pub_date=instance.pub_date
+        )
+    elif loaded_score is None:
+        recompute_titles([instance.title_id])
+    elif loaded_score != instance.score:
+        shift_title_score(
+            instance.title_id, added=instance.score, removed=loaded_score
+        )
+    instance._loaded_score = instance.score
+
+
+@receiver(pre_delete, sender=User)
+@receiver(pre_delete, sender=Title)
+def start_cascade(sender, instance, **kwargs):
+    """Запоминает удаляемого пользователя или произведение.
+
+    Django отправляет pre_delete всем удаляемым объектам до удаления
+    первого из них, поэтому к удалению отзывов владелец уже известен.
+    """
+    _pending("users" if sender is User else "titles").add(instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def remove_from_title_aggregates(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва из сводки произведения.
+
+    Отзывы, удалённые каскадом вместе с произведением, сводку не трогают,
+    а вместе с автором - откладывают её пересчёт до удаления автора.
+    """
+    if instance.title_id in _pending("titles"):
+        return
+    if instance.author_id in _pending("users"):
+        _pending("title_ids").add(instance.title_id)
+        return
+    shift_title_score(
+        instance.title_id, removed=instance.score, pub_date=instance.pub_date
+    )
+
+
+@receiver(post_delete, sender=ReviewVote)
+def remove_deleted_voter(sender, instance, **kwargs):
+    """Откладывает пересчёт полезности отзыва до удаления голосовавшего.
+
+    Отдельные голоса отзывает retract_vote, сам сдвигая счётчики;
+    здесь учитываются только голоса, удалённые вместе с пользователем.
+    """
+    if instance.user_id in _pending("users"):
+        _pending("review_ids").add(instance.review_id)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Title)
+def finish_cascade(sender, instance, **kwargs):
+    """Пересчитывает одним проходом сводки, отложенные каскадом.
+
+    Зависимые строки удаляются раньше владельцев, так что при удалении
+    пачки пользователей пересчёт выполняет первый из них, а для
+    остальных отложенных произведений и отзывов уже не остаётся.
+    """
+    _pending("users" if sender is User else "titles").discard(instance.pk)
+    title_ids = _pending("title_ids")
+    if title_ids:
+        _cascade.title_ids = set()
+        recompute_titles(list(title_ids))
+    review_ids = _pending("review_ids")
+    if review_ids:
+        _cascade.review_ids = set()
+        recompute_reviews(list(review_ids))
+
+
+@receiver(request_finished)
+def reset_cascade(sender, **kwargs):
+    """Забывает удаления, прерванные исключением до post_delete."""
+    _cascade.__dict__.clear()
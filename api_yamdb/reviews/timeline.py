@@ -0,0 +1,149 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from api_yamdb.background import BackgroundWorker
+from reviews.models import Review, TimelineEntry
+from users.models import Follow, User
+
+
+def is_celebrity(followers_count):
+    """Проверяет, читают ли ленту автора при чтении, а не при записи."""
+    return followers_count >= settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+
+
+def fanout_review(review_id):
+    """Раскладывает отзыв по лентам подписчиков его автора.
+
+    Подписчики перебираются пачками по TIMELINE_FANOUT_BATCH_SIZE
+    по индексу (author, user), каждая пачка - один INSERT.
+    """
+    review = (
+        Review.objects.filter(id=review_id)
+        .values("author_id", "pub_date")
+        .first()
+    )
+    if review is None:
+        return
+    followers = (
+        Follow.objects.filter(author_id=review["author_id"])
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+    )
+    batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+    last_user_id = 0
+    while True:
+        batch = list(followers.filter(user_id__gt=last_user_id)[:batch_size])
+        if not batch:
+            break
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user_id=user_id,
+                    review_id=review_id,
+                    author_id=review["author_id"],
+                    pub_date=review["pub_date"],
+                )
+                for user_id in batch
+            ],
+            ignore_conflicts=True,
+        )
+        last_user_id = batch[-1]
+
+
+fanout_worker = BackgroundWorker(
+    "timeline-fanout", settings.TIMELINE_FANOUT_QUEUE_SIZE
+)
+
+
+def schedule_fanout(review):
+    """Ставит рассылку отзыва в очередь после фиксации транзакции."""
+    followers_count = (
+        User.objects.filter(id=review.author_id)
+        .values_list("followers_count", flat=True)
+        .first()
+    )
+    if not followers_count or is_celebrity(followers_count):
+        return
+    if settings.TIMELINE_FANOUT_ASYNC:
+        transaction.on_commit(
+            lambda: fanout_worker.submit(fanout_review, review.id)
+        )
+    else:
+        fanout_worker.run_inline(fanout_review, review.id)
+
+
+def follow_author(user, author):
+    """Подписывает пользователя на автора.
+
+    Возвращает False, если подписка уже существовала.
+    """
+    try:
+        with transaction.atomic():
+            _follow(user, author)
+    except IntegrityError:
+        # Подписка уже существует: INSERT нарушил уникальность (user, author).
+        return False
+    return True
+
+
+def _follow(user, author):
+    Follow.objects.create(user=user, author=author)
+    User.objects.filter(id=author.id).update(
+        followers_count=F("followers_count") + 1
+    )
+    if not is_celebrity(author.followers_count + 1):
+        recent = Review.objects.filter(author=author).order_by("-pub_date")
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user=user,
+                    review_id=review_id,
+                    author=author,
+                    pub_date=pub_date,
+                )
+                for review_id, pub_date in recent.values_list(
+                    "id", "pub_date"
+                )[: settings.TIMELINE_BACKFILL_SIZE]
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def unfollow_author(user, author):
+    """Отменяет подписку и убирает отзывы автора из ленты пользователя.
+
+    Возвращает False, если подписки не было.
+    """
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        if not deleted:
+            return False
+        User.objects.filter(id=author.id).update(
+            followers_count=F("followers_count") - 1
+        )
+        TimelineEntry.objects.filter(user=user, author=author).delete()
+    return True
+
+
+def get_timeline(user):
+    """Возвращает ленту пользователя как пары (pub_date, review_id).
+
+    Основная часть - диапазон индекса (user, -pub_date) таблицы ленты.
+    Отзывы авторов с большим числом подписчиков подмешиваются при чтении.
+    """
+    entries = TimelineEntry.objects.filter(user=user).values_list(
+        "pub_date", "review_id"
+    )
+    celebrities = Follow.objects.filter(
+        user=user,
+        author__followers_count__gte=settings.TIMELINE_FANOUT_MAX_FOLLOWERS,
+    ).values_list("author_id", flat=True)
+    if celebrities.exists():
+        pulled = (
+            Review.objects.filter(author_id__in=celebrities)
+            .annotate(review_id=F("id"))
+            .values_list("pub_date", "review_id")
+        )
+        entries = entries.union(pulled)
+    return entries.order_by("-pub_date", "-review_id")
@@ -2,6 +2,9 @@ from datetime import datetime
 
 from django.core.exceptions import ValidationError
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+
 
 def valildate_year(value):
     current_year = datetime.now().year
@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models import F
+
+from reviews.models import VOTE_UP, Review, ReviewVote
+
+
+def _apply_delta(review_id, up, down):
+    """Сдвигает счётчики полезности отзыва одним UPDATE.
+
+    Выполняется последним запросом транзакции, чтобы строка отзыва
+    оставалась заблокированной как можно меньше.
+    """
+    if not up and not down:
+        return
+    Review.objects.filter(id=review_id).update(
+        helpful_up=F("helpful_up") + up,
+        helpful_down=F("helpful_down") + down,
+        helpful_score=F("helpful_score") + up - down,
+    )
+
+
+def _split(value):
+    return (1, 0) if value == VOTE_UP else (0, 1)
+
+
+def cast_vote(user, review, value):
+    """Учитывает голос пользователя за отзыв, заменяя прежний голос."""
+    with transaction.atomic():
+        vote, created = ReviewVote.objects.get_or_create(
+            review=review, user=user, defaults={"value": value}
+        )
+        up, down = _split(value)
+        if not created:
+            if vote.value == value:
+                return
+            # Счётчики сдвигаем, только если голос изменили именно мы.
+            if not ReviewVote.objects.filter(id=vote.id, value=vote.value).update(
+                value=value
+            ):
+                return
+            old_up, old_down = _split(vote.value)
+            up, down = up - old_up, down - old_down
+        _apply_delta(review.id, up, down)
+
+
+def retract_vote(user, review):
+    """Отзывает голос пользователя. Возвращает False, если голоса не было."""
+    with transaction.atomic():
+        vote = ReviewVote.objects.filter(review=review, user=user).first()
+        if vote is None:
+            return False
+        deleted, _ = ReviewVote.objects.filter(id=vote.id).delete()
+        if not deleted:
+            return False
+        up, down = _split(vote.value)
+        _apply_delta(review.id, -up, -down)
+    return True
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     name = "users"
     verbose_name = "Пользователи"
+
+    def ready(self):
+        import users.checks  # noqa: F401
+        import users.signals  # noqa: F401
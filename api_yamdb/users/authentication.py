@@ -0,0 +1,128 @@
+import math
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.cache import LRUCache, TTLCache
+from users.models import User
+
+# Поля пользователя, достаточные для аутентификации и проверки прав.
+# Остальные поля у закэшированного пользователя отложены (deferred)
+# и загружаются из базы при первом обращении.
+CACHED_USER_FIELDS = ("id", "username", "role", "is_superuser", "is_active")
+
+# Утверждения токена, из которых пользователь собирается без обращения
+# к базе и кэшу (см. users.authorization.get_token).
+ROLE_CLAIMS = ("username", "role", "is_superuser", "role_version")
+
+user_cache = LRUCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL
+)
+
+# Последние известные процессу версии прав пользователей. Запись нужна
+# только пока утверждениям токена доверяют, поэтому TTL равен их сроку.
+# Вытеснение по размеру вернуло бы доверие к отозванным утверждениям.
+role_versions = TTLCache(ttl=settings.ROLE_CLAIMS_MAX_AGE)
+
+# Утверждениям токенов, выпущенных раньше этого времени, не доверяют
+# (см. reset_auth_caches).
+claims_not_before = 0
+
+
+def invalidate_cached_users(*user_ids):
+    """Удаляет пользователей из кэша аутентификации."""
+    user_cache.delete(*user_ids)
+
+
+def set_role_version(user_id, version):
+    """Запоминает актуальную версию прав пользователя.
+
+    Токены с меньшей версией перестают проходить проверку по утверждениям.
+    """
+    role_versions.set(user_id, version)
+
+
+def revoke_role_claims(user_id):
+    """Делает недействительными утверждения о правах во всех токенах."""
+    role_versions.set(user_id, math.inf)
+
+
+def reset_auth_caches():
+    """Сбрасывает кэши аутентификации после замены таблицы пользователей.
+
+    Версии прав в новой таблице могут оказаться меньше известных
+    процессу, поэтому таблица версий очищается, а утверждениям
+    в токенах, выпущенных до сброса, больше не доверяют.
+    """
+    global claims_not_before
+    user_cache.clear()
+    role_versions.clear()
+    claims_not_before = time.time()
+
+
+def _snapshot(user):
+    return tuple(getattr(user, field) for field in CACHED_USER_FIELDS)
+
+
+def _build_user(values):
+    field_names = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+    )
+
+
+def _trusted_claims(user_id, validated_token):
+    """Возвращает утверждения о правах, если им можно доверять.
+
+    Утверждениям доверяют, если токен выпущен не раньше чем
+    ROLE_CLAIMS_MAX_AGE секунд назад и права пользователя с тех пор
+    не менялись в этом процессе.
+    """
+    if any(claim not in validated_token for claim in ROLE_CLAIMS):
+        return None
+    issued_at = validated_token.get("iat")
+    if issued_at is None or time.time() - issued_at > settings.ROLE_CLAIMS_MAX_AGE:
+        return None
+    if issued_at < claims_not_before:
+        return None
+    version = validated_token["role_version"]
+    if version < role_versions.get(user_id, version):
+        return None
+    return {claim: validated_token[claim] for claim in ROLE_CLAIMS}
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без обращения к базе в типичном случае.
+
+    Пользователь собирается из утверждений о правах в свежем токене,
+    иначе берётся из кэша в памяти процесса или загружается из базы.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        claims = _trusted_claims(user_id, validated_token)
+        if claims is not None:
+            return _build_user({"id": user_id, "is_active": True, **claims})
+        snapshot = user_cache.get(user_id)
+        if snapshot is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, _snapshot(user))
+            return user
+        user = _build_user(dict(zip(CACHED_USER_FIELDS, snapshot)))
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -3,10 +3,13 @@ import random
 from smtplib import SMTPException
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, send_mail
 from django.core.validators import RegexValidator
 from rest_framework_simplejwt.tokens import AccessToken
 
+from users.mailing import confirmation_mailer
+from users.validators import USERNAME_REGEX
+
 
 def get_token(user):
     """Генерирует и возвращает токен для заданного пользователя.
@@ -18,6 +21,12 @@ def get_token(user):
         dict: Словарь, содержащий только доступный токен, без refresh.
     """
     access = AccessToken.for_user(user)
+    # Утверждения о правах позволяют проверять доступ без загрузки
+    # пользователя из базы (см. users.authentication).
+    access["username"] = user.username
+    access["role"] = user.role
+    access["is_superuser"] = user.is_superuser
+    access["role_version"] = user.role_version
 
     return {
         "access": str(access),
@@ -27,6 +36,9 @@ def get_token(user):
 def send_mail_with_code(data):
     """Отправляет код подтверждения на указанный адрес электронной почты.
 
+    При CONFIRMATION_EMAIL_ASYNC письмо ставится в очередь фоновой
+    отправки и функция не ждёт почтового бэкенда.
+
     Args:
         data (dict): Словарь с адресом электронной почты.
 
@@ -35,6 +47,16 @@ def send_mail_with_code(data):
     """
     email = data["email"]
     confirmation_code = random.randint(1000, 9999)
+    if settings.CONFIRMATION_EMAIL_ASYNC:
+        confirmation_mailer.submit(
+            EmailMessage(
+                "Код подтверждения",
+                f"Ваш код подтверждения {confirmation_code}",
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+            )
+        )
+        return str(confirmation_code)
     try:
         send_mail(
             "Код подтверждения",
@@ -57,5 +79,5 @@ class UsernameValidator(RegexValidator):
     что имя пользователя содержит только разрешенные символы.
     """
 
-    regex = r"^[\w.@+-]+$"
+    regex = USERNAME_REGEX
     flags = 0
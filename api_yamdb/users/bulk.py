@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models import F
+
+from users.authentication import (
+    invalidate_cached_users,
+    revoke_role_claims,
+    set_role_version,
+)
+from users.models import Follow, User, normalize_identifier, recount_followers
+
+OPERATION_SET_ROLE = "set_role"
+OPERATION_DEACTIVATE = "deactivate"
+OPERATION_DELETE = "delete"
+
+OPERATION_CHOICES = [
+    (OPERATION_SET_ROLE, OPERATION_SET_ROLE),
+    (OPERATION_DEACTIVATE, OPERATION_DEACTIVATE),
+    (OPERATION_DELETE, OPERATION_DELETE),
+]
+
+STATUS_UPDATED = "updated"
+STATUS_UNCHANGED = "unchanged"
+STATUS_DELETED = "deleted"
+STATUS_NOT_FOUND = "not_found"
+STATUS_SKIPPED = "skipped"
+
+
+def _set_role(users, role):
+    """Меняет роль пользователей, у которых она другая."""
+    changed_ids = {user_id for user_id, user_role, _ in users if user_role != role}
+    User.objects.filter(id__in=changed_ids).update(
+        role=role, role_version=F("role_version") + 1
+    )
+    return changed_ids
+
+
+def _deactivate(users, role):
+    """Деактивирует активных пользователей."""
+    changed_ids = {user_id for user_id, _, is_active in users if is_active}
+    User.objects.filter(id__in=changed_ids).update(
+        is_active=False, role_version=F("role_version") + 1
+    )
+    return changed_ids
+
+
+def _delete(users, role):
+    """Удаляет пользователей.
+
+    Подписки удаляются каскадом: счётчики подписчиков авторов,
+    на которых были подписаны удалённые, пересчитываются сразу.
+    """
+    changed_ids = {user_id for user_id, _, _ in users}
+    author_ids = list(
+        Follow.objects.filter(user_id__in=changed_ids)
+        .values_list("author_id", flat=True)
+        .distinct()
+    )
+    User.objects.filter(id__in=changed_ids).delete()
+    recount_followers(author_ids)
+    return changed_ids
+
+
+OPERATIONS = {
+    OPERATION_SET_ROLE: _set_role,
+    OPERATION_DEACTIVATE: _deactivate,
+    OPERATION_DELETE: _delete,
+}
+
+
+def _reset_auth(operation, changed_ids):
+    """Сбрасывает кэши аутентификации изменённых пользователей."""
+    invalidate_cached_users(*changed_ids)
+    if operation == OPERATION_DELETE:
+        for user_id in changed_ids:
+            revoke_role_claims(user_id)
+        return
+    for user_id, version in User.objects.filter(id__in=changed_ids).values_list(
+        "id", "role_version"
+    ):
+        set_role_version(user_id, version)
+
+
+def _status(user, actor, changed_ids, done):
+    if user is None:
+        return STATUS_NOT_FOUND
+    if user[0] == actor.id:
+        return STATUS_SKIPPED
+    if user[0] in changed_ids:
+        return done
+    return STATUS_UNCHANGED
+
+
+def apply_bulk_operation(actor, usernames, operation, role=None):
+    """Применяет операцию к набору пользователей одной транзакцией.
+
+    Пользователи находятся одним запросом, изменение выполняется одним
+    UPDATE или DELETE по списку id, после чего кэши аутентификации
+    сбрасываются для всех изменённых пользователей сразу. Свою учётную
+    запись администратор не изменяет. Возвращает список словарей
+    с именем и итогом для каждого запрошенного имени.
+    """
+    requested = {normalize_identifier(username): username for username in usernames}
+    with transaction.atomic():
+        rows = User.objects.filter(username_normalized__in=requested).values_list(
+            "id", "username", "username_normalized", "role", "is_active"
+        )
+        found = {}
+        candidates = []
+        for user_id, username, username_normalized, user_role, is_active in rows:
+            found[username_normalized] = (user_id, username)
+            if user_id != actor.id:
+                candidates.append((user_id, user_role, is_active))
+        changed_ids = OPERATIONS[operation](candidates, role)
+    _reset_auth(operation, changed_ids)
+
+    done = STATUS_DELETED if operation == OPERATION_DELETE else STATUS_UPDATED
+    results = []
+    for username_normalized, username in requested.items():
+        user = found.get(username_normalized)
+        results.append(
+            {
+                "username": user[1] if user else username,
+                "status": _status(user, actor, changed_ids, done),
+            }
+        )
+    return results
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш процесса с ограничением размера и TTL.
+
+    Записи старше ttl секунд считаются отсутствующими, при переполнении
+    вытесняется запись, к которой дольше всего не обращались.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TTLCache:
+    """Потокобезопасный кэш процесса, записи которого живут ttl секунд.
+
+    В отличие от LRUCache, записи не вытесняются по размеру: он ограничен
+    числом записей, сделанных за ttl. Запись перемещается в конец только
+    при изменении, поэтому в начале всегда самые старые записи, и истёкшие
+    удаляются оттуда при каждой новой записи.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return default
+        return item[1]
+
+    def set(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (now + self.ttl, value)
+            while next(iter(self._data.values()))[0] <= now:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
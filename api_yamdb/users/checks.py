@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_confirmation_code_cache(app_configs, **kwargs):
+    """Кэш кодов подтверждения должен быть общим для процессов.
+
+    В кэше отдельного процесса код, выданный одним процессом, не найдут
+    остальные, а перезапуск теряет все ожидающие коды.
+    """
+    alias = settings.CONFIRMATION_CODE_CACHE
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend is None:
+        return [
+            Error(
+                f"Кэш `{alias}` из CONFIRMATION_CODE_CACHE не описан в CACHES.",
+                id="users.E001",
+            )
+        ]
+    if backend in LOCAL_CACHE_BACKENDS:
+        return [
+            Error(
+                f"Кэш кодов подтверждения `{alias}` не общий для процессов.",
+                hint="Укажите в CONFIRMATION_CODE_CACHE кэш memcached, redis "
+                "или файловый.",
+                id="users.E002",
+            )
+        ]
+    return []
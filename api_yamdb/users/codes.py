@@ -0,0 +1,45 @@
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class ConfirmationCodeStore:
+    """Хранилище кодов подтверждения с ограниченным сроком жизни.
+
+    Коды лежат в кэше CONFIRMATION_CODE_CACHE и истекают через
+    CONFIRMATION_CODE_TTL секунд, таблица пользователей не меняется.
+    Кэш должен быть общим для процессов (file, memcached, redis) -
+    это проверяет users.checks.
+    """
+
+    key_prefix = "confirmation-code"
+
+    def __init__(self, cache_alias, ttl):
+        self.cache_alias = cache_alias
+        self.ttl = ttl
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, user_id):
+        return f"{self.key_prefix}:{user_id}"
+
+    def set(self, user_id, code):
+        self.cache.set(self._key(user_id), str(code), timeout=self.ttl)
+
+    def check(self, user_id, code):
+        """Проверяет код, не раскрывая по времени ответа его совпадение."""
+        stored = self.cache.get(self._key(user_id))
+        return stored is not None and secrets.compare_digest(
+            stored.encode(), str(code).encode()
+        )
+
+    def discard(self, user_id):
+        self.cache.delete(self._key(user_id))
+
+
+confirmation_codes = ConfirmationCodeStore(
+    settings.CONFIRMATION_CODE_CACHE, settings.CONFIRMATION_CODE_TTL
+)
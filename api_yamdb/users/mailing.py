@@ -0,0 +1,105 @@
+import logging
+import queue
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from api_yamdb.background import BackgroundWorker
+
+logger = logging.getLogger(__name__)
+
+
+class MailerPool(BackgroundWorker):
+    """Пул фоновых потоков для отправки писем из ограниченной очереди.
+
+    Поток забирает из очереди до batch_size писем и отправляет их через
+    одно соединение с почтовым бэкендом. Каждое письмо отправляется
+    отдельно и повторяется с растущей задержкой само по себе, так что
+    сбой посреди пачки не отправляет уже ушедшие письма повторно.
+    Итоги отправки пишутся в лог и в счётчики stats().
+    """
+
+    def __init__(self, workers, queue_size, batch_size, retries, backoff):
+        super().__init__("mailer", queue_size, workers=workers)
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self._stats = Counter()
+
+    def submit(self, message):
+        """Ставит письмо в очередь.
+
+        Если очередь переполнена, письмо отправляется в вызывающем потоке.
+        """
+        queued = super().submit(self._deliver, [message])
+        self._count("queued" if queued else "inline")
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self._stats[key] += value
+
+    def _next_tasks(self):
+        tasks = super()._next_tasks()
+        while len(tasks) < self.batch_size:
+            try:
+                tasks.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return tasks
+
+    def _execute(self, tasks):
+        # Письма всех задач прохода уходят одной пачкой через одно соединение.
+        messages = [message for _, (batch,) in tasks for message in batch]
+        super()._execute([(self._deliver, (messages,))])
+
+    def _deliver(self, messages):
+        started = time.monotonic()
+        sent = 0
+        connection = get_connection()
+        try:
+            for message in messages:
+                sent += self._send(connection, message)
+        finally:
+            connection.close()
+        self._count("sent", sent)
+        self._count("batches")
+        logger.info("Sent %d email(s) in %.3fs", sent, time.monotonic() - started)
+
+    def _send(self, connection, message):
+        """Отправляет одно письмо, повторяя попытки. Возвращает число отправленных.
+
+        После ошибки соединение закрывается: следующая попытка и следующие
+        письма пачки открывают его заново.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                connection.open()
+                return connection.send_messages([message]) or 0
+            except Exception as error:
+                connection.close()
+                if attempt == self.retries:
+                    self._count("failed")
+                    logger.error(
+                        "Failed to send email to %s after %d attempt(s): %s",
+                        message.to,
+                        attempt + 1,
+                        error,
+                    )
+                    return 0
+                self._count("retried")
+                time.sleep(self.backoff * 2**attempt)
+
+
+confirmation_mailer = MailerPool(
+    workers=settings.CONFIRMATION_EMAIL_WORKERS,
+    queue_size=settings.CONFIRMATION_EMAIL_QUEUE_SIZE,
+    batch_size=settings.CONFIRMATION_EMAIL_BATCH_SIZE,
+    retries=settings.CONFIRMATION_EMAIL_RETRIES,
+    backoff=settings.CONFIRMATION_EMAIL_RETRY_BACKOFF,
+)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from users.models import User
+from users.search import INDEX_BATCH_SIZE, index_usernames
+
+
+class Command(BaseCommand):
+    help = "Rebuild normalized usernames/emails and the username trigram index"
+
+    def handle(self, *args, **kwargs):
+        batch = []
+        total = 0
+        users = User.objects.only("username", "email").order_by("id")
+        for user in users.iterator(chunk_size=INDEX_BATCH_SIZE):
+            user.normalize_identifiers()
+            batch.append(user)
+            if len(batch) == INDEX_BATCH_SIZE:
+                total += self.flush(batch)
+                batch = []
+        total += self.flush(batch)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} users"))
+
+    def flush(self, users):
+        User.objects.bulk_update(users, ["username_normalized", "email_normalized"])
+        index_usernames((user.id, user.username_normalized) for user in users)
+        return len(users)
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-19 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_follow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Увеличивается при изменении роли или статуса пользователя', verbose_name='Версия прав'),
+        ),
+    ]
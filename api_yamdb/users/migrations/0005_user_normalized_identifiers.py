@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def fill_normalized_identifiers(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    batch = []
+    for user in User.objects.only('username', 'email').iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        user.username_normalized = user.username.casefold()
+        user.email_normalized = user.email.casefold()
+        batch.append(user)
+        if len(batch) == BATCH_SIZE:
+            User.objects.bulk_update(
+                batch, ['username_normalized', 'email_normalized']
+            )
+            batch = []
+    User.objects.bulk_update(batch, ['username_normalized', 'email_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='username_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150, verbose_name='Имя пользователя для поиска'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=254, verbose_name='Email для поиска'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            fill_normalized_identifiers, migrations.RunPython.noop
+        ),
+    ]
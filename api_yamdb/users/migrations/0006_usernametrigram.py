@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-19 08:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_normalized_identifiers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsernameTrigram',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Триграмма')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Триграмма имени пользователя',
+                'verbose_name_plural': 'Триграммы имён пользователей',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='usernametrigram',
+            constraint=models.UniqueConstraint(fields=('trigram', 'user'), name='unique_trigram_user'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from users.authorization import UsernameValidator
 
@@ -14,6 +16,11 @@ ROLE_CHOICES = [
 ]
 
 
+def normalize_identifier(value):
+    """Приводит имя пользователя или email к виду для поиска без учёта регистра."""
+    return value.casefold()
+
+
 class User(AbstractUser):
     """
     Модель пользователя. Расширяет стандартную модель AbstractUser.
@@ -32,6 +39,20 @@ class User(AbstractUser):
     first_name = models.CharField("Имя", max_length=150, blank=True)
     last_name = models.CharField("Фамилия", max_length=150, blank=True)
     email = models.EmailField("Email", max_length=254, unique=True)
+    # Нормализованные копии username и email: поиск без учёта регистра
+    # идёт по обычному индексу вместо UPPER()/LIKE по всей таблице.
+    username_normalized = models.CharField(
+        "Имя пользователя для поиска",
+        max_length=150,
+        db_index=True,
+        editable=False,
+    )
+    email_normalized = models.CharField(
+        "Email для поиска",
+        max_length=254,
+        db_index=True,
+        editable=False,
+    )
     role = models.CharField(
         "Роль пользователя",
         choices=ROLE_CHOICES,
@@ -40,11 +61,82 @@ class User(AbstractUser):
         default=USER,
     )
     bio = models.TextField("Биография", blank=True)
-    confirmation_code = models.CharField(
-        "Код подтверждения", max_length=100, null=True, blank=False, default="XXXX"
+    followers_count = models.PositiveIntegerField(
+        "Количество подписчиков",
+        default=0,
+        editable=False,
+    )
+    role_version = models.PositiveIntegerField(
+        "Версия прав",
+        default=0,
+        editable=False,
+        help_text="Увеличивается при изменении роли или статуса пользователя",
     )
 
     REQUIRED_FIELDS = ["email"]
+    # Поля, изменение которых делает недействительными утверждения о роли
+    # в выданных токенах.
+    PRIVILEGE_FIELDS = ("role", "is_superuser", "is_staff", "is_active")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_privileges = instance._privileges()
+        instance._loaded_username = (
+            None if "username" in instance.get_deferred_fields() else instance.username
+        )
+        return instance
+
+    def _privileges(self):
+        deferred = self.get_deferred_fields()
+        return {
+            field: getattr(self, field)
+            for field in self.PRIVILEGE_FIELDS
+            if field not in deferred
+        }
+
+    def _privileges_changed(self):
+        loaded = getattr(self, "_loaded_privileges", None)
+        if loaded is None:
+            return False
+        return any(
+            getattr(self, field) != value for field, value in loaded.items()
+        )
+
+    def normalize_identifiers(self):
+        self.username_normalized = normalize_identifier(self.username)
+        self.email_normalized = normalize_identifier(self.email)
+
+    def save(self, *args, **kwargs):
+        extra_update_fields = set()
+        deferred = self.get_deferred_fields()
+        # Для новых пользователей _loaded_username нет, и они тоже считаются
+        # сменившими имя: по этому флагу обновляется поисковый индекс.
+        self._username_changed = "username" not in deferred and (
+            getattr(self, "_loaded_username", None) != self.username
+        )
+        if not deferred & {"username", "email"}:
+            self.normalize_identifiers()
+            extra_update_fields |= {"username_normalized", "email_normalized"}
+        if self._privileges_changed():
+            self.role_version += 1
+            extra_update_fields.add("role_version")
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *extra_update_fields}
+        super().save(*args, **kwargs)
+        self._loaded_privileges = self._privileges()
+        if "username" not in deferred:
+            self._loaded_username = self.username
+
+    def delete(self, *args, **kwargs):
+        # Подписки пользователя удаляются каскадом, минуя unfollow_author:
+        # счётчики подписчиков его авторов пересчитываются здесь же.
+        with transaction.atomic():
+            author_ids = list(self.following.values_list("author_id", flat=True))
+            result = super().delete(*args, **kwargs)
+            recount_followers(author_ids)
+        return result
 
     @property
     def is_admin(self):
@@ -68,3 +160,86 @@ class User(AbstractUser):
         Строковое представление модели.
         """
         return str(self.username)
+
+
+class Follow(models.Model):
+    """
+    Подписка пользователя на автора отзывов.
+    """
+
+    user = models.ForeignKey(
+        User,
+        verbose_name="Подписчик",
+        on_delete=models.CASCADE,
+        related_name="following",
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name="Автор",
+        on_delete=models.CASCADE,
+        related_name="followers",
+    )
+
+    class Meta:
+        verbose_name = "Подписка"
+        verbose_name_plural = "Подписки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"],
+                name="unique_user_author_follow",
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F("author")),
+                name="prevent_self_follow",
+            ),
+        ]
+        # Рассылка нового отзыва подписчикам идёт по автору.
+        indexes = [
+            models.Index(fields=["author", "user"], name="follow_author_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} -> {self.author}"
+
+
+class UsernameTrigram(models.Model):
+    """
+    Триграмма нормализованного имени пользователя для поиска по подстроке.
+    """
+
+    user = models.ForeignKey(
+        User,
+        verbose_name="Пользователь",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    trigram = models.CharField("Триграмма", max_length=3)
+
+    class Meta:
+        verbose_name = "Триграмма имени пользователя"
+        verbose_name_plural = "Триграммы имён пользователей"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["trigram", "user"],
+                name="unique_trigram_user",
+            )
+        ]
+
+    def __str__(self):
+        return self.trigram
+
+
+def recount_followers(author_ids):
+    """Пересчитывает followers_count авторов author_ids по таблице подписок."""
+    User.objects.filter(id__in=author_ids).update(
+        followers_count=Coalesce(
+            Subquery(
+                Follow.objects.filter(author=OuterRef("pk"))
+                .order_by()
+                .values("author")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
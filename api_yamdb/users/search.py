@@ -0,0 +1,92 @@
+import sys
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+
+from api_yamdb.background import BackgroundWorker
+from users.models import UsernameTrigram, normalize_identifier
+
+# Верхняя граница диапазона для поиска по префиксу: в UTF-8 этот символ
+# больше любого другого, поэтому [term, term + PREFIX_END) - все строки,
+# начинающиеся с term.
+PREFIX_END = chr(sys.maxunicode)
+
+SEARCH_MODE_PREFIX = "prefix"
+
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SUBSTRING = 2
+
+INDEX_BATCH_SIZE = 1000
+
+search_index_worker = BackgroundWorker(
+    "user-search-index", settings.USER_SEARCH_INDEX_QUEUE_SIZE
+)
+
+
+def username_trigrams(username_normalized):
+    return {
+        username_normalized[i:i + 3] for i in range(len(username_normalized) - 2)
+    }
+
+
+def index_usernames(users):
+    """Перестраивает триграммы для пар (id, нормализованное имя)."""
+    if not settings.USER_SEARCH_NGRAM:
+        return
+    users = list(users)
+    for start in range(0, len(users), INDEX_BATCH_SIZE):
+        batch = users[start:start + INDEX_BATCH_SIZE]
+        UsernameTrigram.objects.filter(
+            user_id__in=[user_id for user_id, _ in batch]
+        ).delete()
+        UsernameTrigram.objects.bulk_create(
+            [
+                UsernameTrigram(user_id=user_id, trigram=trigram)
+                for user_id, username in batch
+                for trigram in username_trigrams(username)
+            ],
+            batch_size=INDEX_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def search_users(queryset, term, mode=None):
+    """Поиск пользователей по имени с ранжированием.
+
+    Сначала идёт точное совпадение, затем совпадения по префиксу
+    (диапазон индекса username_normalized), затем по подстроке.
+    Подстрока ищется среди кандидатов из триграммного индекса, а при
+    выключенном USER_SEARCH_NGRAM - полным просмотром. Для запросов
+    короче трёх символов и в режиме `prefix` ищется только префикс.
+    """
+    term = normalize_identifier(term.strip())
+    if not term:
+        return queryset
+    prefix = Q(username_normalized__gte=term, username_normalized__lt=term + PREFIX_END)
+    condition = prefix
+    if mode != SEARCH_MODE_PREFIX and len(term) >= 3:
+        substring = Q(username_normalized__contains=term)
+        if settings.USER_SEARCH_NGRAM:
+            trigrams = username_trigrams(term)
+            candidates = (
+                UsernameTrigram.objects.filter(trigram__in=trigrams)
+                .values("user_id")
+                .annotate(matched=Count("trigram"))
+                .filter(matched=len(trigrams))
+                .values("user_id")
+            )
+            substring &= Q(id__in=candidates)
+        condition |= substring
+    return (
+        queryset.filter(condition)
+        .annotate(
+            search_rank=Case(
+                When(username_normalized=term, then=Value(RANK_EXACT)),
+                When(prefix, then=Value(RANK_PREFIX)),
+                default=Value(RANK_SUBSTRING),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("search_rank", "username_normalized")
+    )
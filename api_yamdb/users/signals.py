@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import (
+    invalidate_cached_users,
+    revoke_role_claims,
+    set_role_version,
+)
+from users.models import User
+from users.search import index_usernames, search_index_worker
+
+
+@receiver(post_save, sender=User)
+def invalidate_auth_cache(sender, instance, **kwargs):
+    """Сбрасывает закэшированного пользователя и фиксирует версию его прав."""
+    invalidate_cached_users(instance.pk)
+    if "role_version" not in instance.get_deferred_fields():
+        set_role_version(instance.pk, instance.role_version)
+
+
+@receiver(post_save, sender=User)
+def update_username_index(sender, instance, **kwargs):
+    """Обновляет триграммы имени пользователя после его изменения."""
+    if not settings.USER_SEARCH_NGRAM or not getattr(
+        instance, "_username_changed", False
+    ):
+        return
+    users = [(instance.pk, instance.username_normalized)]
+    if settings.USER_SEARCH_INDEX_ASYNC:
+        transaction.on_commit(
+            lambda: search_index_worker.submit(index_usernames, users)
+        )
+    else:
+        search_index_worker.run_inline(index_usernames, users)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    """Удаляет пользователя из кэша и отзывает утверждения о его правах."""
+    invalidate_cached_users(instance.pk)
+    revoke_role_claims(instance.pk)
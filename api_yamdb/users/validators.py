@@ -0,0 +1,4 @@
+# Допустимые символы имени пользователя. Модуль не зависит от настроек
+# Django, поэтому выражение можно использовать и вне веб-приложения,
+# например при проверке строк csv_import в дочерних процессах.
+USERNAME_REGEX = r"^[\w.@+-]+$"
@@ -0,0 +1,42 @@
+import pytest
+
+from api.throttling import local_buckets
+
+
+@pytest.fixture(autouse=True)
+def sync_background_tasks(settings):
+    """Фоновые задачи в тестах выполняются в потоке запроса."""
+    settings.CONFIRMATION_EMAIL_ASYNC = False
+    settings.TIMELINE_FANOUT_ASYNC = False
+    settings.USER_SEARCH_INDEX_ASYNC = False
+
+
+@pytest.fixture(autouse=True)
+def reset_throttling():
+    """Каждый тест начинается с полными корзинами ограничения запросов."""
+    local_buckets.clear()
+
+
+@pytest.fixture(autouse=True)
+def confirmation_code_cache(settings, tmp_path):
+    """Коды подтверждения каждого теста - в своём каталоге."""
+    settings.CACHES = {
+        **settings.CACHES,
+        'confirmation_codes': {
+            **settings.CACHES['confirmation_codes'],
+            'LOCATION': str(tmp_path / 'confirmation_codes'),
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def import_manifest(settings, tmp_path):
+    """Манифест csv_import у каждого теста свой."""
+    settings.CSV_IMPORT_MANIFEST = str(tmp_path / 'csv_import_manifest.json')
+
+
+@pytest.fixture(autouse=True)
+def query_budgets(settings):
+    """Запросы к API в тестах не должны выходить за бюджеты запросов."""
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGET_RAISE = True
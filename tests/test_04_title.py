@@ -1,7 +1,11 @@
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from api.serializers import TitleSerializer
+from reviews.models import Category, Genre, Title
 from tests.utils import (
     check_pagination, check_permissions, create_categories, create_genre,
     create_titles
@@ -353,3 +357,51 @@ class Test04TitleAPI:
             f'Проверьте, что PUT-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_title_genres_resolved_in_one_query(self):
+        Category.objects.create(name='Фильм', slug='movie')
+        for idx in range(3):
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre{idx}')
+
+        def validate(genres):
+            serializer = TitleSerializer(data={
+                'name': 'Фильм', 'year': 2000, 'category': 'movie',
+                'genre': genres
+            })
+            with CaptureQueriesContext(connection) as context:
+                valid = serializer.is_valid()
+            return valid, serializer.errors, len(context.captured_queries)
+
+        valid, _, one_genre = validate(['genre0'])
+        assert valid
+        valid, _, three_genres = validate(['genre0', 'genre1', 'genre2'])
+        assert valid
+        assert three_genres == one_genre, (
+            'Проверьте, что жанры произведения ищутся одним запросом '
+            'независимо от их числа.'
+        )
+        valid, errors, _ = validate(['genre0', 'unknown'])
+        assert not valid and 'genre' in errors, (
+            'Проверьте, что несуществующий жанр отклоняется.'
+        )
+        valid, errors, _ = validate([{'slug': 'genre0'}])
+        assert not valid and 'genre' in errors
+
+    def test_08_title_destroy_skips_genres(self, admin_client):
+        title = Title.objects.create(name='Фильм', year=2000)
+        title.genre.set([
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre{idx}')
+            for idx in range(3)
+        ])
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not [
+            query for query in context.captured_queries
+            if 'FROM "reviews_genre" ' in query['sql']
+        ], (
+            'Проверьте, что при удалении произведения его жанры '
+            'не загружаются.'
+        )
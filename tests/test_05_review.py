@@ -1,8 +1,14 @@
+import warnings
 from http import HTTPStatus
 
 import pytest
+from django.core.paginator import UnorderedObjectListWarning
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 
+from api.serializers import ReviewSerializer
+from reviews.models import Review, Title
 from tests.utils import (
     check_fields, check_pagination, create_reviews, create_single_review,
     create_titles
@@ -413,3 +419,40 @@ class Test05ReviewAPI:
             f'Проверьте, что PUT-запрос к `{self.REVIEW_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_review_update_skips_unique_check(self, user):
+        title = Title.objects.create(name='Фильм', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        serializer = ReviewSerializer(
+            instance=review, data={'text': 'Новый текст'}, partial=True
+        )
+        with CaptureQueriesContext(connection) as context:
+            assert serializer.is_valid(), serializer.errors
+        assert not context.captured_queries, (
+            'Проверьте, что при изменении отзыва уникальность пары '
+            '(произведение, автор) не проверяется запросом к базе: '
+            'эти поля не меняются.'
+        )
+
+    def test_08_reviews_default_ordering(self, user_client, user, admin):
+        title = Title.objects.create(name='Фильм', year=2000)
+        older = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        newer = Review.objects.create(
+            title=title, author=admin, text='Текст', score=6
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UnorderedObjectListWarning)
+            response = user_client.get(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert [review['id'] for review in response.json()['results']] == [
+            newer.id, older.id
+        ], (
+            'Проверьте, что без параметра `ordering` отзывы отдаются '
+            'в устойчивом порядке, начиная с новых.'
+        )
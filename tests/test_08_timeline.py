@@ -0,0 +1,129 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TimelineAPI:
+
+    FOLLOW_URL_TEMPLATE = '/api/v1/users/{username}/follow/'
+    TIMELINE_URL = '/api/v1/users/me/timeline/'
+
+    def test_01_follow_not_auth(self, client, admin):
+        response = client.post(
+            self.FOLLOW_URL_TEMPLATE.format(username=admin.username)
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что POST-запрос неавторизованного пользователя к '
+            f'`{self.FOLLOW_URL_TEMPLATE}` возвращает ответ со статусом 401.'
+        )
+        response = client.get(self.TIMELINE_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.TIMELINE_URL}` возвращает ответ со статусом 401.'
+        )
+
+    def test_02_follow(self, user_client, user, admin):
+        url = self.FOLLOW_URL_TEMPLATE.format(username=admin.username)
+        response = user_client.post(url)
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос пользователя к `{url}` '
+            'возвращает ответ со статусом 201.'
+        )
+        assert response.json() == {
+            'user': user.username, 'author': admin.username
+        }
+        admin.refresh_from_db()
+        assert admin.followers_count == 1
+
+        response = user_client.post(url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторная подписка на автора возвращает ответ '
+            'со статусом 400.'
+        )
+
+        response = user_client.post(
+            self.FOLLOW_URL_TEMPLATE.format(username=user.username)
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что подписка на самого себя возвращает ответ '
+            'со статусом 400.'
+        )
+
+        response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        admin.refresh_from_db()
+        assert admin.followers_count == 0
+
+    def test_03_timeline(self, user_client, admin_client, admin,
+                         moderator_client, moderator):
+        titles, _, _ = create_titles(admin_client)
+        user_client.post(
+            self.FOLLOW_URL_TEMPLATE.format(username=admin.username)
+        )
+        create_single_review(admin_client, titles[0]['id'], 'admin text', 5)
+        create_single_review(moderator_client, titles[0]['id'], 'text', 3)
+
+        response = user_client.get(self.TIMELINE_URL)
+        assert response.status_code == HTTPStatus.OK
+        response_json = response.json()
+        assert response_json['count'] == 1, (
+            f'Проверьте, что `{self.TIMELINE_URL}` содержит только отзывы '
+            'авторов, на которых подписан пользователь.'
+        )
+        review = response_json['results'][0]
+        assert review['author'] == admin.username
+        assert review['text'] == 'admin text'
+
+        user_client.post(
+            self.FOLLOW_URL_TEMPLATE.format(username=moderator.username)
+        )
+        response = user_client.get(self.TIMELINE_URL)
+        assert response.json()['count'] == 2, (
+            'Проверьте, что после подписки в ленту попадают последние '
+            'отзывы автора.'
+        )
+
+        user_client.delete(
+            self.FOLLOW_URL_TEMPLATE.format(username=admin.username)
+        )
+        response = user_client.get(self.TIMELINE_URL)
+        results = response.json()['results']
+        assert [review['author'] for review in results] == [
+            moderator.username
+        ], (
+            'Проверьте, что после отмены подписки отзывы автора убираются '
+            'из ленты.'
+        )
+
+    def test_04_celebrity_timeline(self, settings, user_client, admin_client,
+                                   admin):
+        settings.TIMELINE_FANOUT_MAX_FOLLOWERS = 1
+        titles, _, _ = create_titles(admin_client)
+        user_client.post(
+            self.FOLLOW_URL_TEMPLATE.format(username=admin.username)
+        )
+        create_single_review(admin_client, titles[0]['id'], 'admin text', 5)
+
+        response = user_client.get(self.TIMELINE_URL)
+        response_json = response.json()
+        assert response_json['count'] == 1, (
+            'Проверьте, что отзывы авторов с большим числом подписчиков '
+            'подмешиваются в ленту при чтении.'
+        )
+        assert response_json['results'][0]['author'] == admin.username
+
+    def test_05_delete_follower(self, user_client, user, moderator_client,
+                                admin_client, admin):
+        url = self.FOLLOW_URL_TEMPLATE.format(username=admin.username)
+        user_client.post(url)
+        moderator_client.post(url)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        admin.refresh_from_db()
+        assert admin.followers_count == 1, (
+            'Проверьте, что при удалении подписчика счётчик подписчиков '
+            'автора уменьшается.'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09ReviewVotesAPI:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    VOTE_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{review_id}/vote/'
+
+    def test_01_vote(self, client, admin_client, admin, user_client, user,
+                     moderator_client, moderator):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        url = self.VOTE_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+
+        response = client.post(url, data={'value': 1})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что POST-запрос неавторизованного пользователя к '
+            f'`{self.VOTE_URL_TEMPLATE}` возвращает ответ со статусом 401.'
+        )
+
+        response = admin_client.post(url, data={'value': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что автор не может голосовать за свой отзыв.'
+        )
+
+        response = user_client.post(url, data={'value': 2})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что голос может принимать только значения 1 и -1.'
+        )
+
+        response = user_client.post(url, data={'value': 1})
+        assert response.status_code == HTTPStatus.OK
+        response_json = response.json()
+        assert response_json['helpful_up'] == 1
+        assert response_json['helpful_score'] == 1
+
+        response = user_client.post(url, data={'value': 1})
+        assert response.json()['helpful_up'] == 1, (
+            'Проверьте, что повторный голос пользователя не учитывается '
+            'дважды.'
+        )
+
+        moderator_client.post(url, data={'value': -1})
+        response = user_client.post(url, data={'value': -1})
+        response_json = response.json()
+        assert response_json['helpful_up'] == 0
+        assert response_json['helpful_down'] == 2
+        assert response_json['helpful_score'] == -2, (
+            'Проверьте, что смена голоса пересчитывает счётчики отзыва.'
+        )
+
+        response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['helpful_score'] == -1
+        response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_ordering_by_helpful(self, admin_client, admin, user_client,
+                                    user, moderator_client, moderator):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, moderator: moderator_client}
+        )
+        title_id = titles[0]['id']
+        user_client.post(
+            self.VOTE_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'value': 1}
+        )
+
+        response = user_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            {'ordering': '-helpful'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        ids = [review['id'] for review in response.json()['results']]
+        assert ids == [reviews[1]['id'], reviews[0]['id']], (
+            'Проверьте, что параметр `ordering=-helpful` сортирует отзывы '
+            'по убыванию полезности.'
+        )
+
+        response = user_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            {'ordering': 'helpful'}
+        )
+        ids = [review['id'] for review in response.json()['results']]
+        assert ids == [reviews[0]['id'], reviews[1]['id']]
@@ -0,0 +1,152 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.authentication import set_role_version
+from users.authorization import get_token
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'users_user' in query['sql']
+    ]
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_token(user)["access"]}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10AuthCache:
+
+    URL_CATEGORIES = '/api/v1/categories/'
+    URL_ME = '/api/v1/users/me/'
+    URL_USER_TEMPLATE = '/api/v1/users/{username}/'
+
+    def test_01_cached_user_skips_user_query(self, admin_client):
+        admin_client.get(self.URL_CATEGORIES)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not user_queries(context), (
+            'Проверьте, что повторный запрос с тем же токеном не загружает '
+            'пользователя из базы данных.'
+        )
+
+    def test_02_profile_of_cached_user(self, user_client, user):
+        user_client.get(self.URL_ME)
+        response = user_client.get(self.URL_ME)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что профиль пользователя из кэша аутентификации '
+            'содержит все поля.'
+        )
+
+    def test_03_role_change_invalidates_cache(self, admin_client, user_client,
+                                              user):
+        response = user_client.post(
+            self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.patch(
+            self.URL_USER_TEMPLATE.format(username=user.username),
+            data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        response = user_client.post(
+            self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что изменение роли пользователя сбрасывает его '
+            'запись в кэше аутентификации.'
+        )
+
+        response = admin_client.delete(
+            self.URL_USER_TEMPLATE.format(username=user.username)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = user_client.get(self.URL_ME)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удалённый пользователь не остаётся в кэше '
+            'аутентификации.'
+        )
+
+    def test_04_role_claims_skip_user_query(self, admin):
+        client = claims_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not user_queries(context), (
+            'Проверьте, что права пользователя с токеном, содержащим '
+            'утверждения о роли, проверяются без запроса к базе данных.'
+        )
+
+    def test_05_demotion_revokes_role_claims(self, admin_client, admin,
+                                             user_superuser_client):
+        client = claims_client(admin)
+        response = user_superuser_client.patch(
+            self.URL_USER_TEMPLATE.format(username=admin.username),
+            data={'role': 'user'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.post(
+            self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после понижения роли утверждения о правах '
+            'в ранее выданном токене перестают действовать.'
+        )
+
+    def test_06_expired_role_claims(self, settings, user, django_user_model):
+        client = claims_client(user)
+        settings.ROLE_CLAIMS_MAX_AGE = -1
+        django_user_model.objects.filter(pk=user.pk).update(role='admin')
+        response = client.post(
+            self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что устаревшие утверждения о правах не используются.'
+        )
+
+    def test_07_revocations_survive_many_users(self, settings, admin, user,
+                                               user_superuser_client):
+        admin_client = claims_client(admin)
+        user_client = claims_client(user)
+        response = user_superuser_client.patch(
+            self.URL_USER_TEMPLATE.format(username=admin.username),
+            data={'role': 'user'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_superuser_client.delete(
+            self.URL_USER_TEMPLATE.format(username=user.username)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        for user_id in range(settings.AUTH_USER_CACHE_SIZE + 1):
+            set_role_version(10 ** 6 + user_id, 0)
+
+        response = admin_client.post(
+            self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что отзыв утверждений о правах понижённого '
+            'пользователя не вытесняется версиями прав других пользователей.'
+        )
+        response = user_client.get(self.URL_ME)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя не действует '
+            'после того, как аутентифицировалось много других пользователей.'
+        )
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+
+from users.mailing import MailerPool, confirmation_mailer
+
+
+class FlakyBackend(EmailBackend):
+    """Почтовый бэкенд, отказывающий на письме `second` failures раз."""
+
+    failures = 0
+
+    def send_messages(self, messages):
+        # Как SMTP: письма уходят по одному, и обрыв оставляет
+        # отправленными письма до сбойного.
+        sent = 0
+        for message in messages:
+            if message.subject == 'second' and FlakyBackend.failures:
+                FlakyBackend.failures -= 1
+                raise ConnectionError('SMTP connection lost')
+            sent += super().send_messages([message])
+        return sent
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ConfirmationMailing:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_async_confirmation_email(self, client, settings):
+        settings.CONFIRMATION_EMAIL_ASYNC = True
+        outbox_before_count = len(mail.outbox)
+        sent_before = confirmation_mailer.stats().get('sent', 0)
+        valid_data = {
+            'email': 'valid@yamdb.fake',
+            'username': 'valid_username'
+        }
+
+        response = client.post(self.URL_SIGNUP, data=valid_data)
+        assert response.status_code == HTTPStatus.OK
+        confirmation_mailer.join()
+
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что письмо с кодом подтверждения отправляется '
+            'фоновым потоком.'
+        )
+        assert valid_data['email'] in mail.outbox[-1].to
+        assert confirmation_mailer.stats()['sent'] == sent_before + 1
+
+    def test_02_failed_message_retried_alone(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_11_mailing.FlakyBackend'
+        FlakyBackend.failures = 1
+        outbox_before_count = len(mail.outbox)
+        mailer = MailerPool(
+            workers=1, queue_size=10, batch_size=10, retries=2, backoff=0
+        )
+        for subject in ('first', 'second', 'third'):
+            mailer.submit(
+                EmailMessage(subject, 'Текст', to=['valid@yamdb.fake'])
+            )
+        mailer.join()
+
+        subjects = [message.subject for message in mail.outbox]
+        assert subjects[outbox_before_count:] == ['first', 'second', 'third'], (
+            'Проверьте, что сбой на одном письме пачки не отправляет '
+            'повторно письма, которые уже ушли.'
+        )
+        stats = mailer.stats()
+        assert (stats['sent'], stats['retried']) == (3, 1)
@@ -0,0 +1,93 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+from users.checks import check_confirmation_code_cache
+from users.codes import confirmation_codes
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    VALID_DATA = {
+        'email': 'valid@yamdb.fake',
+        'username': 'valid_username'
+    }
+
+    def signup(self, client):
+        response = client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        assert response.status_code == HTTPStatus.OK
+        return re.search(r'\d+', mail.outbox[-1].body).group()
+
+    def test_01_code_is_single_use(self, client):
+        code = self.signup(client)
+        data = {
+            'username': self.VALID_DATA['username'],
+            'confirmation_code': code
+        }
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что код подтверждения из письма позволяет получить '
+            'токен.'
+        )
+        assert 'token' in response.json()
+
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения можно использовать только '
+            'один раз.'
+        )
+
+    def test_02_code_expires(self, client, monkeypatch):
+        monkeypatch.setattr(confirmation_codes, 'ttl', 0)
+        code = self.signup(client)
+        response = client.post(
+            self.URL_TOKEN,
+            data={
+                'username': self.VALID_DATA['username'],
+                'confirmation_code': code
+            }
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что истёкший код подтверждения не принимается.'
+        )
+
+    def test_03_non_ascii_code(self, client):
+        self.signup(client)
+        response = client.post(
+            self.URL_TOKEN,
+            data={
+                'username': self.VALID_DATA['username'],
+                'confirmation_code': 'кодй'
+            }
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения не из ASCII-символов '
+            'отклоняется с ошибкой 400.'
+        )
+
+    def test_04_shared_cache_required(self, settings):
+        assert check_confirmation_code_cache(None) == [], (
+            'Проверьте, что кэш кодов подтверждения по умолчанию общий '
+            'для процессов.'
+        )
+        settings.CACHES = {
+            **settings.CACHES,
+            'confirmation_codes': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            },
+        }
+        assert [
+            error.id for error in check_confirmation_code_cache(None)
+        ] == ['users.E002'], (
+            'Проверьте, что кэш кодов подтверждения в памяти процесса '
+            'отклоняется при запуске.'
+        )
+        settings.CONFIRMATION_CODE_CACHE = 'missing'
+        assert [
+            error.id for error in check_confirmation_code_cache(None)
+        ] == ['users.E001']
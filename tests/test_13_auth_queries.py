@@ -0,0 +1,82 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13AuthQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    VALID_DATA = {
+        'email': 'valid@yamdb.fake',
+        'username': 'valid_username'
+    }
+
+    @pytest.fixture(autouse=True)
+    def skip_search_index(self, settings):
+        # Триграммы имён вне тестов обновляются фоновым потоком
+        # и в бюджет запросов регистрации не входят.
+        settings.USER_SEARCH_NGRAM = False
+
+    def test_01_signup_queries(self, client, django_assert_max_num_queries):
+        with django_assert_max_num_queries(2):
+            response = client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что регистрация нового пользователя выполняет '
+            'не больше двух запросов к базе данных.'
+        )
+
+        with django_assert_max_num_queries(1):
+            response = client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторная регистрация выполняет один запрос '
+            'к базе данных и не изменяет пользователя.'
+        )
+
+    def test_02_token_queries(self, client, django_assert_num_queries):
+        client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        code = re.search(r'\d+', mail.outbox[-1].body).group()
+        with django_assert_num_queries(1):
+            response = client.post(
+                self.URL_TOKEN,
+                data={
+                    'username': self.VALID_DATA['username'],
+                    'confirmation_code': code
+                }
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что выдача токена выполняет один запрос '
+            'к базе данных.'
+        )
+
+    def test_03_case_insensitive_lookup(self, client, django_user_model):
+        client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        user = django_user_model.objects.get(
+            username=self.VALID_DATA['username']
+        )
+        assert user.username_normalized == self.VALID_DATA['username']
+
+        response = client.post(
+            self.URL_SIGNUP,
+            data={
+                'email': self.VALID_DATA['email'].upper(),
+                'username': self.VALID_DATA['username'].upper()
+            }
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что имя пользователя и email при регистрации '
+            'сравниваются без учёта регистра.'
+        )
+        assert django_user_model.objects.count() == 1
+
+        response = client.post(
+            self.URL_SIGNUP,
+            data={
+                'email': self.VALID_DATA['email'].upper(),
+                'username': 'other_username'
+            }
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import TokenRateThrottle
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14AuthThrottling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_signup_throttled_by_ip(self, client):
+        for idx in range(5):
+            response = client.post(
+                self.URL_SIGNUP,
+                data={
+                    'email': f'user{idx}@yamdb.fake',
+                    'username': f'user{idx}'
+                }
+            )
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(
+            self.URL_SIGNUP,
+            data={'email': 'user5@yamdb.fake', 'username': 'user5'}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частые запросы к `{self.URL_SIGNUP}` с одного '
+            'IP-адреса ограничиваются.'
+        )
+        assert 'Retry-After' in response
+
+    def test_02_token_throttled_by_username(self, client):
+        data = {'username': 'TestUser', 'confirmation_code': 1234}
+        for idx in range(10):
+            response = client.post(
+                self.URL_TOKEN, data=data, REMOTE_ADDR=f'10.0.0.{idx}'
+            )
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+        response = client.post(
+            self.URL_TOKEN,
+            data={'username': 'testuser', 'confirmation_code': 1234},
+            REMOTE_ADDR='10.0.1.1'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что подбор кода к `{self.URL_TOKEN}` для одного '
+            'пользователя ограничивается независимо от IP-адреса.'
+        )
+
+    def test_03_denied_requests_keep_other_buckets(self, client):
+        for idx in range(10):
+            response = client.post(
+                self.URL_TOKEN,
+                data={'username': f'user{idx}', 'confirmation_code': 1234},
+                REMOTE_ADDR='10.0.0.1'
+            )
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+        data = {'username': 'victim', 'confirmation_code': 1234}
+        for _ in range(5):
+            response = client.post(
+                self.URL_TOKEN, data=data, REMOTE_ADDR='10.0.0.1'
+            )
+            assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        for idx in range(10):
+            response = client.post(
+                self.URL_TOKEN, data=data, REMOTE_ADDR='10.0.1.1'
+            )
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS, (
+                'Проверьте, что отклонённые запросы не расходуют лимит '
+                'имени пользователя.'
+            )
+
+    def test_04_forwarded_for_does_not_bypass_ip_limit(self, client):
+        for idx in range(5):
+            response = client.post(
+                self.URL_SIGNUP,
+                data={
+                    'email': f'user{idx}@yamdb.fake',
+                    'username': f'user{idx}'
+                },
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{idx}'
+            )
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(
+            self.URL_SIGNUP,
+            data={'email': 'user5@yamdb.fake', 'username': 'user5'},
+            HTTP_X_FORWARDED_FOR='10.0.0.5'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что смена заголовка X-Forwarded-For не обходит '
+            'ограничение по IP-адресу.'
+        )
+
+    def test_05_username_variants_share_bucket(self, client):
+        for idx, username in enumerate(
+            ('Straße', 'STRASSE', ' strasse ', 'StraSSe', 'strasse') * 2
+        ):
+            response = client.post(
+                self.URL_TOKEN,
+                data={'username': username, 'confirmation_code': 1234},
+                REMOTE_ADDR=f'10.0.0.{idx}'
+            )
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+        response = client.post(
+            self.URL_TOKEN,
+            data={'username': 'strasse', 'confirmation_code': 1234},
+            REMOTE_ADDR='10.0.1.1'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что варианты имени, совпадающие после нормализации, '
+            'расходуют одну корзину.'
+        )
+
+    def test_06_username_key_is_bounded(self):
+        request = APIRequestFactory().post(
+            self.URL_TOKEN, {'username': 'x' * 10000}, format='json'
+        )
+        keys = TokenRateThrottle().get_cache_keys(Request(
+            request, parsers=[JSONParser()]
+        ))
+        assert max(len(key) for key in keys) < 250, (
+            'Проверьте, что длина ключа корзины не зависит от длины '
+            'присланного имени пользователя.'
+        )
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15UserSearch:
+
+    USERS_URL = '/api/v1/users/'
+    USERNAMES = ('ann', 'anna', 'annabel', 'joanna', 'bob')
+
+    @pytest.fixture
+    def users(self, django_user_model):
+        for username in self.USERNAMES:
+            django_user_model.objects.create_user(
+                username=username, email=f'{username}@yamdb.fake'
+            )
+
+    def search(self, client, **params):
+        response = client.get(self.USERS_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [user['username'] for user in response.json()['results']]
+
+    def test_01_ranked_search(self, admin_client, users):
+        assert self.search(admin_client, search='ANNA') == [
+            'anna', 'annabel', 'joanna'
+        ], (
+            f'Проверьте, что поиск `{self.USERS_URL}?search=` не учитывает '
+            'регистр и ранжирует результаты: точное совпадение, префикс, '
+            'подстрока.'
+        )
+
+    def test_02_prefix_search(self, admin_client, users):
+        assert self.search(
+            admin_client, search='ann', search_mode='prefix'
+        ) == ['ann', 'anna', 'annabel']
+        assert self.search(admin_client, search='an') == [
+            'ann', 'anna', 'annabel'
+        ], (
+            'Проверьте, что запросы короче трёх символов ищут только '
+            'по префиксу.'
+        )
+
+    def test_03_renamed_user_is_reindexed(self, admin_client, users,
+                                          django_user_model):
+        user = django_user_model.objects.get(username='bob')
+        user.username = 'robanna'
+        user.save()
+        assert 'robanna' in self.search(admin_client, search='anna')
+        assert self.search(admin_client, search='bob') == []
+
+    def test_04_substring_without_ngram_index(self, settings, admin_client,
+                                              users):
+        settings.USER_SEARCH_NGRAM = False
+        assert self.search(admin_client, search='nab') == ['annabel']
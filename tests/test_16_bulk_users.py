@@ -0,0 +1,181 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.timeline import follow_author
+from users.authorization import get_token
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_token(user)["access"]}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16BulkUsers:
+
+    URL_BULK = '/api/v1/users/bulk/'
+    URL_CATEGORIES = '/api/v1/categories/'
+
+    def test_01_bulk_only_admin(self, client, user_client, moderator_client,
+                                user):
+        data = {'usernames': [user.username], 'operation': 'deactivate'}
+        response = client.post(self.URL_BULK, data=data, format='json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что POST-запрос неавторизованного пользователя к '
+            f'`{self.URL_BULK}` возвращает ответ со статусом 401.'
+        )
+        for api_client in (user_client, moderator_client):
+            response = api_client.post(
+                self.URL_BULK, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что POST-запрос пользователя без прав '
+                f'администратора к `{self.URL_BULK}` возвращает ответ '
+                'со статусом 403.'
+            )
+
+    def test_02_bulk_bad_request(self, admin_client, user):
+        response = admin_client.post(
+            self.URL_BULK,
+            data={'usernames': [user.username], 'operation': 'set_role'},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что операция `set_role` без роли возвращает ответ '
+            'со статусом 400.'
+        )
+        response = admin_client.post(
+            self.URL_BULK,
+            data={'usernames': [], 'operation': 'deactivate'},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пустой список пользователей возвращает ответ '
+            'со статусом 400.'
+        )
+
+    def test_03_bulk_set_role(self, admin_client, admin, user, moderator):
+        response = admin_client.post(
+            self.URL_BULK,
+            data={
+                'usernames': [
+                    user.username.lower(),
+                    moderator.username,
+                    admin.username,
+                    'missing',
+                ],
+                'operation': 'set_role',
+                'role': 'moderator',
+            },
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос администратора к `{self.URL_BULK}` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response.json()['results'] == [
+            {'username': user.username, 'status': 'updated'},
+            {'username': moderator.username, 'status': 'unchanged'},
+            {'username': admin.username, 'status': 'skipped'},
+            {'username': 'missing', 'status': 'not_found'},
+        ], (
+            'Проверьте, что ответ содержит итог операции для каждого '
+            'запрошенного пользователя.'
+        )
+        user.refresh_from_db()
+        admin.refresh_from_db()
+        assert user.role == 'moderator'
+        assert admin.role == 'admin'
+
+    def test_04_bulk_deactivate_and_delete(self, admin_client, user,
+                                           moderator, django_user_model):
+        response = admin_client.post(
+            self.URL_BULK,
+            data={'usernames': [user.username], 'operation': 'deactivate'},
+            format='json',
+        )
+        assert response.json()['results'] == [
+            {'username': user.username, 'status': 'updated'}
+        ]
+        user.refresh_from_db()
+        assert not user.is_active
+
+        response = admin_client.post(
+            self.URL_BULK,
+            data={
+                'usernames': [user.username, moderator.username],
+                'operation': 'delete',
+            },
+            format='json',
+        )
+        assert response.json()['results'] == [
+            {'username': user.username, 'status': 'deleted'},
+            {'username': moderator.username, 'status': 'deleted'},
+        ]
+        assert not django_user_model.objects.filter(
+            id__in=[user.id, moderator.id]
+        ).exists()
+
+    def test_05_bulk_invalidates_auth(self, admin_client, admin):
+        other_admin = admin.__class__.objects.create_user(
+            username='OtherAdmin', email='other@yamdb.fake', role='admin'
+        )
+        other_client = claims_client(other_admin)
+        response = other_client.post(
+            self.URL_CATEGORIES, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        admin_client.post(
+            self.URL_BULK,
+            data={
+                'usernames': [other_admin.username],
+                'operation': 'set_role',
+                'role': 'user',
+            },
+            format='json',
+        )
+        response = other_client.post(
+            self.URL_CATEGORIES, data={'name': 'Книга', 'slug': 'books'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после массовой смены роли токен пользователя '
+            'больше не даёт прав администратора.'
+        )
+
+    def test_06_bulk_username_reserved(self, client):
+        response = client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'bulk', 'email': 'bulk@yamdb.fake'},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что имя `bulk` нельзя использовать при регистрации.'
+        )
+
+    def test_07_bulk_delete_recounts_followers(self, admin_client, admin,
+                                                user, moderator):
+        follower = admin.__class__.objects.create_user(
+            username='Follower', email='follower@yamdb.fake'
+        )
+        for reader in (user, moderator, follower):
+            follow_author(reader, admin)
+        follow_author(user, moderator)
+
+        admin_client.post(
+            self.URL_BULK,
+            data={
+                'usernames': [user.username, moderator.username],
+                'operation': 'delete',
+            },
+            format='json',
+        )
+        admin.refresh_from_db()
+        assert admin.followers_count == 1, (
+            'Проверьте, что массовое удаление пользователей уменьшает '
+            'счётчики подписчиков авторов, на которых они были подписаны.'
+        )
@@ -0,0 +1,266 @@
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.management.commands.csv_import import Command
+from reviews.models import Comment, GenreTitle, Review, Title
+from reviews.timeline import follow_author
+from users.models import User
+
+
+def insert_queries(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith(f'INSERT INTO "{table}"')
+    ]
+
+
+@pytest.fixture
+def csv_directory(tmp_path):
+    directory = tmp_path / 'data'
+    directory.mkdir()
+    for name in Command.CSV_FILES.values():
+        (directory / name).write_text(
+            (Path(Command.CSV_DIRECTORY) / name).read_text()
+        )
+    return directory
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17CsvImport:
+
+    def test_01_import_all(self):
+        call_command('csv_import')
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.exists(), (
+            'Проверьте, что команда `csv_import` загружает отзывы.'
+        )
+        assert Comment.objects.exists()
+
+    def test_02_import_in_batches(self):
+        with CaptureQueriesContext(connection) as context:
+            call_command('csv_import', batch_size=10)
+        assert len(insert_queries(context, 'reviews_genretitle')) == 5, (
+            'Проверьте, что команда `csv_import` записывает строки пачками '
+            'размера `--batch-size`.'
+        )
+        assert GenreTitle.objects.count() == 42
+
+    def test_03_import_is_rerunnable(self):
+        call_command('csv_import', batch_size=10)
+        with CaptureQueriesContext(connection) as context:
+            call_command(
+                'csv_import', batch_size=10, force=True, skip_aggregates=True
+            )
+        assert not any(
+            query['sql'].startswith('INSERT')
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что повторный импорт не записывает уже загруженные '
+            'строки.'
+        )
+        assert len(context.captured_queries) <= 30, (
+            'Проверьте, что существование строк проверяется одним запросом '
+            'на пачку.'
+        )
+        assert User.objects.count() == 5
+        assert GenreTitle.objects.count() == 42
+
+    def test_04_import_with_workers(self):
+        call_command('csv_import', batch_size=10, workers=2)
+        assert User.objects.count() == 5
+        assert GenreTitle.objects.count() == 42, (
+            'Проверьте, что при `--workers` больше 1 команда `csv_import` '
+            'загружает все строки.'
+        )
+
+    def test_05_invalid_row(self, csv_directory):
+        (csv_directory / 'titles.csv').write_text(
+            'id,name,year,category\n1,Фильм,не год,1\n'
+        )
+        with pytest.raises(CommandError, match='titles, row 1'):
+            call_command('csv_import', directory=csv_directory)
+
+    def test_06_incremental_import(self, csv_directory):
+        call_command('csv_import', directory=csv_directory)
+        review = Review.objects.get(id=1)
+        assert review.pub_date.year < 2023, (
+            'Проверьте, что `csv_import` сохраняет дату публикации из файла.'
+        )
+        users_csv = csv_directory / 'users.csv'
+        users_csv.write_text(
+            users_csv.read_text().replace(
+                'bingobongo@yamdb.fake,user', 'bingobongo@yamdb.fake,moderator'
+            ).rstrip() + '\n999,new_user,new_user@yamdb.fake,user,,,\n'
+        )
+        with CaptureQueriesContext(connection) as context:
+            call_command('csv_import', directory=csv_directory)
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_review' in query['sql']
+        ], 'Проверьте, что неизменившиеся файлы пропускаются.'
+        assert User.objects.get(id=100).role == 'moderator', (
+            'Проверьте, что изменённые строки обновляются по id.'
+        )
+        assert User.objects.get(id=100).role_version == 1
+        assert User.objects.filter(username='new_user').exists()
+
+        users_csv.write_text(
+            'id,username,email,role,bio,first_name,last_name\n'
+            '999,new_user,new_user@yamdb.fake,user,,,\n'
+        )
+        call_command('csv_import', directory=csv_directory, delete_missing=True)
+        assert list(User.objects.values_list('id', flat=True)) == [999], (
+            'Проверьте, что с `--delete-missing` удаляются строки, которых '
+            'нет в файле.'
+        )
+
+    def test_07_dry_run(self, csv_directory, tmp_path):
+        (csv_directory / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Текст,100,11,2020-01-13T23:20:02.422Z\n'
+            '2,9999,Текст,100,5,2020-01-13T23:20:02.422Z\n'
+            '3,1,Текст,100,7,2020-01-13T23:20:02.422Z\n'
+        )
+        summary_path = tmp_path / 'summary.json'
+        with pytest.raises(CommandError) as error:
+            call_command(
+                'csv_import',
+                directory=csv_directory,
+                dry_run=True,
+                summary=str(summary_path),
+            )
+        message = str(error.value)
+        assert 'reviews, row 1' in message, (
+            'Проверьте, что `--dry-run` находит оценку вне диапазона 1-10.'
+        )
+        assert 'reviews, row 2: title_id 9999 does not exist' in message, (
+            'Проверьте, что `--dry-run` находит ссылки на несуществующие '
+            'строки.'
+        )
+        assert not User.objects.exists(), (
+            'Проверьте, что `--dry-run` ничего не записывает в базу данных.'
+        )
+        summary = json.loads(summary_path.read_text())
+        assert summary['dry_run'] is True
+        assert len([
+            error for error in summary['errors']
+            if error.startswith('reviews')
+        ]) == 2
+        assert summary['tables']['reviews']['rows'] == 1
+
+    def test_08_summary(self, tmp_path):
+        summary_path = tmp_path / 'summary.json'
+        call_command('csv_import', summary=str(summary_path))
+        summary = json.loads(summary_path.read_text())
+        users = summary['tables']['users']
+        assert users['rows'] == users['created'] == 5
+        assert users['bytes'] > 0
+        assert users['rows_per_second'] > 0, (
+            'Проверьте, что сводка импорта содержит скорость загрузки.'
+        )
+
+    def test_09_bulk_load(self):
+        def pragma(name):
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA {name}')
+                return cursor.fetchone()[0]
+
+        def indexes(table):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' "
+                    'AND tbl_name = %s ORDER BY name',
+                    [table],
+                )
+                return [row[0] for row in cursor.fetchall()]
+
+        synchronous = pragma('synchronous')
+        title_indexes = indexes('reviews_title')
+        call_command('csv_import', bulk_load=True, drop_indexes=True)
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.exists()
+        assert pragma('synchronous') == synchronous, (
+            'Проверьте, что после `--bulk-load` режим синхронной записи '
+            'восстанавливается.'
+        )
+        assert indexes('reviews_title') == title_indexes, (
+            'Проверьте, что после `--drop-indexes` индексы таблиц '
+            'построены заново.'
+        )
+
+    def test_10_column_validation(self, csv_directory):
+        (csv_directory / 'users.csv').write_text(
+            'id,username,email,role,bio,first_name,last_name\n'
+            '1,good_user,good@yamdb.fake,user,,,\n'
+            '2,bad user!,bad@yamdb.fake,user,,,\n'
+        )
+        (csv_directory / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n2,Комедия,не слаг\n'
+        )
+        (csv_directory / 'titles.csv').write_text(
+            'id,name,year,category\n1,Фильм,1994,1\n2,Будущее,9999,1\n'
+        )
+        with pytest.raises(CommandError) as error:
+            call_command('csv_import', directory=csv_directory, dry_run=True)
+        message = str(error.value)
+        assert "users, row 2: username 'bad user!'" in message, (
+            'Проверьте, что имена пользователей проверяются по '
+            '`UsernameValidator`.'
+        )
+        assert "genre, row 2: slug 'не слаг'" in message, (
+            'Проверьте, что проверяется формат slug.'
+        )
+        assert 'titles, row 2: year 9999' in message, (
+            'Проверьте, что год выпуска не может быть больше текущего.'
+        )
+
+    def test_11_dangling_reference_is_not_written(self, csv_directory):
+        (csv_directory / 'comments.csv').write_text(
+            'id,review_id,text,author,pub_date\n'
+            '1,1,Текст,100,2020-01-13T23:20:02.422Z\n'
+            '2,1,Текст,77777,2020-01-13T23:20:02.422Z\n'
+        )
+        with pytest.raises(
+            CommandError,
+            match='comments, row 2: author_id 77777 does not exist in users',
+        ):
+            call_command('csv_import', directory=csv_directory)
+        assert not Comment.objects.exists(), (
+            'Проверьте, что пачка со ссылкой на несуществующую строку '
+            'не записывается в базу данных.'
+        )
+
+    def test_12_delete_missing_recounts_followers(self, csv_directory):
+        call_command('csv_import', directory=csv_directory)
+        author = User.objects.get(id=101)
+        for follower_id in (102, 103):
+            follow_author(User.objects.get(id=follower_id), author)
+        users_csv = csv_directory / 'users.csv'
+        users_csv.write_text(
+            ''.join(
+                line for line in users_csv.read_text().splitlines(True)
+                if not line.startswith('102,')
+            )
+        )
+        call_command(
+            'csv_import',
+            directory=csv_directory,
+            delete_missing=True,
+            batch_size=2,
+        )
+        assert sorted(User.objects.values_list('id', flat=True)) == [
+            100, 101, 103, 104
+        ]
+        author.refresh_from_db()
+        assert author.followers_count == 1, (
+            'Проверьте, что после удаления пользователей с '
+            '`--delete-missing` число подписчиков их авторов пересчитывается.'
+        )
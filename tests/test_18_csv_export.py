@@ -0,0 +1,49 @@
+import csv
+import gzip
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.commands.csv_import import Command as ImportCommand
+
+
+def read_rows(path, opener=open):
+    with opener(path, 'rt', newline='', encoding='utf-8') as csv_file:
+        return sorted(csv.DictReader(csv_file), key=lambda row: int(row['id']))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18CsvExport:
+
+    def test_01_round_trip(self, tmp_path):
+        call_command('csv_import')
+        call_command('csv_export', str(tmp_path), chunk_size=7)
+        for filename in ImportCommand.CSV_FILES.values():
+            expected = read_rows(Path(ImportCommand.CSV_DIRECTORY) / filename)
+            assert read_rows(tmp_path / filename) == expected, (
+                f'Проверьте, что `csv_export` записывает `{filename}` '
+                'в формате `csv_import`.'
+            )
+
+    def test_02_gzip(self, tmp_path):
+        call_command('csv_import')
+        call_command('csv_export', str(tmp_path), gzip=True)
+        filename = ImportCommand.CSV_FILES['users']
+        assert read_rows(tmp_path / f'{filename}.gz', gzip.open) == read_rows(
+            Path(ImportCommand.CSV_DIRECTORY) / filename
+        ), 'Проверьте, что `csv_export --gzip` сжимает файлы gzip.'
+
+    def test_03_gzip_round_trip(self, tmp_path):
+        call_command('csv_import')
+        call_command('csv_export', str(tmp_path / 'dump'), gzip=True)
+        call_command('flush', interactive=False)
+        call_command('csv_import', directory=str(tmp_path / 'dump'))
+        call_command('csv_export', str(tmp_path / 'again'))
+        for filename in ImportCommand.CSV_FILES.values():
+            assert read_rows(tmp_path / 'again' / filename) == read_rows(
+                Path(ImportCommand.CSV_DIRECTORY) / filename
+            ), (
+                'Проверьте, что `csv_import --directory` читает файлы, '
+                'сжатые `csv_export --gzip`.'
+            )
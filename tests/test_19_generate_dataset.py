@@ -0,0 +1,55 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.management.commands.csv_import import Command as ImportCommand
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+SIZES = {
+    'users': 30,
+    'titles': 20,
+    'reviews': 150,
+    'comments': 40,
+    'chunk_size': 16,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19GenerateDataset:
+
+    def test_01_reproducible_csv(self, tmp_path):
+        call_command(
+            'generate_dataset', output_dir=str(tmp_path / 'one'), **SIZES
+        )
+        call_command(
+            'generate_dataset', output_dir=str(tmp_path / 'two'), workers=2,
+            **SIZES
+        )
+        for filename in ImportCommand.CSV_FILES.values():
+            assert (tmp_path / 'one' / filename).read_bytes() == (
+                tmp_path / 'two' / filename
+            ).read_bytes(), (
+                'Проверьте, что при одном зерне `generate_dataset` создаёт '
+                'одинаковые файлы при любом числе процессов.'
+            )
+
+    def test_02_csv_imports(self, tmp_path):
+        call_command('generate_dataset', output_dir=str(tmp_path), **SIZES)
+        call_command('csv_import', directory=str(tmp_path))
+        assert User.objects.count() == 30
+        assert Title.objects.count() == 20
+        assert Review.objects.count() == 150
+        assert Comment.objects.count() == 40
+
+    def test_03_database(self):
+        call_command('generate_dataset', **SIZES)
+        assert Review.objects.count() == 150, (
+            'Проверьте, что без `--output-dir` данные записываются в базу.'
+        )
+        top_title = Review.objects.filter(title_id=1).count()
+        assert top_title > 150 / 20, (
+            'Проверьте, что популярность произведений неравномерна.'
+        )
+        with pytest.raises(CommandError):
+            call_command('generate_dataset', **SIZES)
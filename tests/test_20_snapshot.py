@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.snapshot import Snapshot
+from reviews.models import Comment, Review, Title
+from users.authentication import CachedJWTAuthentication
+from users.authorization import get_token
+from users.models import User
+
+
+def table_state():
+    return {
+        'users': list(User.objects.order_by('id').values()),
+        'titles': list(Title.objects.order_by('id').values()),
+        'reviews': list(Review.objects.order_by('id').values()),
+        'comments': list(Comment.objects.order_by('id').values()),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Snapshot:
+
+    def test_01_round_trip(self, tmp_path, admin):
+        call_command('csv_import')
+        Title.objects.filter(id=1).update(description='Описание')
+        expected = table_state()
+        path = tmp_path / 'data.snapshot'
+        call_command('dump_snapshot', str(path))
+
+        Review.objects.filter(id__lte=10).delete()
+        User.objects.filter(id=100).update(bio='Изменено', is_active=False)
+        User.objects.create_user(username='extra', email='extra@yamdb.fake')
+
+        call_command('load_snapshot', str(path), batch_size=7)
+        assert table_state() == expected, (
+            'Проверьте, что `load_snapshot` восстанавливает таблицы '
+            'в точности такими, какими их записал `dump_snapshot`.'
+        )
+        new_user = User.objects.create_user(
+            username='after', email='after@yamdb.fake'
+        )
+        assert new_user.id > max(user['id'] for user in expected['users'])
+
+    def test_02_not_a_snapshot(self, tmp_path):
+        path = tmp_path / 'broken.snapshot'
+        path.write_bytes(b'not a snapshot')
+        with pytest.raises(CommandError):
+            call_command('load_snapshot', str(path))
+
+    def test_03_authenticate_after_restore(self, tmp_path):
+        call_command('csv_import')
+        path = tmp_path / 'data.snapshot'
+        call_command('dump_snapshot', str(path))
+        user = User.objects.get(id=100)
+        user.role = 'moderator'
+        user.save()
+        old_token = get_token(user)['access']
+
+        call_command('load_snapshot', str(path))
+        restored = CachedJWTAuthentication().get_user(AccessToken(old_token))
+        assert restored.role == 'user', (
+            'Проверьте, что после `load_snapshot` права из токенов, '
+            'выпущенных до восстановления, не используются.'
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=(
+                f'Bearer {get_token(User.objects.get(id=100))["access"]}'
+            )
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после `load_snapshot` пользователь '
+            'аутентифицируется по новому токену.'
+        )
+        assert response.json()['role'] == 'user'
+
+    def test_04_auth_relations_are_not_snapshotted(self, tmp_path):
+        call_command('csv_import')
+        group = Group.objects.create(name='editors')
+        User.objects.get(id=100).groups.add(group)
+        path = tmp_path / 'data.snapshot'
+        call_command('dump_snapshot', str(path))
+        with Snapshot(str(path)) as snapshot:
+            tables = {table['table'] for table in snapshot.tables}
+        assert not tables & {'users_user_groups', 'users_user_user_permissions'}, (
+            'Проверьте, что в снимок не попадают связи пользователей '
+            'с таблицами auth, которых в снимке нет.'
+        )
+
+        User.objects.get(id=101).groups.add(group)
+        call_command('load_snapshot', str(path))
+        assert not User.groups.through.objects.exists(), (
+            'Проверьте, что `load_snapshot` очищает связи восстановленных '
+            'пользователей с таблицами вне снимка.'
+        )
+        assert Group.objects.filter(name='editors').exists()
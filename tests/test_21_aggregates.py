@@ -0,0 +1,202 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Avg, Count, Max
+from django.test.utils import CaptureQueriesContext
+
+from reviews.aggregates import recompute_aggregates
+from reviews.models import VOTE_DOWN, VOTE_UP, Review, ReviewVote, Title, TitleScore
+from reviews.votes import cast_vote
+from users.models import User
+
+
+def expected_titles():
+    return {
+        title['id']: (title['average'], title['count'], title['last'])
+        for title in Title.objects.annotate(
+            average=Avg('reviews__score'),
+            count=Count('reviews'),
+            last=Max('reviews__pub_date'),
+        ).values('id', 'average', 'count', 'last')
+    }
+
+
+def stored_titles():
+    return {
+        title['id']: (
+            title['rating'], title['review_count'], title['last_review_date']
+        )
+        for title in Title.objects.values(
+            'id', 'rating', 'review_count', 'last_review_date'
+        )
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Aggregates:
+
+    def test_01_import_recomputes_aggregates(self):
+        call_command('csv_import')
+        assert stored_titles() == expected_titles(), (
+            'Проверьте, что после `csv_import` рейтинг, число отзывов и дата '
+            'последнего отзыва произведений пересчитываются.'
+        )
+        assert TitleScore.objects.filter(title_id=1, score=10).get().count == (
+            Review.objects.filter(title_id=1, score=10).count()
+        )
+
+    def test_02_recompute_reports_changes(self):
+        call_command('csv_import')
+        Title.objects.update(rating=None, review_count=0)
+        TitleScore.objects.filter(title_id=1).delete()
+        review = Review.objects.get(id=1)
+        voter = User.objects.exclude(id=review.author_id).first()
+        ReviewVote.objects.create(review=review, user=voter, value=1)
+
+        changes = recompute_aggregates(batch_size=7)
+        reviewed = Title.objects.filter(reviews__isnull=False).distinct()
+        assert changes['titles'] == reviewed.count(), (
+            'Проверьте, что пересчёт сообщает число изменённых произведений.'
+        )
+        assert changes['title_scores'] == (
+            Review.objects.filter(title_id=1).values('score').distinct().count()
+        )
+        assert changes['reviews'] == 1
+        assert stored_titles() == expected_titles()
+        review.refresh_from_db()
+        assert (review.helpful_up, review.helpful_score) == (1, 1), (
+            'Проверьте, что счётчики полезности отзывов пересчитываются '
+            'по голосам.'
+        )
+        assert recompute_aggregates() == {
+            'titles': 0, 'title_scores': 0, 'reviews': 0
+        }, 'Проверьте, что повторный пересчёт ничего не меняет.'
+
+    def test_03_review_changes_update_title(self, user):
+        title = Title.objects.create(name='Фильм', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        title.refresh_from_db()
+        assert (title.rating, title.review_count) == (4, 1), (
+            'Проверьте, что рейтинг произведения обновляется при создании '
+            'отзыва.'
+        )
+        review.delete()
+        title.refresh_from_db()
+        assert (title.rating, title.review_count) == (None, 0)
+        assert not TitleScore.objects.filter(title=title).exists()
+
+    def test_04_review_score_changes_shift_title(self, user, admin):
+        title = Title.objects.create(name='Фильм', year=2000)
+        Review.objects.create(title=title, author=user, text='Текст', score=4)
+        Review.objects.create(title=title, author=admin, text='Текст', score=9)
+        review = Review.objects.get(title=title, author=user)
+
+        review.text = 'Новый текст'
+        with CaptureQueriesContext(connection) as context:
+            review.save()
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_title' in query['sql']
+        ], (
+            'Проверьте, что изменение отзыва без изменения оценки не '
+            'обновляет сводку произведения.'
+        )
+
+        review.score = 10
+        review.save()
+        assert stored_titles() == expected_titles(), (
+            'Проверьте, что изменение оценки отзыва обновляет рейтинг '
+            'произведения.'
+        )
+        assert dict(
+            TitleScore.objects.filter(title=title).values_list('score', 'count')
+        ) == {9: 1, 10: 1}
+
+        Review.objects.get(title=title, author=admin).delete()
+        assert stored_titles() == expected_titles()
+        assert recompute_aggregates() == {
+            'titles': 0, 'title_scores': 0, 'reviews': 0
+        }, 'Проверьте, что сдвиги сводки совпадают с её пересчётом.'
+
+    def delete_queries(self, instance):
+        with CaptureQueriesContext(connection) as context:
+            instance.delete()
+        return len(context.captured_queries)
+
+    def create_reviews(self, title, count):
+        for idx in range(count):
+            author = User.objects.create_user(
+                username=f'author{title.id}_{idx}',
+                email=f'author{title.id}_{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=idx % 10 + 1
+            )
+
+    def test_05_cascade_delete_queries_are_constant(self):
+        small = Title.objects.create(name='Фильм', year=2000)
+        large = Title.objects.create(name='Сериал', year=2000)
+        self.create_reviews(small, 3)
+        self.create_reviews(large, 30)
+        assert self.delete_queries(large) == self.delete_queries(small), (
+            'Проверьте, что число запросов при удалении произведения не '
+            'зависит от числа его отзывов.'
+        )
+
+        few, many = (
+            User.objects.create_user(username=name, email=f'{name}@yamdb.fake')
+            for name in ('few', 'many')
+        )
+        titles = [
+            Title.objects.create(name=f'Фильм {idx}', year=2000)
+            for idx in range(20)
+        ]
+        for idx, title in enumerate(titles):
+            if idx < 2:
+                Review.objects.create(
+                    title=title, author=few, text='Текст', score=5
+                )
+            Review.objects.create(
+                title=title, author=many, text='Текст', score=7
+            )
+        assert self.delete_queries(many) == self.delete_queries(few), (
+            'Проверьте, что число запросов при удалении пользователя не '
+            'зависит от числа его отзывов.'
+        )
+        assert stored_titles() == expected_titles(), (
+            'Проверьте, что после удаления автора сводки его произведений '
+            'пересчитываются.'
+        )
+        assert not TitleScore.objects.exists()
+
+    def test_06_deleted_voter_is_removed_from_helpfulness(self, user, admin):
+        title = Title.objects.create(name='Фильм', year=2000)
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+            for author in (user, admin)
+        ]
+        voters = [
+            User.objects.create_user(
+                username=f'voter{idx}', email=f'voter{idx}@yamdb.fake'
+            )
+            for idx in range(3)
+        ]
+        for review in reviews:
+            for voter, value in zip(voters, (VOTE_UP, VOTE_UP, VOTE_DOWN)):
+                cast_vote(voter, review, value)
+
+        voters[0].delete()
+        User.objects.filter(id__in=[voters[1].id, voters[2].id]).delete()
+        for review in reviews:
+            review.refresh_from_db()
+            assert (
+                review.helpful_up, review.helpful_down, review.helpful_score
+            ) == (0, 0, 0), (
+                'Проверьте, что после удаления голосовавших пользователей '
+                'счётчики полезности отзывов пересчитываются.'
+            )
+        assert recompute_aggregates()['reviews'] == 0
@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import call_command
+
+from api.benchmark import ENDPOINTS, compare, run_benchmark
+
+
+def results(p95_ms, queries):
+    return {
+        'datasets': {
+            'small': {
+                'endpoints': {
+                    'titles-list': {'p95_ms': p95_ms, 'queries': queries}
+                }
+            }
+        }
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Benchmark:
+
+    def test_01_every_endpoint_is_measured(self):
+        call_command(
+            'generate_dataset', users=20, categories=3, genres=5, titles=10,
+            reviews=50, comments=100,
+        )
+        measured = run_benchmark(list(ENDPOINTS), requests=3, warmup=1)
+        assert set(measured) == set(ENDPOINTS), (
+            'Проверьте, что замеряются все эндпоинты из `ENDPOINTS`.'
+        )
+        for name, stats in measured.items():
+            assert stats['requests'] == 3
+            assert 0 < stats['p50_ms'] <= stats['p95_ms'] <= stats['max_ms']
+            assert stats['queries'] > 0, (
+                f'Проверьте, что для `{name}` считаются SQL-запросы.'
+            )
+
+    def test_02_compare_with_baseline(self):
+        baseline = results(p95_ms=10.0, queries=3)
+        assert compare(results(11.0, 3), baseline, 0.25, 1.0) == [], (
+            'Проверьте, что рост p95 в пределах порога не считается '
+            'регрессией.'
+        )
+        assert compare(results(14.0, 3), baseline, 0.25, 1.0) == [
+            'small titles-list: p95 14.00ms, baseline 10.00ms'
+        ]
+        assert compare(results(10.0, 4), baseline, 0.25, 1.0) == [
+            'small titles-list: 4 queries, baseline 3'
+        ], 'Проверьте, что рост числа SQL-запросов считается регрессией.'
@@ -0,0 +1,65 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.query_budget import QueryBudgetExceeded, fingerprint
+from api.views import TitleViewSet
+from api_yamdb.queries import QueryCounter, uncounted_queries
+from reviews.models import Title
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23QueryBudget:
+
+    def test_01_fingerprint(self):
+        assert fingerprint(
+            "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'O''Neil' "
+            'AND score > %s LIMIT 21'
+        ) == (
+            'SELECT * FROM t WHERE id IN (...) AND name = ? AND score > ? '
+            'LIMIT ?'
+        ), 'Проверьте, что отпечаток запроса не зависит от его значений.'
+
+    def test_02_over_budget_raises_in_tests(self, client, monkeypatch):
+        Title.objects.create(name='Фильм', year=2000)
+        monkeypatch.setattr(TitleViewSet, 'query_budgets', {'list': 1})
+        with pytest.raises(QueryBudgetExceeded, match='TitleViewSet.list'):
+            client.get(TITLES_URL)
+
+    def test_03_over_budget_is_logged(self, client, monkeypatch, settings,
+                                      caplog):
+        settings.QUERY_BUDGET_RAISE = False
+        Title.objects.create(name='Фильм', year=2000)
+        monkeypatch.setattr(TitleViewSet, 'query_budgets', {'list': 1})
+        with caplog.at_level(logging.WARNING, logger='api.query_budget'):
+            response = client.get(TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert 'TitleViewSet.list (GET /api/v1/titles/)' in caplog.text, (
+            'Проверьте, что превышение бюджета запросов пишется в лог.'
+        )
+        assert 'FROM "reviews_title"' in caplog.text, (
+            'Проверьте, что в лог попадают отпечатки запросов.'
+        )
+
+    def test_04_disabled(self, client, monkeypatch, settings):
+        settings.QUERY_BUDGET_ENABLED = False
+        monkeypatch.setattr(TitleViewSet, 'query_budgets', {'list': 0})
+        response = client.get(TITLES_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что без QUERY_BUDGET_ENABLED бюджеты не проверяются.'
+        )
+
+    def test_05_background_queries_not_counted(self):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            Title.objects.count()
+            with uncounted_queries():
+                Title.objects.count()
+        assert counter.count == 1, (
+            'Проверьте, что запросы фоновых задач, выполненных в потоке '
+            'запроса, не учитываются.'
+        )
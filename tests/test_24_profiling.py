@@ -0,0 +1,58 @@
+import pstats
+from http import HTTPStatus
+
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+TOKEN = 'secret-profiling-token'
+
+
+@pytest.fixture
+def profiles(settings, tmp_path):
+    settings.PROFILING_TOKEN = TOKEN
+    settings.PROFILING_DIR = str(tmp_path / 'profiles')
+    return tmp_path / 'profiles'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Profiling:
+
+    def test_01_profile_on_request(self, client, profiles):
+        response = client.get(TITLES_URL, HTTP_X_PROFILE=TOKEN)
+        assert response.status_code == HTTPStatus.OK
+        name = response['X-Profile-File']
+        assert '-api_titles-list.GET-' in name, (
+            'Проверьте, что имя профиля содержит имя представления.'
+        )
+        assert name.endswith('ms-sql.prof') and 'q-' in name, (
+            'Проверьте, что имя профиля содержит итоги SQL-запросов.'
+        )
+        stats = pstats.Stats(str(profiles / name))
+        assert stats.total_calls > 0
+
+    def test_02_not_triggered(self, client, profiles):
+        response = client.get(TITLES_URL, HTTP_X_PROFILE='wrong')
+        assert 'X-Profile-File' not in response
+        client.get(TITLES_URL)
+        assert not profiles.exists(), (
+            'Проверьте, что запросы без токена и вне выборки '
+            'не профилируются.'
+        )
+
+    def test_03_sampling_and_rotation(self, client, profiles, settings):
+        settings.PROFILING_SAMPLE_RATE = 1.0
+        settings.PROFILING_MODE = 'sampling'
+        settings.PROFILING_SAMPLING_INTERVAL = 0.0005
+        settings.PROFILING_MAX_FILES = 2
+        for _ in range(3):
+            client.get(TITLES_URL)
+        files = sorted(profiles.iterdir())
+        assert len(files) == 2, (
+            'Проверьте, что в каталоге профилей остаются только '
+            'PROFILING_MAX_FILES последних файлов.'
+        )
+        for path in files:
+            assert path.suffix == '.collapsed'
+            for line in path.read_text().splitlines():
+                stack, count = line.rsplit(' ', 1)
+                assert ';' in stack and int(count) > 0